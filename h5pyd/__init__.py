@@ -22,6 +22,7 @@ from ._hl.files import File, H5Image, is_hdf5
 from ._hl.folders import Folder
 from ._hl.group import Group, SoftLink, ExternalLink, UserDefinedLink, HardLink
 from ._hl.dataset import Dataset, MultiManager
+from ._hl.aio import AsyncFile, AsyncGroup, AsyncDataset
 from ._hl.table import Table
 from ._hl.datatype import Datatype
 from ._hl.attrs import AttributeManager
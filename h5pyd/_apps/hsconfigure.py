@@ -52,8 +52,8 @@ def saveConfig(username, password, endpoint, api_key):
 # Check to see if we can get a response from the server
 #
 def pingServer(username, password, endpoint, api_key):
-    if not endpoint.startswith("http"):
-        print("endpoint must start with 'http...'")
+    if not endpoint.startswith(("http", "h2://", "h2c://")):
+        print("endpoint must start with 'http...', 'h2://' or 'h2c://'")
         return False
 
     try:
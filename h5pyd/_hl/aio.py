@@ -0,0 +1,584 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+"""
+asyncio flavor of the h5pyd API.
+
+Requests are sent with aiohttp (an optional dependency, installed with
+"pip install h5pyd[async]"), so many reads and writes can be in flight from
+one event loop.  E.g.:
+
+    async with AsyncFile("/home/test_user1/tall.h5", "r") as f:
+        dset = await f.get("g1/g1.1/dset1.1.1")
+        arrs = await asyncio.gather(*[dset.read(i) for i in range(10)])
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+import json
+from urllib.parse import quote, unquote
+
+import numpy
+
+from .. import config
+from .base import Empty, array_for_new_object, bytesToArray, arrayToBytes, jsonToArray
+from .h5type import getTypeItem
+from .httpconn import HttpConn, RETRY_STATUS, _READ_POST_PAT
+from .objectid import DatasetID, GroupID
+from . import selections as sel
+
+DEFAULT_POOL_SIZE = 100  # max number of connections held by the aiohttp session
+MAX_BACKOFF = 120  # max number of seconds to wait before retrying a request
+MAX_SELECT_QUERY_LEN = 100
+
+
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError("aiohttp is needed for the async API - install with: pip install h5pyd[async]")
+    return aiohttp
+
+
+class AsyncHttpConn(object):
+    """
+    Async counterpart of HttpConn.  Configuration and authentication are handled by
+    an HttpConn instance, while requests are sent with an aiohttp session using a pool
+    of up to pool_size connections.
+    """
+
+    def __init__(self, domain_name, mode="r", pool_size=None, **kwds):
+        self._aiohttp = _import_aiohttp()
+        self._conn = HttpConn(domain_name, mode=mode, use_cache=False, **kwds)
+        self.log = self._conn.log
+        if self._conn._lambda:
+            self._conn.close()
+            raise IOError("Lambda endpoints are not supported by the async API")
+        if pool_size is None:
+            cfg = config.get_config()
+            pool_size = int(cfg.get("hs_async_pool_size", DEFAULT_POOL_SIZE))
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self._pool_size = pool_size
+        self._session = None
+        self._base_url = None
+
+    def _getSession(self):
+        # the session has to be created from within the event loop that uses it
+        if self._session is None:
+            aiohttp = self._aiohttp
+            endpoint = self._conn.endpoint
+            unix_prefix = "http+unix://"
+            if endpoint.startswith(unix_prefix):
+                socket_path = unquote(endpoint[len(unix_prefix):])
+                connector = aiohttp.UnixConnector(path=socket_path, limit=self._pool_size)
+                self._base_url = "http://localhost"
+            else:
+                connector = aiohttp.TCPConnector(limit=self._pool_size)
+                self._base_url = endpoint
+            timeout = aiohttp.ClientTimeout(total=self._conn._timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def request(self, method, req, params=None, body=None, format="json"):
+        """Send a request to the server and return the response body - a dict for JSON
+        responses, bytes for binary ones.  Raises IOError if the request fails."""
+        if method != "GET" and self._conn.mode == "r":
+            if method != "POST" or _READ_POST_PAT.match(req) is None:
+                raise IOError("Unable perform request (No write intent on file)")
+
+        params = dict(params) if params else {}
+        if "domain" not in params:
+            params["domain"] = self._conn.domain
+        if "bucket" not in params and self._conn._bucket:
+            params["bucket"] = self._conn._bucket
+        if isinstance(self._conn._api_key, str):
+            params["api_key"] = self._conn._api_key
+
+        headers = self._conn.getHeaders()
+        if format == "binary":
+            headers["accept"] = "application/octet-stream"
+        data = None
+        if isinstance(body, (bytes, bytearray)):
+            headers["Content-Type"] = "application/octet-stream"
+            data = body
+        elif body is not None:
+            headers["Content-Type"] = "application/json"
+            data = json.dumps(body)
+
+        session = self._getSession()
+        url = self._base_url + req
+        retries = self._conn._retries
+        self.log.info(f"async {method}: {req} [{params['domain']}]")
+
+        for attempt in range(retries + 1):
+            status = None
+            try:
+                async with session.request(method, url, params=params, headers=headers, data=data) as rsp:
+                    status = rsp.status
+                    if status not in RETRY_STATUS or attempt == retries:
+                        if status == 409:
+                            raise ValueError("name already exists")
+                        if status not in (200, 201):
+                            self.log.error(f"async {method} error - status_code: {status}, reason: {rsp.reason}")
+                            raise IOError(status, rsp.reason)
+                        content_type = rsp.headers.get("Content-Type", "")
+                        if content_type.startswith("application/octet-stream"):
+                            return await rsp.read()
+                        return json.loads(await rsp.text())
+            except self._aiohttp.ClientConnectionError as ce:
+                if attempt == retries:
+                    self.log.error(f"connection error: {ce}")
+                    raise IOError("Connection Error")
+            # same schedule as the urllib3 Retry used by HttpConn: retry at once, then back off
+            backoff = min(self._conn._retry_backoff * 2 ** attempt, MAX_BACKOFF) if attempt > 0 else 0
+            self.log.warning(f"async {method} {req} got status: {status}, retrying in {backoff}s")
+            await asyncio.sleep(backoff)
+
+    async def GET(self, req, params=None, format="json"):
+        return await self.request("GET", req, params=params, format=format)
+
+    async def PUT(self, req, body=None, params=None, format="json"):
+        return await self.request("PUT", req, params=params, body=body, format=format)
+
+    async def POST(self, req, body=None, params=None, format="json"):
+        return await self.request("POST", req, params=params, body=body, format=format)
+
+    async def DELETE(self, req, params=None):
+        return await self.request("DELETE", req, params=params)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._conn.close()
+
+    @property
+    def http_conn(self):
+        """HttpConn used for configuration and authentication"""
+        return self._conn
+
+    @property
+    def domain(self):
+        return self._conn.domain
+
+    @property
+    def mode(self):
+        return self._conn.mode
+
+    @property
+    def pool_size(self):
+        """max number of connections the session will open"""
+        return self._pool_size
+
+
+class AsyncHLObject(object):
+
+    """
+        Base class for the async high level objects
+    """
+
+    def __init__(self, oid, http_conn, name=None, file=None):
+        self._id = oid
+        self._http_conn = http_conn
+        self._name = name
+        self._file = file
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        """Path of the object if known, otherwise None"""
+        return self._name
+
+    @property
+    def file(self):
+        """The AsyncFile this object belongs to"""
+        return self._file
+
+    @property
+    def http_conn(self):
+        return self._http_conn
+
+    @property
+    def log(self):
+        return self._http_conn.log
+
+    async def refresh(self):
+        """Get the latest metadata for the object from the server"""
+        req = f"/{self._id.collection_type}/{self._id.uuid}"
+        obj_json = await self._http_conn.GET(req)
+        self._id = self._id.__class__(None, obj_json, http_conn=self._http_conn.http_conn)
+
+    def __eq__(self, other):
+        if hasattr(other, "id"):
+            return self.id == other.id
+        return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._id.uuid)
+
+
+def _joinPath(parent, name):
+    if parent is None:
+        return None
+    if parent.endswith("/"):
+        return parent + name
+    return parent + "/" + name
+
+
+class AsyncGroup(AsyncHLObject):
+
+    """
+        Async counterpart of Group
+    """
+
+    async def _getObject(self, obj_id, name):
+        """Return an AsyncGroup or AsyncDataset for the given id"""
+        sync_conn = self._http_conn.http_conn
+        if obj_id.startswith("g-"):
+            obj_json = await self._http_conn.GET(f"/groups/{obj_id}")
+            return AsyncGroup(GroupID(None, obj_json, http_conn=sync_conn), self._http_conn, name, self._file)
+        if obj_id.startswith("d-"):
+            obj_json = await self._http_conn.GET(f"/datasets/{obj_id}")
+            return AsyncDataset(DatasetID(None, obj_json, http_conn=sync_conn), self._http_conn, name, self._file)
+        raise TypeError(f"Unsupported object type for id: {obj_id}")
+
+    async def get(self, name):
+        """Return the group or dataset at path name, relative to this group
+        (or to the root group if name starts with "/")"""
+        if name.startswith("/"):
+            obj = self._file
+            path = "/"
+        else:
+            obj = self
+            path = self._name
+        for title in name.split("/"):
+            if not title:
+                continue
+            if not isinstance(obj, AsyncGroup):
+                raise KeyError(f"Unable to open object (Component not found: {name})")
+            req = f"/groups/{obj.id.uuid}/links/{quote(title, safe='')}"
+            try:
+                rsp = await self._http_conn.GET(req)
+            except IOError as ioe:
+                if ioe.errno == 404:
+                    raise KeyError(f"Unable to open object (Component not found: {title})")
+                raise
+            link_json = rsp["link"]
+            link_class = link_json["class"]
+            path = _joinPath(path, title)
+            if link_class == "H5L_TYPE_HARD":
+                obj = await obj._getObject(link_json["id"], path)
+            elif link_class == "H5L_TYPE_SOFT":
+                obj = await obj.get(link_json["h5path"])
+            else:
+                raise NotImplementedError(f"{link_class} links are not supported by the async API")
+        return obj
+
+    async def keys(self):
+        """Return the names of the links in this group"""
+        rsp = await self._http_conn.GET(f"/groups/{self._id.uuid}/links")
+        return [link["title"] for link in rsp["links"]]
+
+    async def _getParent(self, name):
+        """Return the group that will hold the new link name, and the link title"""
+        path, _, title = name.rstrip("/").rpartition("/")
+        if not title:
+            raise ValueError("invalid name")
+        if path or name.startswith("/"):
+            parent = await self.get(path or "/")
+            if not isinstance(parent, AsyncGroup):
+                raise TypeError(f"{path} is not a group")
+        else:
+            parent = self
+        return parent, title
+
+    async def create_group(self, name):
+        """Create and return a new subgroup"""
+        parent, title = await self._getParent(name)
+        body = {"link": {"id": parent.id.uuid, "name": title}}
+        rsp = await self._http_conn.POST("/groups", body=body)
+        obj_json = await self._http_conn.GET(f"/groups/{rsp['id']}")
+        gid = GroupID(None, obj_json, http_conn=self._http_conn.http_conn)
+        return AsyncGroup(gid, self._http_conn, _joinPath(parent.name, title), self._file)
+
+    async def create_dataset(self, name, shape=None, dtype=None, data=None, chunks=None, maxshape=None):
+        """Create and return a new dataset.  If data is given, it is written to the dataset"""
+        if data is not None:
+            data = array_for_new_object(data, specified_dtype=dtype)
+            if shape is None:
+                shape = data.shape
+            if dtype is None:
+                dtype = data.dtype
+        if shape is None:
+            raise TypeError("One of data, shape or dtype must be specified")
+        if dtype is None:
+            dtype = numpy.dtype("=f4")
+        dtype = numpy.dtype(dtype)
+        if isinstance(shape, int):
+            shape = (shape,)
+        shape = tuple(shape)
+
+        parent, title = await self._getParent(name)
+        body = {"type": getTypeItem(dtype), "shape": list(shape)}
+        body["link"] = {"id": parent.id.uuid, "name": title}
+        if maxshape is not None:
+            body["maxdims"] = [m if m is not None else 0 for m in maxshape]
+        if chunks is not None:
+            body["creationProperties"] = {"layout": {"class": "H5D_CHUNKED", "dims": list(chunks)}}
+        rsp = await self._http_conn.POST("/datasets", body=body)
+        obj_json = await self._http_conn.GET(f"/datasets/{rsp['id']}")
+        dsid = DatasetID(None, obj_json, http_conn=self._http_conn.http_conn)
+        dset = AsyncDataset(dsid, self._http_conn, _joinPath(parent.name, title), self._file)
+        if data is not None:
+            await dset.write(Ellipsis, data)
+        return dset
+
+    def __repr__(self):
+        return f"<Async HDF5 group \"{self._name}\">"
+
+
+class AsyncDataset(AsyncHLObject):
+
+    """
+        Async counterpart of Dataset
+    """
+
+    def __init__(self, oid, http_conn, name=None, file=None):
+        AsyncHLObject.__init__(self, oid, http_conn, name=name, file=file)
+        shape_json = oid.shape_json
+        if shape_json["class"] == "H5S_NULL":
+            self._shape = None
+        elif shape_json["class"] == "H5S_SCALAR":
+            self._shape = ()
+        else:
+            self._shape = tuple(shape_json["dims"])
+        self._dtype = oid.get_type()
+
+    @property
+    def shape(self):
+        return self._shape
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def ndim(self):
+        return len(self._shape)
+
+    @property
+    def size(self):
+        return int(numpy.prod(self._shape, dtype=numpy.int64))
+
+    @property
+    def chunks(self):
+        chunks = self._id.chunks
+        if chunks is None:
+            return None
+        return tuple(chunks)
+
+    def _getQueryParam(self, start, stop, step):
+        return "[" + ",".join(f"{a}:{b}:{c}" for a, b, c in zip(start, stop, step)) + "]"
+
+    def _toArray(self, rsp, mshape):
+        if isinstance(rsp, bytes):
+            return bytesToArray(rsp, self._dtype, mshape)
+        return jsonToArray(mshape, self._dtype, rsp["value"])
+
+    async def _readHyperslab(self, start, count, step):
+        """Read the region given by start, count and step (one value per dimension).
+        If the server rejects the request as too large, read it in two halves."""
+        req = f"/datasets/{self._id.uuid}/value"
+        stop = [s + (c - 1) * t + 1 for s, c, t in zip(start, count, step)]
+        params = {"select": self._getQueryParam(start, stop, step)}
+        if self._http_conn.mode == "r":
+            params["nonstrict"] = 1
+        try:
+            rsp = await self._http_conn.GET(req, params=params, format="binary")
+            return self._toArray(rsp, tuple(count)).reshape(count)
+        except IOError as ioe:
+            if ioe.errno != 413 or max(count) < 2:
+                raise
+        # split along the dimension with the most elements
+        split_dim = int(numpy.argmax(count))
+        first_count = list(count)
+        first_count[split_dim] = count[split_dim] // 2
+        second_count = list(count)
+        second_count[split_dim] = count[split_dim] - first_count[split_dim]
+        second_start = list(start)
+        second_start[split_dim] += first_count[split_dim] * step[split_dim]
+        self.log.info(f"request too large, splitting along dimension {split_dim}")
+        first, second = await asyncio.gather(
+            self._readHyperslab(start, first_count, step),
+            self._readHyperslab(second_start, second_count, step),
+        )
+        return numpy.concatenate((first, second), axis=split_dim)
+
+    async def read(self, args=Ellipsis):
+        """Read the given selection (anything accepted by Dataset.__getitem__)
+        and return it as a numpy array"""
+        if self._shape is None:
+            return Empty(self._dtype)
+        selection = sel.select(self, args)
+        if selection.nselect == 0:
+            return numpy.zeros(selection.mshape, dtype=self._dtype)
+        req = f"/datasets/{self._id.uuid}/value"
+
+        if isinstance(selection, sel.ScalarSelection):
+            rsp = await self._http_conn.GET(req, format="binary")
+            return self._toArray(rsp, ())[()]
+
+        if isinstance(selection, sel.SimpleSelection):
+            arr = await self._readHyperslab(selection.start, selection.count, selection.step)
+            arr = arr.reshape(selection.mshape)
+        elif isinstance(selection, sel.FancySelection):
+            params = {"select": selection.getQueryParam()}
+            if len(params["select"]) > MAX_SELECT_QUERY_LEN:
+                rsp = await self._http_conn.POST(req, body=params, format="binary")
+            else:
+                rsp = await self._http_conn.GET(req, params=params, format="binary")
+            arr = self._toArray(rsp, selection.mshape)
+        elif isinstance(selection, sel.PointSelection):
+            points = numpy.asarray(selection.points, dtype="u8")
+            rsp = await self._http_conn.POST(req, body=points.tobytes(), format="binary")
+            arr = self._toArray(rsp, selection.mshape)
+        else:
+            raise ValueError(f"Unsupported selection: {selection}")
+
+        if arr.shape == ():
+            return arr[()]
+        return arr
+
+    async def write(self, args, val):
+        """Write val to the given selection.  Only hyperslab selections (slices and
+        integer indexes) are supported"""
+        if self._shape is None:
+            raise TypeError("Can't write to a dataset with a null dataspace")
+        selection = sel.select(self, args)
+        if not isinstance(selection, (sel.SimpleSelection, sel.ScalarSelection)):
+            raise TypeError("Only hyperslab selections are supported for async writes")
+        if selection.nselect == 0:
+            return
+        mshape = selection.mshape
+        arr = numpy.asarray(val, order="C", dtype=self._dtype)
+        if arr.shape != mshape:
+            arr = numpy.ascontiguousarray(numpy.broadcast_to(arr, mshape))
+
+        req = f"/datasets/{self._id.uuid}/value"
+        params = {}
+        if isinstance(selection, sel.SimpleSelection):
+            stop = [s + (c - 1) * t + 1 for s, c, t in zip(selection.start, selection.count, selection.step)]
+            params["select"] = self._getQueryParam(selection.start, stop, selection.step)
+        await self._http_conn.PUT(req, body=arrayToBytes(arr), params=params, format="binary")
+
+    def __repr__(self):
+        return f"<Async HDF5 dataset \"{self._name}\": shape {self._shape}, type \"{self._dtype.str}\">"
+
+
+class AsyncFile(AsyncGroup):
+
+    """
+        Async counterpart of File.  The domain is opened (or created) by "await f.open()",
+        or by using the file as an async context manager:
+
+            async with AsyncFile(domain, "a") as f:
+                dset = await f.create_dataset("dset", data=numpy.arange(10))
+    """
+
+    def __init__(self, domain, mode="r", pool_size=None, **kwds):
+        """Create a new file object.
+
+        domain
+            Path of the domain to access, e.g. /home/username/tall.h5
+        mode
+            Access mode: 'r', 'r+', 'w', or 'a'
+        pool_size
+            Max number of connections to the server.  If None, the "hs_async_pool_size"
+            config value is used (default 100)
+
+        Other keyword arguments (endpoint, username, password, bucket, api_key, retries,
+        timeout) are as for File.
+        """
+        if mode not in ("r", "r+", "w", "a"):
+            raise ValueError("Invalid mode; must be one of r, r+, w, a")
+        if domain.startswith("hdf5://"):
+            domain = domain[len("hdf5:/"):]
+        if not domain.startswith("/"):
+            raise IOError(400, "relative paths are not valid")
+        http_conn = AsyncHttpConn(domain, mode=mode, pool_size=pool_size, **kwds)
+        AsyncGroup.__init__(self, None, http_conn, name="/")
+        self._mode = mode
+        self._file = self
+
+    async def open(self):
+        """Open the domain, creating it if the mode allows"""
+        if self._id is not None:
+            return self
+        http_conn = self._http_conn
+        try:
+            root_json = await http_conn.GET("/")
+        except IOError as ioe:
+            if ioe.errno != 404 or self._mode in ("r", "r+"):
+                await http_conn.close()
+                raise
+            root_json = None
+        try:
+            if root_json is not None and self._mode == "w":
+                await http_conn.DELETE("/")
+                root_json = None
+            if root_json is None:
+                root_json = await http_conn.PUT("/", body={})
+            if "root" not in root_json:
+                raise IOError(404, "Location is a folder, not a file")
+            group_json = await http_conn.GET(f"/groups/{root_json['root']}")
+        except Exception:
+            await http_conn.close()
+            raise
+        self._id = GroupID(None, group_json, http_conn=http_conn.http_conn)
+        return self
+
+    def __await__(self):
+        return self.open().__await__()
+
+    async def close(self):
+        await self._http_conn.close()
+        self._id = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    @property
+    def filename(self):
+        return self._http_conn.domain
+
+    @property
+    def mode(self):
+        return "r" if self._mode == "r" else "r+"
+
+    def __bool__(self):
+        return self._id is not None
+
+    def __repr__(self):
+        if not self:
+            return "<Closed async HDF5 file>"
+        return f"<Async HDF5 file \"{self.filename}\" (mode {self.mode})>"
@@ -399,11 +399,15 @@ class AttributeManager(base.MutableMappingHDF5, base.CommonStateObject):
             for key in attributes[names[0]]:
                 body[key] = attributes[names[0]][key]
 
-        try:
-            self._parent.PUT(req, body=body, params=params)
-        except RuntimeError:
-            # 'replace' parameter is used, so failure is not due to attribute already existing
-            raise RuntimeError("Failued to create attribute(s)")
+        def put_attributes():
+            try:
+                self._parent.PUT(req, body=body, params=params)
+            except RuntimeError:
+                # 'replace' parameter is used, so failure is not due to attribute already existing
+                raise RuntimeError("Failued to create attribute(s)")
+
+        # with write_behind enabled, the request is sent from a background thread
+        self._parent._queueWrite(("attributes", tuple(names)), put_attributes)
 
     def modify(self, name, value):
         """ Change the value of an attribute while preserving its type.
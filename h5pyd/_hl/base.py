@@ -16,6 +16,8 @@ import posixpath
 import os
 import sys
 import json
+import struct
+import itertools
 import numpy as np
 import logging
 import logging.handlers
@@ -23,6 +25,7 @@ from collections.abc import (
     Mapping, MutableMapping, KeysView, ValuesView, ItemsView
 )
 from .objectid import GroupID
+from .httpconn import decompressBody, isDecodedByUrllib3
 from .h5type import Reference, check_dtype, special_dtype
 
 numpy_integer_types = (np.int8, np.uint8, np.int16, np.int16, np.int32, np.uint32, np.int64, np.uint64)
@@ -240,6 +243,36 @@ def copyToArray(arr, rank, index, data, vlen_base=None):
     index[rank] = 0
 
 
+def _flattenJson(data_shape, data):
+    """
+    Return list of the elements of the given nested JSON array,
+    checking that it matches data_shape
+    """
+    items = [data]
+    for dim in data_shape:
+        for x in items:
+            if type(x) not in (list, tuple) or len(x) != dim:
+                nlen = len(x) if type(x) in (list, tuple) else 0
+                msg = f"Array len of {dim} doesn't match data length: {nlen}"
+                raise ValueError(msg)
+        items = list(itertools.chain.from_iterable(items))
+    return items
+
+
+def _isColumnCompound(dt):
+    """
+    Return True if dt is a compound type that can be built a column at a
+    time from a list of JSON records
+    """
+    if dt.names is None:
+        return False
+    for name in dt.names:
+        field_dt = dt[name]
+        if field_dt.names is not None or field_dt.hasobject:
+            return False
+    return True
+
+
 def jsonToArray(data_shape, data_dtype, data_json):
     """Return numpy array from the given json array."""
 
@@ -277,18 +310,49 @@ def jsonToArray(data_shape, data_dtype, data_json):
         raise TypeError("expected list data for compound data type")
 
     vlen_base = check_dtype(vlen=data_dtype)
+    npoints = int(np.prod(data_shape))
     if vlen_base:
         # for vlen types, convert each element to a ndarray
-        arr = np.zeros(data_shape, dtype=data_dtype)
-        index = []
-        for i in range(len(data_shape)):
-            index.append(0)
         if data_shape == ():
+            arr = np.zeros(data_shape, dtype=data_dtype)
             arr[()] = data_json
         else:
-            copyToArray(arr, 0, index, data_json, vlen_base=vlen_base)
+            items = _flattenJson(data_shape, data_json)
+            if vlen_base in (str, bytes):
+                elements = (str(e) for e in items)
+            else:
+                elements = (_jsonToVlenElement(e, vlen_base) for e in items)
+            arr = np.empty((npoints,), dtype=data_dtype)
+            arr[...] = np.fromiter(elements, dtype=object, count=npoints)
+            arr = arr.reshape(data_shape)
+    elif data_dtype.names is None and not data_dtype.shape and type(data_json) in (list, tuple):
+        # numpy can convert nested lists directly
+        arr = np.asarray(data_json, dtype=data_dtype)
+        if arr.size != npoints:
+            msg = "Input data doesn't match selection number of elements"
+            msg += f" Expected {npoints}, but received: {arr.size}"
+            raise ValueError(msg)
+        if arr.shape != data_shape:
+            arr = arr.reshape(data_shape)  # reshape to match selection
+    elif len(data_dtype) > 1 and _isColumnCompound(data_dtype):
+        # build the array one field at a time
+        if data_shape == () or (npoints == 1 and len(data_json) == len(data_dtype)):
+            records = [data_json]
+        else:
+            records = _flattenJson(data_shape, data_json)
+        if len(records) != npoints:
+            msg = "Input data doesn't match selection number of elements"
+            msg += f" Expected {npoints}, but received: {len(records)}"
+            raise ValueError(msg)
+        nfields = len(data_dtype)
+        for record in records:
+            if type(record) not in (list, tuple) or len(record) != nfields:
+                raise ValueError(f"Expected {nfields} field values, but got: {record}")
+        arr = np.empty((npoints,), dtype=data_dtype)
+        for i, name in enumerate(data_dtype.names):
+            arr[name] = [record[i] for record in records]
+        arr = arr.reshape(data_shape)
     else:
-        npoints = int(np.prod(data_shape))
         if type(data_json) in (list, tuple):
             np_shape_rank = len(data_shape)
             converted_data = []
@@ -312,6 +376,17 @@ def jsonToArray(data_shape, data_dtype, data_json):
     return arr
 
 
+def _jsonToVlenElement(e, vlen_base):
+    """
+    Convert JSON value to ndarray for a vlen element
+    """
+    e = np.array(e, dtype=vlen_base)
+    if len(e.shape) > 1:
+        # squeeze dimensions, but don't convert a 1-d to 0-d
+        e = e.squeeze()
+    return e
+
+
 def isVlen(dt):
     """
     Return True if the type contains variable length elements
@@ -395,10 +470,12 @@ def copyBuffer(src, des, offset):
     """
     Copy to buffer at given offset
     """
-    for i in range(len(src)):
-        des[i + offset] = src[i]
+    end = offset + len(src)
+    if end > len(des):
+        raise IndexError("bytearray index out of range")
+    des[offset:end] = src
 
-    return offset + len(src)
+    return end
 
 
 def copyElement(e, dt, buffer, offset, vlen=None):
@@ -545,6 +622,205 @@ def readElement(buffer, offset, arr, index, dt):
     return offset
 
 
+def _getVlenLayout(dt):
+    """
+    Return a list of (name, field_dtype, vlen_base) tuples describing how the
+    elements of dt are laid out in a bytestream, or None if dt is a type the
+    bulk decoder doesn't handle (e.g. vlen fields of nested compound types)
+    """
+    if len(dt) > 1:
+        fields = [(name, dt[name]) for name in dt.names]
+    else:
+        fields = [(None, dt)]
+    layout = []
+    for name, field_dt in fields:
+        if isVlen(field_dt):
+            if len(field_dt) > 1 or field_dt.shape:
+                return None
+            layout.append((name, field_dt, field_dt.metadata["vlen"]))
+        elif field_dt.hasobject:
+            return None
+        else:
+            layout.append((name, field_dt, None))
+    return layout
+
+
+def _scanVlenBuffer(data, nelements, layout):
+    """
+    Get the start offset and byte count of each field of each element
+    in the given bytestream.  If nelements is None, read elements till the
+    end of the buffer.  Returns two int64 arrays of shape (nelements, nfields).
+    """
+    field_sizes = [None if vlen else field_dt.itemsize for (_, field_dt, vlen) in layout]
+    unpack_from = struct.Struct("<i").unpack_from
+    data_len = len(data)
+    starts = []
+    counts = []
+    offset = 0
+    index = 0
+    try:
+        while index != nelements and (nelements is not None or offset < data_len):
+            for field_size in field_sizes:
+                if field_size is None:
+                    count = unpack_from(data, offset)[0]
+                    offset += 4
+                else:
+                    count = field_size
+                starts.append(offset)
+                counts.append(count)
+                offset += count
+            index += 1
+    except struct.error:
+        raise ValueError("Unexpected variable length data format")
+    if offset > data_len:
+        raise ValueError("Unexpected variable length data format")
+
+    starts = np.array(starts, dtype=np.int64).reshape((index, len(layout)))
+    counts = np.array(counts, dtype=np.int64).reshape((index, len(layout)))
+    if counts.size > 0:
+        if counts.min() < 0:
+            # shouldn't be negative
+            raise ValueError("Unexpected count value for variable length element")
+        if counts.max() > 1024 * 1024 * 1024:
+            raise ValueError("Variable length element size expected to be less than 1MB")
+    return starts, counts
+
+
+def _gatherBytes(buffer, starts, counts):
+    """
+    Return a contiguous copy of the (start, count) regions of the uint8
+    array buffer
+    """
+    ends = np.cumsum(counts)
+    index = np.arange(int(ends[-1]) if len(ends) else 0, dtype=np.int64)
+    index += np.repeat(starts - (ends - counts), counts)
+    return buffer[index]
+
+
+def _readVlenElements(data, buffer, starts, counts, vlen):
+    """
+    Return a 1d object array of the variable length elements at the
+    given (start, count) regions of data
+    """
+    nelements = len(starts)
+    if vlen in (bytes, str):
+        # vlen strings are returned as bytes
+        items = (data[start:(start + count)] for start, count in zip(starts.tolist(), counts.tolist()))
+        return np.fromiter(items, dtype=object, count=nelements)
+
+    vlen = np.dtype(vlen)
+    if np.any(counts % vlen.itemsize):
+        raise ValueError("variable length element size is not a multiple of the element size")
+    values = _gatherBytes(buffer, starts, counts).view(vlen)
+    ends = np.cumsum(counts // vlen.itemsize)
+    bounds = zip((ends - counts // vlen.itemsize).tolist(), ends.tolist())
+    return np.fromiter((values[start:end] for start, end in bounds), dtype=object, count=nelements)
+
+
+def _vlenBytesToArray(data, dt, nelements, layout):
+    """
+    Decode a bytestream of variable length elements to a 1d array.
+
+    The length prefixes are scanned in one pass, then each field is
+    materialized in bulk (fixed-size fields with one numpy gather).
+    """
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    starts, counts = _scanVlenBuffer(data, nelements, layout)
+    nelements = len(starts)
+    buffer = np.frombuffer(data, dtype=np.uint8)
+
+    arr = np.zeros((nelements,), dtype=dt)
+    for i, (name, field_dt, vlen) in enumerate(layout):
+        if vlen:
+            values = _readVlenElements(data, buffer, starts[:, i], counts[:, i], vlen)
+        else:
+            field_index = starts[:, i:(i + 1)] + np.arange(field_dt.itemsize, dtype=np.int64)
+            values = buffer[field_index].view(field_dt.base)
+            values = values.reshape((nelements,) + field_dt.shape)
+        if name is None:
+            arr[...] = values
+        else:
+            arr[name] = values
+    return arr
+
+
+def _vlenElementBytes(e, vlen):
+    """
+    Return the bytes stored for the given variable length element
+    (not including the length prefix)
+    """
+    if isinstance(e, bytes):
+        return e
+    if isinstance(e, str):
+        if vlen == str:
+            encoding = "utf-8"
+        else:
+            encoding = "ascii"
+        return e.encode(encoding)
+    if isinstance(e, np.ndarray):
+        if e.dtype.kind != 'O':
+            return e.tobytes()
+        return np.asarray(e.reshape((e.size,)), dtype=vlen).tobytes()
+    if isinstance(e, (list, tuple)):
+        return np.asarray(e, dtype=vlen).tobytes()
+    # uninitialized variable length element
+    if e and not np.isnan(e):
+        raise ValueError(f"Unexpected value: {e}")
+    return b""
+
+
+def _vlenArrayToBytes(arr1d, layout):
+    """
+    Encode a 1d array to a bytestream.
+
+    Each element is written as its fields in order, with variable length
+    fields preceded by their byte count as a 4-byte int.  The length
+    prefixes and fixed-size fields (the "head" of each element) are built
+    column-wise and the output buffer is allocated once and filled with two
+    masked assignments.
+    """
+    nelements = arr1d.shape[0]
+    head_columns = []
+    payload_columns = []
+    seg_sizes = []
+    for name, field_dt, vlen in layout:
+        values = arr1d if name is None else arr1d[name]
+        if vlen:
+            payloads = [_vlenElementBytes(e, vlen) for e in values]
+            counts = np.fromiter(map(len, payloads), dtype=np.int64, count=nelements)
+            head_columns.append(counts.astype("<i4").view(np.uint8).reshape((nelements, 4)))
+            payload_columns.append(payloads)
+            seg_sizes.append(counts + 4)
+        else:
+            if field_dt.names is None and not field_dt.shape and not field_dt.isnative:
+                # elements are written as numpy scalars, which are native order
+                values = values.astype(field_dt.newbyteorder("="))
+            values = np.ascontiguousarray(values)
+            head_columns.append(values.view(np.uint8).reshape((nelements, field_dt.itemsize)))
+            seg_sizes.append(np.full(nelements, field_dt.itemsize, dtype=np.int64))
+
+    head = np.concatenate(head_columns, axis=1)
+    seg_sizes = np.stack(seg_sizes, axis=1).reshape(-1)
+    seg_starts = np.cumsum(seg_sizes) - seg_sizes
+    head_widths = np.tile([column.shape[1] for column in head_columns], nelements)
+    total_size = int(seg_sizes.sum())
+
+    # mark the bytes belonging to the head of each element
+    head_index = np.arange(head.size, dtype=np.int64)
+    head_index += np.repeat(seg_starts - (np.cumsum(head_widths) - head_widths), head_widths)
+    is_head = np.zeros(total_size, dtype=bool)
+    is_head[head_index] = True
+
+    buffer = bytearray(total_size)
+    out = np.frombuffer(buffer, dtype=np.uint8)
+    out[is_head] = head.reshape(-1)
+    if payload_columns:
+        payload = b"".join(itertools.chain.from_iterable(zip(*payload_columns)))
+        out[~is_head] = np.frombuffer(payload, dtype=np.uint8)
+    return buffer
+
+
 def arrayToBytes(arr, vlen=None):
     """
     Return byte representation of numpy array
@@ -555,6 +831,17 @@ def arrayToBytes(arr, vlen=None):
 
     nElements = int(np.prod(arr.shape))
     arr1d = arr.reshape((nElements,))
+    dt = arr1d.dtype
+    if len(dt) > 1:
+        layout = _getVlenLayout(dt)
+    else:
+        if vlen is None:
+            vlen = dt.metadata["vlen"]
+        layout = [(None, dt, vlen)]
+    if layout is not None and nElements > 0:
+        return _vlenArrayToBytes(arr1d, layout)
+
+    # encode element by element
     nSize = getByteArraySize(arr1d)
     buffer = bytearray(nSize)
     offset = 0
@@ -568,16 +855,26 @@ def bytesToArray(data, dt, shape):
     """
     Create numpy array based on byte representation
     """
-    nelements = getNumElements(shape)
+    if shape is None:
+        nelements = None  # read all the elements in data
+    else:
+        nelements = getNumElements(shape)
 
     if not isVlen(dt):
         # regular numpy from string
         arr = np.frombuffer(data, dtype=dt)
     else:
-        arr = np.zeros((nelements,), dtype=dt)
-        offset = 0
-        for index in range(nelements):
-            offset = readElement(data, offset, arr, index, dt)
+        layout = _getVlenLayout(dt)
+        if layout is not None:
+            arr = _vlenBytesToArray(data, dt, nelements, layout)
+        else:
+            # decode element by element
+            if nelements is None:
+                raise ValueError("shape must be given for this type")
+            arr = np.zeros((nelements,), dtype=dt)
+            offset = 0
+            for index in range(nelements):
+                offset = readElement(data, offset, arr, index, dt)
 
     if shape is not None:
         if shape == () and dt.shape:
@@ -964,45 +1261,145 @@ class HLObject(CommonStateObject):
                 return False
         return True
 
-    def GET(self, req, params=None, use_cache=True, format="json"):
+    def _getWireBytes(self, rsp, default):
+        """Return the number of bytes of the response body read from the network"""
+        raw = getattr(rsp, "raw", None)
+        if hasattr(raw, "tell"):
+            try:
+                return raw.tell()
+            except Exception:
+                pass
+        return default
+
+    def _getBinaryContent(self, rsp, out=None):
+        """Read the body of a binary response.
+
+        When the server gives a Content-Length and the body isn't http-compressed,
+        the socket is read directly into a preallocated buffer.  If out (a writable,
+        C-contiguous buffer such as an ndarray) is given and is the same size as the
+        response, that buffer is used and returned, so the data lands in its
+        final location with no intermediate copies.
+        """
+        content_length = None
+        if 'Content-Length' in rsp.headers:
+            # not available when http compression is used
+            self.log.debug("returning binary content, length: " + rsp.headers['Content-Length'])
+            try:
+                content_length = int(rsp.headers['Content-Length'])
+            except ValueError:
+                pass
+        else:
+            self.log.debug("returning binary content - length unknown")
+
+        if out is not None:
+            out_view = memoryview(out).cast("B")
+        else:
+            out_view = None
+
+        content_encoding = rsp.headers.get('Content-Encoding', 'identity')
+        raw = getattr(rsp, "raw", None)
+        fp = getattr(raw, "_fp", None)  # the underlying http.client response
+        transfer_stats = self.id.http_conn.transfer_stats
+
+        if content_length and content_encoding == 'identity' and hasattr(fp, "readinto"):
+            if out_view is not None and out_view.nbytes == content_length:
+                rsp_content = out
+                buffer = out_view
+            else:
+                rsp_content = bytearray(content_length)
+                buffer = memoryview(rsp_content)
+            downloaded_bytes = 0
+            while downloaded_bytes < content_length:
+                n = fp.readinto(buffer[downloaded_bytes:])
+                if not n:
+                    break
+                downloaded_bytes += n
+            if downloaded_bytes != content_length:
+                msg = f"expected {content_length} bytes, but got {downloaded_bytes}"
+                self.log.warning(msg)
+                raise IOError(msg)
+            # body has been fully consumed, so connection can go back to the pool
+            raw.release_conn()
+            self.log.info(f"read {downloaded_bytes} bytes")
+            transfer_stats.addRead(self.id.uuid, downloaded_bytes, downloaded_bytes)
+            return rsp_content
+
+        if not isDecodedByUrllib3(content_encoding):
+            # e.g. lz4 - urllib3 passes the body through as is
+            wire_content = rsp.content
+            rsp_content = decompressBody(wire_content, content_encoding)
+            self.log.info(f"decoded {len(wire_content)} {content_encoding} bytes to {len(rsp_content)} bytes")
+            transfer_stats.addRead(self.id.uuid, len(rsp_content), len(wire_content))
+            if out_view is not None and out_view.nbytes == len(rsp_content):
+                out_view[:] = rsp_content
+                return out
+            return rsp_content
+
+        # size of the decoded content isn't known up front, read in blocks
+        HTTP_CHUNK_SIZE = 1024 * 1024
+        rsp_content = bytearray()
+        downloaded_bytes = 0
+        for http_chunk in rsp.iter_content(chunk_size=HTTP_CHUNK_SIZE):
+            if not http_chunk:
+                continue  # filter out keep alive chunks
+            self.log.debug(f"got http_chunk - {len(http_chunk)} bytes")
+            next_offset = downloaded_bytes + len(http_chunk)
+            if out_view is not None and next_offset <= out_view.nbytes:
+                out_view[downloaded_bytes:next_offset] = http_chunk
+            else:
+                if out_view is not None:
+                    # more data than expected, stop using the output buffer
+                    rsp_content += out_view[:downloaded_bytes]
+                    out_view = None
+                rsp_content += http_chunk
+            downloaded_bytes = next_offset
+        if downloaded_bytes == 0:
+            raise IOError("no data returned")
+        wire_bytes = self._getWireBytes(rsp, downloaded_bytes)
+        self.log.info(f"retrieved {downloaded_bytes} total bytes ({wire_bytes} bytes {content_encoding})")
+        transfer_stats.addRead(self.id.uuid, downloaded_bytes, wire_bytes)
+        if out_view is not None:
+            if downloaded_bytes == out_view.nbytes:
+                return out
+            rsp_content = bytearray(out_view[:downloaded_bytes])
+        return rsp_content
+
+    def _waitWrites(self):
+        """Wait for any queued writes to this object (see HttpConn write_behind) to be sent,
+        so requests see the result of earlier writes"""
+        write_queue = self.id.http_conn.write_queue
+        if write_queue is not None:
+            write_queue.wait(self.id.uuid)
+
+    def _queueWrite(self, region, func):
+        """Call func to write region of this object, or if write_behind is enabled, queue it
+        to be called from a background thread.  Queued writes to the same region may be
+        coalesced, pass None for region if the write shouldn't be"""
+        write_queue = self.id.http_conn.write_queue
+        if write_queue is None:
+            func()
+        else:
+            write_queue.submit(self.id.uuid, region, func)
+
+    def GET(self, req, params=None, use_cache=True, format="json", out=None, size_hint=None):
         if self.id.http_conn is None:
             raise IOError("object not initialized")
-        # This should be the default - but explictly set anyway
-        headers = {"Accept-Encoding": "deflate, gzip"}
+        self._waitWrites()
+        if format == "binary":
+            # let HttpConn decide whether it's worth compressing the response
+            if size_hint is None and out is not None:
+                size_hint = memoryview(out).nbytes
+            headers = {"Accept-Encoding": self.id.http_conn.getAcceptEncoding(size_hint)}
+        else:
+            # This should be the default - but explictly set anyway
+            headers = {"Accept-Encoding": "deflate, gzip"}
 
         rsp = self.id._http_conn.GET(req, params=params, headers=headers, format=format, use_cache=use_cache)
         if rsp.status_code != 200:
             self.log.info(f"Got response: {rsp.status_code}")
             raise IOError(rsp.status_code, rsp.reason)
         if 'Content-Type' in rsp.headers and rsp.headers['Content-Type'] == "application/octet-stream":
-            if 'Content-Length' in rsp.headers:
-                # not available when http compression is used
-                self.log.debug("returning binary content, length: " + rsp.headers['Content-Length'])
-            else:
-                self.log.debug("returning binary content - length unknown")
-            HTTP_CHUNK_SIZE = 4096
-            http_chunks = []
-            downloaded_bytes = 0
-            for http_chunk in rsp.iter_content(chunk_size=HTTP_CHUNK_SIZE):
-                if http_chunk:  # filter out keep alive chunks
-                    self.log.debug(f"got http_chunk - {len(http_chunk)} bytes")
-                    downloaded_bytes += len(http_chunk)
-                    http_chunks.append(http_chunk)
-            if len(http_chunks) == 0:
-                raise IOError("no data returned")
-            if len(http_chunks) == 1:
-                # can return first and only chunk as response
-                rsp_content = http_chunks[0]
-            else:
-                msg = f"retrieved {len(http_chunks)} http_chunks "
-                msg += f" {downloaded_bytes} total bytes"
-                self.log.info(msg)
-                rsp_content = bytearray(downloaded_bytes)
-                index = 0
-                for http_chunk in http_chunks:
-                    rsp_content[index:(index + len(http_chunk))] = http_chunk
-                    index += len(http_chunk)
-            return rsp_content
+            return self._getBinaryContent(rsp, out=out)
         else:
             # assume JSON
             rsp_json = json.loads(rsp.text)
@@ -1031,7 +1428,7 @@ class HLObject(CommonStateObject):
                 else:
                     raise RuntimeError(rsp.reason)
             else:
-                raise IOError(f"{rsp.reason}:{rsp.status_code}")
+                raise IOError(rsp.status_code, rsp.reason)
 
         if rsp.text:
             rsp_json = json.loads(rsp.text)
@@ -1040,12 +1437,16 @@ class HLObject(CommonStateObject):
     def POST(self, req, body=None, params=None, format="json"):
         if self.id.http_conn is None:
             raise IOError("object not initialized")
+        self._waitWrites()
 
         # try to do a POST to the domain
 
         self.log.info(f"POST: {req} [{self.id.domain}]")
 
-        rsp = self.id._http_conn.POST(req, body=body, params=params, format=format)
+        headers = None
+        if format == "binary":
+            headers = {"Accept-Encoding": self.id.http_conn.getAcceptEncoding()}
+        rsp = self.id._http_conn.POST(req, body=body, params=params, format=format, headers=headers)
         if rsp.status_code == 409:
             raise ValueError("name already exists")
         if rsp.status_code not in (200, 201):
@@ -1058,7 +1459,13 @@ class HLObject(CommonStateObject):
                 self.log.info("returning binary content, length: " + rsp.headers['Content-Length'])
             else:
                 self.log.info("returning binary compressed content")
-            return rsp.content
+            rsp_content = rsp.content
+            wire_bytes = self._getWireBytes(rsp, len(rsp_content))
+            content_encoding = rsp.headers.get('Content-Encoding', 'identity')
+            if not isDecodedByUrllib3(content_encoding):
+                rsp_content = decompressBody(rsp_content, content_encoding)
+            self.id.http_conn.transfer_stats.addRead(self.id.uuid, len(rsp_content), wire_bytes)
+            return rsp_content
         else:
             # assume JSON
             rsp_json = json.loads(rsp.text)
@@ -1067,6 +1474,7 @@ class HLObject(CommonStateObject):
     def DELETE(self, req, params=None):
         if self.id.http_conn is None:
             raise IOError("object not initialized")
+        self._waitWrites()
 
         # try to do a DELETE of the resource
 
@@ -0,0 +1,295 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+from __future__ import absolute_import
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+# matches requests that refer to a specific object, e.g. "/groups/g-1234/links/foo"
+_OBJ_REQ_PAT = re.compile(r"^/(?:groups|datasets|datatypes)/([^/]+)")
+
+
+def getObjectId(req):
+    """Return the id of the object the given request refers to, or None
+    for domain level requests (e.g. "/" or "/groups")"""
+    m = _OBJ_REQ_PAT.match(req)
+    if m is None:
+        return None
+    return m.group(1)
+
+
+class ChunkCache(object):
+    """
+    LRU cache of dataset chunks, bounded by the total number of bytes held.
+
+    Chunks are keyed by dataset uuid and chunk index (a tuple giving the
+    position of the chunk in the dataset's chunk grid).  Cached arrays are
+    made read-only, so callers must copy data out rather than modify them.
+    """
+
+    def __init__(self, max_bytes):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self._max_bytes = max_bytes
+        self._nbytes = 0
+        self._chunks = OrderedDict()  # (uuid, index) -> ndarray
+        self._dset_chunks = {}  # uuid -> set of indexes in the cache
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, dset_id, index):
+        """Return the cached chunk, or None if it's not in the cache"""
+        key = (dset_id, index)
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._chunks.move_to_end(key)
+        return chunk
+
+    def put(self, dset_id, index, chunk):
+        """Add chunk to the cache, evicting the least recently used chunks as needed"""
+        if chunk.nbytes > self._max_bytes:
+            return  # never going to fit
+        chunk.flags.writeable = False
+        key = (dset_id, index)
+        with self._lock:
+            self._remove(key)
+            self._chunks[key] = chunk
+            self._nbytes += chunk.nbytes
+            self._dset_chunks.setdefault(dset_id, set()).add(index)
+            while self._nbytes > self._max_bytes:
+                lru_key = next(iter(self._chunks))
+                self._remove(lru_key)
+
+    def _remove(self, key):
+        chunk = self._chunks.pop(key, None)
+        if chunk is None:
+            return
+        self._nbytes -= chunk.nbytes
+        dset_id, index = key
+        indexes = self._dset_chunks[dset_id]
+        indexes.discard(index)
+        if not indexes:
+            del self._dset_chunks[dset_id]
+
+    def invalidate(self, dset_id):
+        """Remove all the chunks of the given dataset"""
+        with self._lock:
+            for index in list(self._dset_chunks.get(dset_id, ())):
+                self._remove((dset_id, index))
+
+    def clear(self):
+        """Remove everything from the cache"""
+        with self._lock:
+            self._chunks.clear()
+            self._dset_chunks.clear()
+            self._nbytes = 0
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def __contains__(self, key):
+        return key in self._chunks
+
+    @property
+    def max_bytes(self):
+        """Upper bound on the number of bytes the cache will hold"""
+        return self._max_bytes
+
+    @property
+    def nbytes(self):
+        """Number of bytes currently held"""
+        return self._nbytes
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+
+class MetadataCache(object):
+    """
+    LRU cache of server responses for metadata requests, bounded by the number of items.
+
+    Responses are keyed by request path.  Entries are indexed by the id of the object the
+    request refers to, so that a write to one object only invalidates the responses for
+    that object (plus the domain level responses).  If ttl is given, entries older than
+    ttl seconds are treated as missing.
+    """
+
+    def __init__(self, max_items, ttl=None):
+        if max_items <= 0:
+            raise ValueError("max_items must be positive")
+        if ttl is not None and ttl <= 0:
+            ttl = None
+        self._max_items = max_items
+        self._ttl = ttl
+        self._items = OrderedDict()  # req -> (rsp, timestamp)
+        self._obj_reqs = {}  # obj id (None for domain level requests) -> set of reqs
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, req):
+        """Return the cached response, or None if it's not in the cache or has expired"""
+        with self._lock:
+            item = self._items.get(req)
+            if item is not None and self._ttl is not None:
+                if time.monotonic() - item[1] > self._ttl:
+                    self._remove(req)
+                    item = None
+            if item is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._items.move_to_end(req)
+        return item[0]
+
+    def put(self, req, rsp):
+        """Add rsp to the cache, evicting the least recently used items as needed"""
+        with self._lock:
+            self._remove(req)
+            self._items[req] = (rsp, time.monotonic())
+            self._obj_reqs.setdefault(getObjectId(req), set()).add(req)
+            while len(self._items) > self._max_items:
+                lru_req = next(iter(self._items))
+                self._remove(lru_req)
+
+    def _remove(self, req):
+        if self._items.pop(req, None) is None:
+            return
+        obj_id = getObjectId(req)
+        reqs = self._obj_reqs[obj_id]
+        reqs.discard(req)
+        if not reqs:
+            del self._obj_reqs[obj_id]
+
+    def invalidate(self, obj_id):
+        """Remove all the responses for the given object id.
+        An obj_id of None removes the domain level responses"""
+        with self._lock:
+            for req in list(self._obj_reqs.get(obj_id, ())):
+                self._remove(req)
+
+    def clear(self):
+        """Remove everything from the cache"""
+        with self._lock:
+            self._items.clear()
+            self._obj_reqs.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, req):
+        return req in self._items
+
+    @property
+    def max_items(self):
+        """Upper bound on the number of responses the cache will hold"""
+        return self._max_items
+
+    @property
+    def ttl(self):
+        """Seconds a response stays valid, or None if responses don't expire"""
+        return self._ttl
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+
+class DiskCache(object):
+    """
+    Persistent cache of domain objects (the "domain_objs" returned by a GET on the domain
+    with getobjs), shared by all processes using the same cache directory.
+
+    Entries are keyed by endpoint, bucket, domain and user, and are only returned if
+    the lastModified value of the domain matches the value stored with the entry.
+    Errors accessing the database are logged and treated as cache misses.
+    """
+
+    DB_NAME = "h5pyd_cache.db"
+
+    def __init__(self, cache_dir):
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        self._filepath = os.path.join(cache_dir, self.DB_NAME)
+        self.log = logging.getLogger("h5pyd")
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS domain_objs "
+                             "(key TEXT PRIMARY KEY, last_modified TEXT, objs TEXT)")
+        except sqlite3.Error as e:
+            self.log.warning(f"unable to initialize disk cache {self._filepath}: {e}")
+
+    def _connect(self):
+        return sqlite3.connect(self._filepath, timeout=30)
+
+    @staticmethod
+    def getKey(endpoint, bucket, domain, username=None):
+        """Return the cache key for the given domain"""
+        return f"{endpoint}|{bucket or ''}|{domain}|{username or ''}"
+
+    def get(self, key, last_modified):
+        """Return the cached domain objects, or None if not found or out of date"""
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute("SELECT last_modified, objs FROM domain_objs WHERE key = ?",
+                                   (key,)).fetchone()
+        except sqlite3.Error as e:
+            self.log.warning(f"disk cache get error: {e}")
+            return None
+        if row is None or row[0] != str(last_modified):
+            self.log.debug(f"disk cache miss: {key}")
+            return None
+        self.log.debug(f"disk cache hit: {key}")
+        return json.loads(row[1])
+
+    def put(self, key, last_modified, domain_objs):
+        """Save the domain objects for the given key"""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("INSERT OR REPLACE INTO domain_objs VALUES (?, ?, ?)",
+                             (key, str(last_modified), json.dumps(domain_objs)))
+        except sqlite3.Error as e:
+            self.log.warning(f"disk cache put error: {e}")
+
+    def invalidate(self, key):
+        """Remove the entry for the given key"""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM domain_objs WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self.log.warning(f"disk cache invalidate error: {e}")
+
+    @property
+    def filepath(self):
+        """Path to the cache database"""
+        return self._filepath
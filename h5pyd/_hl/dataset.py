@@ -13,20 +13,21 @@
 from __future__ import absolute_import
 
 import posixpath as pp
-from copy import copy
+import re
 import sys
+import itertools
 import time
 import numpy
-import os
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from concurrent.futures import as_completed
+from concurrent.futures import wait, FIRST_COMPLETED
 
 from .base import HLObject, jsonToArray, bytesToArray, arrayToBytes
-from .base import Empty, guess_dtype
+from .base import Empty, guess_dtype, isVlen
 from .h5type import Reference, RegionReference
 from .base import _decode
 from .objectid import DatasetID
+from .paging import MIN_PAGE_BYTES
+from .workerpool import WorkerPool
 from . import filters
 from . import selections as sel
 from .datatype import Datatype
@@ -479,6 +480,148 @@ class ChunkIterator(object):
         return tuple(slices)
 
 
+DEFAULT_APPEND_BUFFER_BYTES = 4 * 1024 * 1024  # default amount of row data to buffer
+MAX_SELECT_QUERY_LEN = 100  # use POST rather than GET for longer select params
+DEFAULT_READ_MANY_WORKERS = 16  # max number of concurrent requests for read_many
+MAX_BATCH_SELECTION_POINTS = 1024  # read_many batches selections up to this many elements
+MAX_POINTS_PER_REQUEST = 100000  # max number of points read_many puts in one request
+
+
+class DatasetAppender(object):
+    """
+    Buffer rows to append to an extensible dataset along one axis, and send them
+    in batches of whole chunks.  Each batch is a single request using the server-side
+    append, which extends the dataset and writes the rows in one step, so several
+    processes can append to the same dataset without overwriting each other's rows
+    (the rows of each batch are contiguous, but batches from different writers may
+    be interleaved).
+
+    Rows left over when the appender is closed are sent as a final, partial batch.
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, dset, axis=0, buffer_rows=None):
+        if not dset.id.uuid.startswith("d-"):
+            # Append ops only work with HSDS
+            raise ValueError("append not supported")
+        if dset.chunks is None:
+            raise TypeError("Only chunked datasets can be appended to")
+        rank = len(dset.shape)
+        if not (0 <= axis < rank):
+            raise ValueError(f"Invalid axis (0 to {rank - 1} allowed)")
+        maxshape = dset.maxshape
+        if maxshape is not None and maxshape[axis] is not None and maxshape[axis] <= dset.shape[axis]:
+            raise TypeError(f"Dataset can't be extended along axis {axis}")
+        if isinstance(dset.chunks, dict):
+            chunk_rows = dset.chunks["dims"][axis]
+        else:
+            chunk_rows = dset.chunks[axis]
+
+        self._dset = dset
+        self._axis = axis
+        self._row_shape = dset.shape[:axis] + dset.shape[axis + 1:]
+        self._vlen = check_dtype(vlen=dset.dtype)
+        if buffer_rows is None:
+            row_bytes = dset.dtype.itemsize * int(numpy.prod(self._row_shape))
+            num_chunks = DEFAULT_APPEND_BUFFER_BYTES // max(1, chunk_rows * row_bytes)
+            buffer_rows = chunk_rows * max(1, num_chunks)
+        elif buffer_rows < 1:
+            raise ValueError("buffer_rows must be positive")
+        else:
+            # round up to whole chunks
+            buffer_rows = -(-buffer_rows // chunk_rows) * chunk_rows
+        self._chunk_rows = chunk_rows
+        # rows are buffered with the append axis first
+        self._buffer = numpy.empty((buffer_rows,) + self._row_shape, dtype=dset.dtype)
+        self._count = 0  # number of rows in the buffer
+        self._rows_written = 0
+        self._closed = False
+
+    def append(self, rows):
+        """Add one row (an array with the shape of the dataset minus the append axis),
+        or a block of rows (same rank as the dataset) to the end of the dataset."""
+        if self._closed:
+            raise ValueError("appender is closed")
+        rows = numpy.asarray(rows, dtype=self._dset.dtype)
+        if rows.shape == self._row_shape:
+            rows = rows.reshape((1,) + self._row_shape)
+        else:
+            if rows.ndim != len(self._row_shape) + 1:
+                raise ValueError(f"expected rows of shape {self._row_shape}, got: {rows.shape}")
+            rows = numpy.moveaxis(rows, self._axis, 0)
+            if rows.shape[1:] != self._row_shape:
+                raise ValueError(f"expected rows of shape {self._row_shape}, got: {rows.shape[1:]}")
+
+        buffer_rows = self._buffer.shape[0]
+        index = 0
+        while index < rows.shape[0]:
+            if self._count == 0 and rows.shape[0] - index >= buffer_rows:
+                # send whole buffers worth directly, without copying
+                num_rows = (rows.shape[0] - index) // buffer_rows * buffer_rows
+                self._send(rows[index:index + num_rows])
+                index += num_rows
+                continue
+            num_rows = min(buffer_rows - self._count, rows.shape[0] - index)
+            self._buffer[self._count:self._count + num_rows] = rows[index:index + num_rows]
+            self._count += num_rows
+            index += num_rows
+            if self._count == buffer_rows:
+                self.flush()
+
+    def flush(self):
+        """Send any buffered rows to the server"""
+        if self._count > 0:
+            self._send(self._buffer[:self._count])
+            self._count = 0
+
+    def close(self):
+        """Send any buffered rows and update the dataset shape"""
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        if self._rows_written:
+            # pick up rows appended by other writers
+            self._dset.get_shape(check_server=True)
+
+    def _send(self, rows):
+        dset = self._dset
+        num_rows = rows.shape[0]
+        val = numpy.ascontiguousarray(numpy.moveaxis(rows, 0, self._axis))
+        body = arrayToBytes(val, vlen=self._vlen)
+        params = {"append": num_rows}
+        if self._axis != 0:
+            params["append_dim"] = self._axis
+        dset.log.debug(f"appending {num_rows} rows, {len(body)} bytes")
+        req = "/datasets/" + dset.id.uuid + "/value"
+        dset._waitWrites()  # don't get ahead of queued writes to the dataset
+        try:
+            dset.PUT(req, body=body, format="binary", params=params)
+        finally:
+            dset._invalidateChunkCache()
+        # other writers may have extended the dataset too, so this is a lower bound
+        shape = list(dset._shape)
+        shape[self._axis] += num_rows
+        dset._shape = tuple(shape)
+        self._rows_written += num_rows
+
+    @property
+    def buffer_rows(self):
+        """Number of rows sent in each full batch"""
+        return self._buffer.shape[0]
+
+    @property
+    def rows_written(self):
+        """Number of rows sent to the server so far"""
+        return self._rows_written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
 class Dataset(HLObject):
 
     """
@@ -611,6 +754,12 @@ class Dataset(HLObject):
         )
         return self[()]
 
+    @property
+    def transfer_stats(self):
+        """Dict of bytes read and written for this dataset's values, and the
+        number of bytes that went over the network for each"""
+        return self.id.http_conn.transfer_stats.get(self.id.uuid)
+
     @property
     def chunks(self):
         """Dataset chunks (or None)"""
@@ -844,14 +993,29 @@ class Dataset(HLObject):
 
         size = tuple(size)
 
-        # send the request to the server
+        # send the request to the server, after any queued writes
+        self._waitWrites()
         body = {"shape": size}
         req = "/datasets/" + self.id.uuid + "/shape"
         self.PUT(req, body=body)
+        self._invalidateChunkCache()  # edge chunks may have changed
         # self.id.set_extent(size)
         # h5f.flush(self.id)  # THG recommends
         self._shape = size  # save the new shape
 
+    def appender(self, axis=0, buffer_rows=None):
+        """Return a DatasetAppender for adding rows to the end of the dataset along
+        the given axis.  Rows are buffered client-side and sent in batches of
+        buffer_rows (rounded up to whole chunks; by default a few MB worth).
+
+        Example:
+
+            with dset.appender() as appender:
+                for row in rows:
+                    appender.append(row)
+        """
+        return DatasetAppender(self, axis=axis, buffer_rows=buffer_rows)
+
     def __len__(self):
         """The size of the first axis.  TypeError if scalar.
 
@@ -934,7 +1098,593 @@ class Dataset(HLObject):
         param += "]"
         return param
 
-    def __getitem__(self, args, new_dtype=None):
+    def _getPages(self, sel_start, sel_stop, sel_step, split_dim, mshape, mshape_split_dim, num_rows,
+                  des_index=0, max_pages=None):
+        """Divide a hyperslab selection into pages of num_rows along split_dim.
+
+        Returns a list of (select_param, page_mshape, slices) tuples, where
+        slices is the region of the target array the page will be copied to.
+        des_index is the position along mshape_split_dim of the target array
+        the first page is copied to.  If max_pages is given, at most that many
+        pages are returned.
+        """
+        pages = []
+        page_start = list(sel_start)
+        step = sel_step[split_dim]
+        while max_pages is None or len(pages) < max_pages:
+            page_stop = list(sel_stop)
+            page_stop[split_dim] = page_start[split_dim] + num_rows
+
+            if step > 1:
+                # make sure the stop is aligned with the step value
+                rem = (page_stop[split_dim] - sel_start[split_dim]) % step
+                if rem != 0:
+                    page_stop[split_dim] += step - rem
+            if page_stop[split_dim] > sel_stop[split_dim]:
+                page_stop[split_dim] = sel_stop[split_dim]
+
+            page_rows = 1 + (page_stop[split_dim] - page_start[split_dim] - 1) // step
+            page_mshape = list(mshape)
+            page_mshape[mshape_split_dim] = page_rows
+            slices = [slice(0, extent) for extent in mshape]
+            slices[mshape_split_dim] = slice(des_index, des_index + page_rows)
+            des_index += page_rows
+
+            select_param = self._getQueryParam(page_start, page_stop, sel_step)
+            pages.append((select_param, tuple(page_mshape), tuple(slices)))
+
+            if page_stop[split_dim] >= sel_stop[split_dim]:
+                break
+            page_start = list(page_start)
+            page_start[split_dim] = page_stop[split_dim]
+        return pages
+
+    def _bytesToArray(self, data, mtype, shape):
+        """Decode a binary response, using the connection's decode pool if there is one"""
+        decode_pool = self.id.http_conn.decode_pool
+        if decode_pool is None:
+            return bytesToArray(data, mtype, shape)
+        return decode_pool.decode(data, mtype, shape)
+
+    def _readPage(self, req, params, page, arr, mtype):
+        """Fetch one page of a hyperslab selection and copy it to its region of arr."""
+        select_param, page_mshape, slices = page
+        self.log.info(f"page select: {select_param} page_mshape: {page_mshape}")
+
+        page_params = dict(params)
+        page_params["select"] = select_param
+
+        page_out = arr[slices]
+        if isVlen(mtype):
+            page_out = None  # will need to copy the page into arr
+            size_hint = None
+        else:
+            size_hint = int(numpy.prod(page_mshape, dtype=numpy.int64)) * mtype.itemsize
+            if not page_out.flags["C_CONTIGUOUS"]:
+                page_out = None
+        rsp = self.GET(req, params=page_params, format="binary", out=page_out, size_hint=size_hint)
+        if page_out is not None and rsp is page_out:
+            self.log.debug("page read directly into target array")
+            return
+
+        if isinstance(rsp, str):
+            # hexencoded response?
+            # this is returned by API Gateway for lamba responses
+            rsp = bytes.fromhex(rsp)
+            # from here treat it like a byte responses
+        if type(rsp) in (bytes, bytearray):
+            # got binary response
+            # TBD - check expected number of bytes
+            self.log.info(f"binary response, {len(rsp)} bytes")
+            arr1d = self._bytesToArray(rsp, mtype, page_mshape)
+            page_arr = numpy.reshape(arr1d, page_mshape)
+        else:
+            # got JSON response
+            # need some special conversion for compound types --
+            # each element must be a tuple, but the JSON decoder
+            # gives us a list instead.
+            self.log.info("json response")
+
+            data = rsp["value"]
+            self.log.debug(data)
+
+            page_arr = jsonToArray(page_mshape, mtype, data)
+            self.log.debug(f"jsontoArray returned: {page_arr}")
+
+        self.log.debug(f"slices: {slices}")
+        arr[slices] = page_arr
+
+    def _getPageBytes(self, page, mtype):
+        """Return the number of bytes of data in the given page"""
+        return int(numpy.prod(page[1], dtype=numpy.int64)) * mtype.itemsize
+
+    def _readPageTimed(self, req, params, page, arr, mtype):
+        """Read a page and report how long it took to the page sizer"""
+        start_time = time.time()
+        self._readPage(req, params, page, arr, mtype)
+        elapsed = time.time() - start_time
+        page_bytes = self._getPageBytes(page, mtype)
+        self.id.http_conn.page_sizer.update(self.id.uuid, page_bytes, elapsed)
+        self.log.debug(f"page read of {page_bytes} bytes took {elapsed:.3f}s")
+
+    def _readPagesParallel(self, req, params, pages, arr, mtype):
+        """Fetch pages concurrently, keeping at most page_workers requests and
+        max_inflight_bytes of page data outstanding at any time."""
+        self._runPagesParallel(lambda page: self._readPageTimed(req, params, page, arr, mtype),
+                               pages, self._getPageBytes(pages[0], mtype), "read")
+
+    def _runPagesParallel(self, page_func, pages, page_bytes, action):
+        """Call page_func for each page on the connection's worker pool, keeping at most page_workers
+        calls and max_inflight_bytes of page data outstanding at any time."""
+        http_conn = self.id.http_conn
+        max_inflight = max(1, http_conn.max_inflight_bytes // max(1, page_bytes))
+        max_inflight = min(max_inflight, http_conn.page_workers, len(pages))
+        http_conn.reservePool(max_inflight)
+        self.log.info(f"parallel page {action}, {len(pages)} pages, {max_inflight} in flight")
+        http_conn.worker_pool.map(page_func, pages, max_pending=max_inflight)
+
+    def _writePageTimed(self, req, params, page, val, vlen):
+        """Encode and send one page of a hyperslab write, and report how long it
+        took to the page sizer"""
+        select_param, page_mshape, slices = page
+        page_params = dict(params)
+        page_params["select"] = select_param
+        body = arrayToBytes(numpy.ascontiguousarray(val[slices]), vlen=vlen)
+        self.log.info(f"page write select: {select_param}, {len(body)} bytes")
+        start_time = time.time()
+        self.PUT(req, body=body, format="binary", params=page_params)
+        elapsed = time.time() - start_time
+        self.id.http_conn.page_sizer.update((self.id.uuid, "write"), len(body), elapsed)
+
+    def _writeHyperslab(self, selection, req, params, val, vlen=None):
+        """Write val (with the shape of the selection's mshape) to a hyperslab selection
+        as a series of pages split along chunk boundaries, so only one page at a time is
+        encoded.  Returns False without writing anything if the selection fits in one page."""
+        mshape = val.shape
+        sel_start = selection.start
+        sel_step = selection.step
+        sel_stop, split_dim, max_chunks, mshape_split_dim, chunk_size = self._getSplitDim(selection)
+        if max_chunks < 2:
+            return False
+
+        # write page sizes are tracked separately from reads
+        page_sizer = self.id.http_conn.page_sizer
+        sizer_key = (self.id.uuid, "write")
+        slab_bytes = -(-val.nbytes // max_chunks)  # bytes per chunk along split_dim
+        chunks_per_page = page_sizer.getChunksPerPage(sizer_key, slab_bytes, max_chunks)
+        page_workers = self.id.http_conn.page_workers
+        if page_workers > 1:
+            chunks_per_page = min(chunks_per_page, -(-max_chunks // page_workers))
+        if chunks_per_page >= max_chunks:
+            return False
+
+        if page_workers > 1:
+            while True:
+                num_rows = chunks_per_page * chunk_size
+                pages = self._getPages(sel_start, sel_stop, sel_step, split_dim, mshape, mshape_split_dim, num_rows)
+                page_bytes = slab_bytes * chunks_per_page
+                try:
+                    self._runPagesParallel(lambda page: self._writePageTimed(req, params, page, val, vlen),
+                                           pages, page_bytes, "write")
+                    return True
+                except IOError as ioe:
+                    self.log.info(f"got IOError: {ioe.errno}")
+                    if ioe.errno in (408, 413) and chunks_per_page > 1:
+                        # rewriting the pages that succeeded is harmless
+                        page_sizer.reject(sizer_key, page_bytes)
+                        chunks_per_page = page_sizer.getChunksPerPage(sizer_key, slab_bytes, max_chunks)
+                    else:
+                        raise
+
+        page_start = list(sel_start)
+        des_index = 0
+        while True:
+            num_rows = chunks_per_page * chunk_size
+            page = self._getPages(page_start, sel_stop, sel_step, split_dim, mshape, mshape_split_dim,
+                                  num_rows, des_index=des_index, max_pages=1)[0]
+            try:
+                self._writePageTimed(req, params, page, val, vlen)
+            except IOError as ioe:
+                self.log.info(f"got IOError: {ioe.errno}")
+                if ioe.errno in (408, 413) and chunks_per_page > 1:
+                    # server rejected the request (or took too long), reduce the page size
+                    new_size = page_sizer.reject(sizer_key, slab_bytes * chunks_per_page)
+                    self.log.info(f"New write page size: {new_size} bytes")
+                    chunks_per_page = page_sizer.getChunksPerPage(sizer_key, slab_bytes, max_chunks)
+                    continue
+                raise
+            page_rows = page[1][mshape_split_dim]
+            des_index += page_rows
+            page_start[split_dim] += page_rows * sel_step[split_dim]
+            if page_start[split_dim] >= sel_stop[split_dim]:
+                return True
+            chunks_per_page = page_sizer.getChunksPerPage(sizer_key, slab_bytes, max_chunks)
+
+    def _checkMultiCoordinateSupport(self):
+        """Raise IOError if the server is known to be too old for fancy selections
+        with more than one coordinate list.  If the version isn't reported, the
+        request is sent anyway and left to the server to reject."""
+        server_ver = self.id.http_conn.server_version()
+        if not server_ver:
+            return
+        version = []
+        for field in re.split(r"[.\-+]", server_ver):
+            if not field.isdigit():
+                break
+            version.append(int(field))
+        if version and tuple(version) < (0, 9):
+            msg = "Fancy selection with multiple coordinates is only supported in HSDS 0.9+"
+            self.log.warning(msg)
+            raise IOError(msg)
+
+    def _readFancySelect(self, req, params, select, mtype, mshape):
+        """Read one fancy selection request"""
+        params = dict(params)
+        params["select"] = select
+        if len(select) > MAX_SELECT_QUERY_LEN:
+            # use a post method to avoid long query strings
+            self.log.info("using post select")
+            rsp = self.POST(req, body=params, format="binary")
+        else:
+            rsp = self.GET(req, params=params, format="binary")
+        if type(rsp) in (bytes, bytearray):
+            # got binary response
+            self.log.info(f"binary response, {len(rsp)} bytes")
+            arr = self._bytesToArray(rsp, mtype, mshape)
+        else:
+            # got JSON response
+            # need some special conversion for compound types --
+            # each element must be a tuple, but the JSON decoder
+            # gives us a list instead.
+            self.log.info("json response")
+            arr = jsonToArray(mshape, mtype, rsp["value"])
+        return arr
+
+    def _getFancyPages(self, coords, chunk_size, row_bytes, page_bytes):
+        """Split positions in the coordinate list into (start, stop) ranges that
+        each cover whole chunks along the coordinate dimension and are up to
+        page_bytes (or one chunk if that's larger)"""
+        chunk_index = coords // chunk_size
+        # positions where the coordinates move to another chunk
+        bounds = numpy.flatnonzero(numpy.diff(chunk_index)) + 1
+        bounds = numpy.append(bounds, len(coords)).tolist()
+        max_rows = max(1, page_bytes // max(1, row_bytes))
+        pages = []
+        start = 0
+        prev = 0
+        for bound in bounds:
+            if bound - start > max_rows and prev > start:
+                pages.append((start, prev))
+                start = prev
+            prev = bound
+        pages.append((start, len(coords)))
+        return pages
+
+    def _readFancy(self, selection, req, params, mtype, mshape):
+        """Read a fancy selection.  Large coordinate lists are split into pages by
+        chunk along the (first) coordinate dimension, which are read serially or
+        concurrently depending on page_workers, and assembled into the result."""
+        coord_dims = selection.coordinate_dims
+        total_bytes = mtype.itemsize * int(numpy.prod(mshape))
+        if not coord_dims or len(selection.slices[coord_dims[0]]) < 2 or total_bytes <= MIN_PAGE_BYTES:
+            return self._readFancySelect(req, params, selection.getQueryParam(), mtype, mshape)
+
+        split_dim = coord_dims[0]
+        coords = selection.slices[split_dim]
+        # the coordinate list's dimension in the output (earlier dims are all slices or ints)
+        axis = sum(1 for s in selection.slices[:split_dim] if isinstance(s, slice))
+        num_coords = len(coords)
+        row_bytes = total_bytes // num_coords
+        chunk_size = self._getChunkLayout()[split_dim]
+        http_conn = self.id.http_conn
+        page_sizer = http_conn.page_sizer
+        page_workers = http_conn.page_workers
+
+        while True:
+            page_bytes = page_sizer.getPageBytes(self.id.uuid)
+            if page_workers > 1:
+                page_bytes = min(page_bytes, -(-total_bytes // page_workers))
+            pages = self._getFancyPages(coords, chunk_size, row_bytes, page_bytes)
+            if len(pages) == 1:
+                return self._readFancySelect(req, params, selection.getQueryParam(), mtype, mshape)
+            self.log.info(f"fancy selection, {num_coords} coordinates in {len(pages)} pages")
+            arr = numpy.empty(mshape, dtype=mtype)
+
+            def read_page(page):
+                start, stop = page
+                page_coords = {dim: selection.slices[dim][start:stop] for dim in coord_dims}
+                select = selection.getQueryParam(coords=page_coords)
+                page_mshape = list(mshape)
+                page_mshape[axis] = stop - start
+                start_time = time.time()
+                page_arr = self._readFancySelect(req, params, select, mtype, tuple(page_mshape))
+                page_sizer.update(self.id.uuid, page_arr.nbytes, time.time() - start_time)
+                arr[(slice(None),) * axis + (slice(start, stop),)] = page_arr
+
+            try:
+                if page_workers > 1:
+                    self._runPagesParallel(read_page, pages, page_bytes, "fancy read")
+                else:
+                    for page in pages:
+                        read_page(page)
+                return arr
+            except IOError as ioe:
+                if ioe.errno in (408, 413) and page_bytes > row_bytes * chunk_size:
+                    # server rejected the request (or took too long), use smaller pages
+                    new_size = page_sizer.reject(self.id.uuid, page_bytes)
+                    self.log.info(f"New page size: {new_size} bytes")
+                else:
+                    raise
+
+    def _getChunkLayout(self):
+        """Return the chunk dimensions (or the dataset shape if not chunked)"""
+        chunk_layout = self.id.chunks
+        if chunk_layout is None:
+            chunk_layout = self._shape
+        elif isinstance(chunk_layout, dict):
+            # CHUNK_REF layout
+            if "dims" not in chunk_layout:
+                self.log.error(f"Unexpected chunk_layout: {chunk_layout}")
+            else:
+                chunk_layout = tuple(chunk_layout["dims"])
+        return chunk_layout
+
+    def _getSplitDim(self, selection):
+        """Find the dimension to split a hyperslab selection into pages along - the one
+        that spans the most chunks.
+
+        Returns (sel_stop, split_dim, max_chunks, mshape_split_dim, chunk_size), where
+        mshape_split_dim is the matching dimension of the selection's mshape and
+        chunk_size is the chunk extent along split_dim.
+        """
+        chunk_layout = self._getChunkLayout()
+        rank = len(self._shape)
+
+        max_chunks = 1
+        split_dim = -1
+
+        sel_start = selection.start
+        sel_step = selection.step
+        sel_stop = []
+
+        self.log.debug(f"selection._sel: {selection._sel}")
+        scalar_selection = selection._sel[3]
+        # determine the dimension for paging
+        for i in range(rank):
+            stop = sel_start[i] + selection.count[i] * sel_step[i]
+            if stop > self._shape[i]:
+                stop = self._shape[i]
+            sel_stop.append(stop)
+            if scalar_selection[i]:
+                # scalar index so will hit just one chunk
+                continue
+            count = sel_stop[i] - sel_start[i]
+            num_chunks = count // chunk_layout[i]
+            if count % chunk_layout[i] > 0:
+                num_chunks += 1  # get the integer ceiling
+            if split_dim < 0 or num_chunks > max_chunks:
+                max_chunks = num_chunks
+                split_dim = i
+
+        msg = f"selection: start {sel_start} stop {sel_stop} step {sel_step}"
+        self.log.info(msg)
+        self.log.debug(f"split_dim: {split_dim}")
+        self.log.debug(f"max_chunks: {max_chunks}")
+
+        # determine which dimension of the target array to split on
+        mshape_split_dim = 0
+        for i in range(rank):
+            if scalar_selection[i]:
+                continue
+            if i == split_dim:
+                break
+            mshape_split_dim += 1
+
+        self.log.debug(f"mshape_split_dim: {split_dim}")
+        chunk_size = chunk_layout[split_dim]
+        self.log.debug(f"chunk size for split_dim: {chunk_size}")
+        return sel_stop, split_dim, max_chunks, mshape_split_dim, chunk_size
+
+    def _readHyperslab(self, selection, req, params, arr, mtype):
+        """Read a hyperslab selection into arr, splitting it into pages as needed."""
+        # Divy up large selections into pages, so no one request
+        # to the server will take unduly long to process
+        mshape = arr.shape
+        sel_start = selection.start
+        sel_step = selection.step
+        sel_stop, split_dim, max_chunks, mshape_split_dim, chunk_size = self._getSplitDim(selection)
+
+        # size pages from what earlier reads of this dataset have found works
+        page_sizer = self.id.http_conn.page_sizer
+        slab_bytes = -(-arr.nbytes // max_chunks)  # bytes per chunk along split_dim
+        page_workers = self.id.http_conn.page_workers
+
+        if page_workers > 1 and max_chunks > 1:
+            while True:
+                chunks_per_page = page_sizer.getChunksPerPage(self.id.uuid, slab_bytes, max_chunks)
+                # split the selection so that each worker has at least one page to fetch
+                chunks_per_page = min(chunks_per_page, -(-max_chunks // page_workers))
+                num_rows = chunks_per_page * chunk_size
+                pages = self._getPages(sel_start, sel_stop, sel_step, split_dim, mshape, mshape_split_dim, num_rows)
+                self.log.debug(f"parallel paged read, chunks_per_page: {chunks_per_page}\
+                                max_chunks: {max_chunks}, num_pages: {len(pages)}")
+                try:
+                    if len(pages) > 1:
+                        self._readPagesParallel(req, params, pages, arr, mtype)
+                    else:
+                        self._readPageTimed(req, params, pages[0], arr, mtype)
+                    return
+                except IOError as ioe:
+                    self.log.info(f"got IOError: {ioe.errno}")
+                    if ioe.errno in (408, 413) and chunks_per_page > 1:
+                        # server rejected the request (or took too long), reduce the page size
+                        page_sizer.reject(self.id.uuid, self._getPageBytes(pages[0], mtype))
+                    else:
+                        raise IOError(f"Error retrieving data: {ioe.errno}")
+
+        # read one page at a time, so each page can use the size the last one settled on
+        page_start = list(sel_start)
+        des_index = 0
+        while True:
+            chunks_per_page = page_sizer.getChunksPerPage(self.id.uuid, slab_bytes, max_chunks)
+            num_rows = chunks_per_page * chunk_size
+            page = self._getPages(page_start, sel_stop, sel_step, split_dim, mshape, mshape_split_dim,
+                                  num_rows, des_index=des_index, max_pages=1)[0]
+            self.log.debug(f"paged read, chunks_per_page: {chunks_per_page} max_chunks: {max_chunks}")
+            try:
+                self._readPageTimed(req, params, page, arr, mtype)
+            except IOError as ioe:
+                self.log.info(f"got IOError: {ioe.errno}")
+                if ioe.errno in (408, 413) and chunks_per_page > 1:
+                    # server rejected the request (or took too long), reduce the page size
+                    new_size = page_sizer.reject(self.id.uuid, self._getPageBytes(page, mtype))
+                    self.log.info(f"New page size: {new_size} bytes")
+                    continue
+                raise IOError(f"Error retrieving data: {ioe.errno}")
+            page_rows = page[1][mshape_split_dim]
+            des_index += page_rows
+            page_start[split_dim] += page_rows * sel_step[split_dim]
+            if page_start[split_dim] >= sel_stop[split_dim]:
+                break
+
+    def _getReadParams(self, mtype):
+        """Return the query params for reading values of type mtype"""
+        params = {}
+
+        if mtype.names != self.dtype.names:
+            params["fields"] = ":".join(mtype.names)
+
+        if self.id._http_conn.mode == "r" and self.id._http_conn.cache_on:
+            # enables lambda to be used on server
+            self.log.debug("setting nonstrict parameter")
+            params["nonstrict"] = 1
+        else:
+            self.log.debug("not settng nonstrict")
+        return params
+
+    def _getChunkCache(self, selection, mtype):
+        """Return the chunk cache if it should be used for this read, otherwise None"""
+        chunk_cache = self.id.http_conn.chunk_cache
+        if chunk_cache is None:
+            return None
+        if mtype != self.dtype or isVlen(mtype) or mtype.hasobject:
+            return None  # only cache data as stored
+        chunk_layout = self._getChunkLayout()
+        chunk_bytes = int(numpy.prod(chunk_layout, dtype=numpy.int64)) * mtype.itemsize
+        num_chunks = 1
+        for indexes in self._getSelectedChunks(selection):
+            num_chunks *= len(indexes)
+        if num_chunks * chunk_bytes > chunk_cache.max_bytes:
+            # would just evict the chunks we're reading
+            self.log.debug("selection too large for chunk cache")
+            return None
+        return chunk_cache
+
+    def _getSelectedChunks(self, selection):
+        """Return a list for each dimension of the chunk indexes the hyperslab
+        selection touches"""
+        chunk_layout = self._getChunkLayout()
+        dim_chunks = []
+        for i in range(len(self._shape)):
+            sel_start = selection.start[i]
+            sel_count = selection.count[i]
+            sel_step = selection.step[i]
+            if sel_step <= chunk_layout[i]:
+                first = sel_start // chunk_layout[i]
+                last = (sel_start + (sel_count - 1) * sel_step) // chunk_layout[i]
+                dim_chunks.append(list(range(first, last + 1)))
+            else:
+                # the step skips over some chunks
+                coords = sel_start + numpy.arange(sel_count, dtype=numpy.int64) * sel_step
+                dim_chunks.append(numpy.unique(coords // chunk_layout[i]).tolist())
+        return dim_chunks
+
+    def _invalidateChunkCache(self):
+        """Drop any chunks of this dataset held in the chunk cache"""
+        chunk_cache = self.id.http_conn.chunk_cache
+        if chunk_cache is not None:
+            chunk_cache.invalidate(self.id.uuid)
+
+    def _readCachedChunks(self, selection, req, params, arr, mtype, chunk_cache):
+        """Read a hyperslab selection into arr, using chunks from the cache where possible.
+
+        Chunks not in the cache are fetched (one read for each run of missing
+        chunks that are adjacent in the last dimension, sent concurrently) and
+        added to the cache.
+        """
+        chunk_layout = self._getChunkLayout()
+        rank = len(self._shape)
+        sel_start = selection.start
+        sel_count = selection.count
+        sel_step = selection.step
+
+        chunks = {}
+        missing = []
+        for index in itertools.product(*self._getSelectedChunks(selection)):
+            chunk = chunk_cache.get(self.id.uuid, index)
+            if chunk is None:
+                missing.append(index)
+            else:
+                chunks[index] = chunk
+        self.log.debug(f"chunk cache hits: {len(chunks)} misses: {len(missing)}")
+
+        # group the missing chunks into runs along the last dimension
+        runs = []  # (index of first chunk, number of chunks)
+        for index in missing:
+            if runs:
+                first, num_chunks = runs[-1]
+                if index[:-1] == first[:-1] and index[-1] == first[-1] + num_chunks:
+                    runs[-1] = (first, num_chunks + 1)
+                    continue
+            runs.append((index, 1))
+
+        def read_run(run):
+            first, num_chunks = run
+            box = []
+            for i in range(rank):
+                box_start = first[i] * chunk_layout[i]
+                box_stop = box_start + chunk_layout[i] * (num_chunks if i == rank - 1 else 1)
+                box.append(slice(box_start, min(box_stop, self._shape[i])))
+            box_sel = sel.select(self, tuple(box))
+            box_arr = numpy.empty(box_sel.mshape, dtype=mtype)
+            self._readHyperslab(box_sel, req, params, box_arr, mtype)
+            run_chunks = []
+            for n in range(num_chunks):
+                index = first[:-1] + (first[-1] + n,)
+                chunk_start = n * chunk_layout[-1]
+                chunk_slices = (slice(None),) * (rank - 1)
+                chunk_slices += (slice(chunk_start, chunk_start + chunk_layout[-1]),)
+                run_chunks.append((index, box_arr[chunk_slices].copy()))
+            return run_chunks
+
+        if runs:
+            self.log.debug(f"reading {len(missing)} missing chunks in {len(runs)} requests")
+            for run_chunks in self.id.http_conn.worker_pool.map(read_run, runs):
+                for index, chunk in run_chunks:
+                    chunk_cache.put(self.id.uuid, index, chunk)
+                    chunks[index] = chunk
+
+        # copy the selected elements of each chunk to arr
+        full_arr = arr.reshape(sel_count)
+        if not numpy.may_share_memory(full_arr, arr):
+            full_arr = numpy.empty(sel_count, dtype=mtype)
+        for index, chunk in chunks.items():
+            src_slices = []
+            des_slices = []
+            for i in range(rank):
+                chunk_start = index[i] * chunk_layout[i]
+                chunk_stop = chunk_start + chunk.shape[i]
+                # range of selection elements that fall in this chunk
+                first = max(0, -(-(chunk_start - sel_start[i]) // sel_step[i]))
+                last = min(sel_count[i], -(-(chunk_stop - sel_start[i]) // sel_step[i]))
+                des_slices.append(slice(first, last))
+                src_start = sel_start[i] + first * sel_step[i] - chunk_start
+                src_slices.append(slice(src_start, src_start + (last - first - 1) * sel_step[i] + 1, sel_step[i]))
+            full_arr[tuple(des_slices)] = chunk[tuple(src_slices)]
+        if not numpy.may_share_memory(full_arr, arr):
+            arr[...] = full_arr.reshape(arr.shape)
+
+    def __getitem__(self, args, new_dtype=None, out=None):
         """Read a slice from the HDF5 dataset.
 
         Takes slices and recarray-style field names (more than one is
@@ -944,11 +1694,20 @@ class Dataset(HLObject):
         Also supports:
 
         * Boolean "mask" array indexing
+
+        If out is given, the selected data is stored in that array (which
+        must have the same number of elements as the selection) and out
+        is returned.
         """
         if new_dtype is not None:
             self.log.debug(f"getitem.new_dtype: {new_dtype}")
         args = args if isinstance(args, tuple) else (args,)
         self.log.debug("dataset.__getitem__")
+
+        if out is not None and (self._is_empty or self._shape == () or any(isinstance(x, str) for x in args)):
+            # no paging for these cases, just copy the result
+            out[...] = self.__getitem__(args, new_dtype=new_dtype)
+            return out
         for arg in args:
             arg_len = 0
             try:
@@ -1072,6 +1831,8 @@ class Dataset(HLObject):
         self.log.debug("selection_constructor")
 
         if selection.nselect == 0:
+            if out is not None:
+                return out
             # force compliance with h5py selection behavior
             shape = numpy.empty(self.shape)[args].shape
             return numpy.ndarray(shape, dtype=new_dtype)
@@ -1085,291 +1846,56 @@ class Dataset(HLObject):
         self.log.debug(f"dataset shape: {self._shape}")
         self.log.debug(f"mshape: {mshape}")
 
+        target = None  # array the pages will be read into
+        if out is not None:
+            if out.size != numpy.prod(mshape, dtype=numpy.int64):
+                raise TypeError(f"out array of shape {out.shape} doesn't match selection shape {mshape}")
+            if out.dtype == mtype:
+                target = out.reshape(mshape)
+                if not numpy.may_share_memory(target, out):
+                    target = None  # out can't be reshaped without a copy
+
         # Perfom the actual read
         rsp = None
         req = "/datasets/" + self.id.uuid + "/value"
-        params = {}
-
-        if mtype.names != self.dtype.names:
-            params["fields"] = ":".join(mtype.names)
-
-        if self.id._http_conn.mode == "r" and self.id._http_conn.cache_on:
-            # enables lambda to be used on server
-            self.log.debug("setting nonstrict parameter")
-            params["nonstrict"] = 1
-        else:
-            self.log.debug("not settng nonstrict")
+        params = self._getReadParams(mtype)
 
         if isinstance(selection, sel.SimpleSelection):
-            # Divy up large selections into pages, so no one request
-            # to the server will take unduly long to process
-            chunk_layout = self.id.chunks
-            if chunk_layout is None:
-                chunk_layout = self._shape
-            elif isinstance(chunk_layout, dict):
-                # CHUNK_REF layout
-                if "dims" not in chunk_layout:
-                    self.log.error(f"Unexpected chunk_layout: {chunk_layout}")
-                else:
-                    chunk_layout = tuple(chunk_layout["dims"])
-
-            max_chunks = 1
-            split_dim = -1
-
-            sel_start = selection.start
-            sel_step = selection.step
-            sel_stop = []
-
-            self.log.debug(f"selection._sel: {selection._sel}")
-            scalar_selection = selection._sel[3]
-            chunks_per_page = 1
-            # determine the dimension for paging
-            for i in range(rank):
-                stop = sel_start[i] + selection.count[i] * sel_step[i]
-                if stop > self._shape[i]:
-                    stop = self._shape[i]
-                sel_stop.append(stop)
-                if scalar_selection[i]:
-                    # scalar index so will hit just one chunk
-                    continue
-                count = sel_stop[i] - sel_start[i]
-                num_chunks = count // chunk_layout[i]
-                if count % chunk_layout[i] > 0:
-                    num_chunks += 1  # get the integer ceiling
-                if split_dim < 0 or num_chunks > max_chunks:
-                    max_chunks = num_chunks
-                    split_dim = i
-                chunks_per_page = max_chunks
-
-            msg = f"selection: start {sel_start} stop {sel_stop} step {sel_step}"
-            self.log.info(msg)
-            self.log.debug(f"split_dim: {split_dim}")
-            self.log.debug(f"chunks_per_page: {chunks_per_page}")
-
-            # determine which dimension of the target array to split on
-            mshape_split_dim = 0
-            for i in range(rank):
-                if scalar_selection[i]:
-                    continue
-                if i == split_dim:
-                    break
-                mshape_split_dim += 1
-
-            self.log.debug(f"mshape_split_dim: {split_dim}")
-            chunk_size = chunk_layout[split_dim]
-            self.log.debug(f"chunk size for split_dim: {chunk_size}")
-
-            arr = numpy.empty(mshape, dtype=mtype)
-
-            done = False
-            while not done:
-                num_rows = chunks_per_page * chunk_layout[split_dim]
-                self.log.debug(f"num_rows: {num_rows}")
-                page_start = list(copy(sel_start))
-
-                num_pages = max_chunks // chunks_per_page
-                if max_chunks % chunks_per_page > 0:
-                    num_pages += 1  # get the integer ceiling
-
-                des_index = 0  # this is where we'll copy to the arr for each page
-
-                self.log.debug(f"paged read, chunks_per_page: {chunks_per_page}\
-                                max_chunks: {max_chunks}, num_pages: {num_pages}")
-
-                for page_number in range(num_pages):
-                    self.log.debug(f"page_number: {page_number}")
-                    self.log.debug(f"start: {page_start}  stop: {sel_stop}")
-
-                    page_stop = list(copy(sel_stop))
-                    page_stop[split_dim] = page_start[split_dim] + num_rows
-
-                    if sel_step[split_dim] > 1:
-                        # make sure the stop is aligned with the step value
-                        rem = page_stop[split_dim] % sel_step[split_dim]
-                        if rem != 0:
-                            page_stop[split_dim] += sel_step[split_dim] - rem
-                    if page_stop[split_dim] > sel_stop[split_dim]:
-                        page_stop[split_dim] = sel_stop[split_dim]
-
-                    self.log.info(f"page_stop: {page_stop[split_dim]}")
-
-                    page_mshape = list(copy(mshape))
-                    page_mshape[mshape_split_dim] =\
-                        (1 + (page_stop[split_dim] - page_start[split_dim] - 1) // sel_step[split_dim])
-
-                    page_mshape = tuple(page_mshape)
-                    self.log.info(f"page_mshape: {page_mshape}")
+            if target is not None:
+                arr = target
+            else:
+                arr = numpy.empty(mshape, dtype=mtype)
 
-                    params["select"] = self._getQueryParam(page_start, page_stop, sel_step)
-                    try:
-                        rsp = self.GET(req, params=params, format="binary")
-                    except IOError as ioe:
-                        self.log.info(f"got IOError: {ioe.errno}")
-                        if ioe.errno == 413 and chunks_per_page > 1:
-                            # server rejected the request, reduce the page size
-                            chunks_per_page //= 2
-                            self.log.info(f"New chunks_per_page: {chunks_per_page}")
-                            break
-                        else:
-                            raise IOError(f"Error retrieving data: {ioe.errno}")
-                    if isinstance(rsp, str):
-                        # hexencoded response?
-                        # this is returned by API Gateway for lamba responses
-                        rsp = bytes.fromhex(rsp)
-                        # from here treat it like a byte responses
-                    if type(rsp) in (bytes, bytearray):
-                        # got binary response
-                        # TBD - check expected number of bytes
-                        self.log.info(f"binary response, {len(rsp)} bytes")
-                        arr1d = bytesToArray(rsp, mtype, page_mshape)
-                        page_arr = numpy.reshape(arr1d, page_mshape)
-                    else:
-                        # got JSON response
-                        # need some special conversion for compound types --
-                        # each element must be a tuple, but the JSON decoder
-                        # gives us a list instead.
-                        self.log.info("json response")
-
-                        data = rsp["value"]
-                        self.log.debug(data)
-
-                        page_arr = jsonToArray(page_mshape, mtype, data)
-                        self.log.debug(f"jsontoArray returned: {page_arr}")
-
-                    # get the slices to copy into the target array
-                    slices = []
-                    for i in range(len(mshape)):
-                        if i == mshape_split_dim:
-                            num_rows = page_arr.shape[mshape_split_dim]
-                            slices.append(slice(des_index, des_index + num_rows))
-                            des_index += num_rows
-                        else:
-                            slices.append(slice(0, mshape[i]))
-                    self.log.debug(f"slices: {slices}")
-                    arr[tuple(slices)] = page_arr
-
-                    page_start[split_dim] = page_stop[split_dim]
-                    self.log.debug(f"new page_start: {page_start}")
-                    rows_remaining = sel_stop[split_dim] - page_start[split_dim]
-                    if rows_remaining <= 0:
-                        self.log.debug("done = True")
-                        done = True
-                        break
-                    self.log.debug(f"{rows_remaining} rows left")
+            chunk_cache = self._getChunkCache(selection, mtype)
+            if chunk_cache is not None:
+                self._readCachedChunks(selection, req, params, arr, mtype, chunk_cache)
+            else:
+                self._readHyperslab(selection, req, params, arr, mtype)
 
         elif isinstance(selection, sel.FancySelection):
-            select = selection.getQueryParam()
-            num_coords = 0
-            for s in select:
-                if isinstance(s, list):
-                    num_coords += 1
-            if num_coords > 1:
+            if len(selection.coordinate_dims) > 1:
                 # multi coordinates are only supported with recent HSDS versions, so check first
-                server_ver = self.id.http_conn.server_version()
-                if server_ver and server_ver.startswith("0.9") or server_ver.startswith("1."):
-                    pass  # ok
-                else:
-                    msg = "Fancy selection with multiple coordinates is only supported in HSDS 0.9+"
-                    self.log.warning(msg)
-                    raise IOError(msg)
-
-            params["select"] = select
-            MAX_SELECT_QUERY_LEN = 100
-            if len(select) > MAX_SELECT_QUERY_LEN:
-                # use a post method to avoid long query strings
-                self.log.info("using post select")
-                try:
-                    rsp = self.POST(req, body=params, format="binary")
-                except IOError as ioe:
-                    self.log.info(f"got IOError: {ioe.errno}")
-                    raise IOError(f"Error retrieving data: {ioe.errno}")
-            else:
-                try:
-                    rsp = self.GET(req, params=params, format="binary")
-                except IOError as ioe:
-                    self.log.info(f"got IOError: {ioe.errno}")
-                    raise IOError(f"Error retrieving data: {ioe.errno}")
-            if type(rsp) in (bytes, bytearray):
-                # got binary response
-                self.log.info(f"binary response, {len(rsp)} bytes")
-                arr = bytesToArray(rsp, mtype, mshape)
-            else:
-                # got JSON response
-                # need some special conversion for compound types --
-                # each element must be a tuple, but the JSON decoder
-                # gives us a list instead.
-                self.log.info("json response")
-
-                data = rsp["value"]
-                # self.log.debug(data)
+                self._checkMultiCoordinateSupport()
 
-                arr = jsonToArray(mshape, mtype, data)
-                self.log.debug(f"jsontoArray returned: {arr}")
+            try:
+                arr = self._readFancy(selection, req, params, mtype, mshape)
+            except IOError as ioe:
+                self.log.info(f"got IOError: {ioe.errno}")
+                raise IOError(f"Error retrieving data: {ioe.errno}")
         elif isinstance(selection, sel.PointSelection):
-            format = "binary"  # default binary
-            body = {}
-
-            points = selection.points.tolist()
-            rank = len(self._shape)
-            # verify the points are in range and strictly monotonic (for the 1d case)
-            last_point = -1
-
-            if len(points) == rank and isinstance(points[0], int) and rank > 1:
-                # Single point selection - need to wrap this in an array
-                self.log.info("single point selection")
-                points = [
-                    points,
-                ]
-            else:
-                for point in points:
-                    if isinstance(point, (list, tuple)):
-                        if not isinstance(point, (list, tuple)):
-                            raise ValueError("invalid point argument")
-                        if len(point) != rank:
-                            raise ValueError("invalid point argument")
-                        for i in range(rank):
-                            if point[i] < 0 or point[i] >= self._shape[i]:
-                                raise IndexError("point out of range")
-                        if rank == 1:
-                            if point[0] <= last_point:
-                                raise TypeError("index points must be strictly increasing")
-                            last_point = point[0]
-
-                    elif rank == 1 and isinstance(point, int):
-                        if point < 0 or point > self._shape[0]:
-                            raise IndexError("point out of range")
-                        if point <= last_point:
-                            raise TypeError("index points must be strictly increasing")
-                        last_point = point
-                    else:
-                        raise ValueError("invalid point argument")
-
-            # send points as binary request for HSDS
-            arr_points = numpy.asarray(points, dtype="u8")  # must use unsigned 64-bit int
-            body = arr_points.tobytes()
-            self.log.info(f"point select binary request, num bytes: {len(body)}")
-
-            rsp = self.POST(req, format=format, body=body)
-            if type(rsp) in (bytes, bytearray):
-                elements_received = len(rsp) // mtype.itemsize
-                elements_expected = selection.mshape[0]
-                if elements_received != elements_expected:
-                    msg = f"Expected {elements_expected} elements, but got {elements_received}"
-                    self.log.warning(msg)
-                    raise IOError(msg)
-
-                arr = numpy.frombuffer(rsp, dtype=mtype)
-            else:
-                data = rsp["value"]
-                if len(data) != selection.mshape[0]:
-                    msg = f"Expected {selection.mshape[0]} elements, but got {len(data)}"
-                    self.log.warning(msg)
-                    raise IOError(msg)
-                arr = numpy.asarray(data, dtype=mtype, order="C")
+            points = self._checkPoints(selection.points)
+            if rank == 1 and numpy.any(points[1:] <= points[:-1]):
+                raise TypeError("index points must be strictly increasing")
+            arr = self._readPointList(points, mtype)
 
         else:
             raise ValueError("selection type not supported")
 
+        if out is not None:
+            if arr is not target:
+                out[...] = numpy.reshape(arr, out.shape)
+            return out
+
         self.log.info(f"got arr: {arr.shape}, cleaning up shape!")
         # Patch up the output for NumPy
         if len(names) == 1:
@@ -1556,9 +2082,6 @@ class Dataset(HLObject):
         req = "/datasets/" + self.id.uuid + "/value"
 
         params = {}
-        body = {}
-
-        format = "json"
 
         # Broadcast scalars if necessary.
 
@@ -1578,21 +2101,216 @@ class Dataset(HLObject):
                 val = val2
                 mshape = val.shape
 
+        # Perform write to subset of named fields within compound datatype, if any
+        if len(names) > 0:
+            params["fields"] = ":".join(names)
+
+        if self.id.http_conn.write_queue is not None:
+            # the write is sent later, so keep a copy of the caller's data
+            if selection.select_type != sel.H5S_SELECT_ALL:
+                select_param = selection.getQueryParam()
+            else:
+                select_param = None
+            region = (select_param, params.get("fields"), params.get("element_count"))
+            val = val.copy()
+            self._queueWrite(region, lambda: self._writeValue(selection, req, params, val, vlen_base_class))
+        else:
+            self._writeValue(selection, req, params, val, vlen_base_class)
+
+    def _writeValue(self, selection, req, params, val, vlen=None):
+        """Send val to the server for the given selection"""
+        paged = "element_count" not in params and isinstance(selection, sel.SimpleSelection)
+        paged = paged and self.dtype.subdtype is None and val.size == selection.nselect
+        if paged:
+            # large selections are sent as a series of pages
+            try:
+                if self._writeHyperslab(selection, req, params, val.reshape(selection.mshape), vlen):
+                    return
+            finally:
+                self._invalidateChunkCache()
+
         # server is HSDS, use binary data, use param values for selection
         format = "binary"
-        body = arrayToBytes(val, vlen=vlen_base_class)
+        body = arrayToBytes(val, vlen=vlen)
         self.log.debug(f"writing binary data, {len(body)}")
 
+        params = dict(params)
         if selection.select_type != sel.H5S_SELECT_ALL:
             select_param = selection.getQueryParam()
             self.log.debug(f"got select query param: {select_param}")
             params["select"] = select_param
 
-        # Perform write to subset of named fields within compound datatype, if any
-        if len(names) > 0:
-            params["fields"] = ":".join(names)
+        try:
+            self.PUT(req, body=body, format=format, params=params)
+        finally:
+            self._invalidateChunkCache()
 
-        self.PUT(req, body=body, format=format, params=params)
+    def _readPoints(self, points, mtype, num_points):
+        """Read the values at the given list of points (or rank-1 point coordinates)
+        with a single POST request"""
+        req = "/datasets/" + self.id.uuid + "/value"
+        # send points as binary request for HSDS
+        arr_points = numpy.asarray(points, dtype="u8")  # must use unsigned 64-bit int
+        body = arr_points.tobytes()
+        self.log.info(f"point select binary request, num bytes: {len(body)}")
+
+        rsp = self.POST(req, format="binary", body=body)
+        if type(rsp) in (bytes, bytearray):
+            elements_received = len(rsp) // mtype.itemsize
+            if elements_received != num_points:
+                msg = f"Expected {num_points} elements, but got {elements_received}"
+                self.log.warning(msg)
+                raise IOError(msg)
+
+            arr = numpy.frombuffer(rsp, dtype=mtype)
+        else:
+            data = rsp["value"]
+            if len(data) != num_points:
+                msg = f"Expected {num_points} elements, but got {len(data)}"
+                self.log.warning(msg)
+                raise IOError(msg)
+            arr = numpy.asarray(data, dtype=mtype, order="C")
+        return arr
+
+    def _checkPoints(self, points):
+        """Return points as an array of coordinates with shape (n, rank), or (n,) for a
+        one-dimensional dataset, after checking they are within the dataset"""
+        rank = len(self._shape)
+        try:
+            points = numpy.asarray(points, dtype="u8")  # must use unsigned 64-bit int
+        except (OverflowError, ValueError):
+            raise IndexError("point out of range")
+        if rank == 1:
+            if points.ndim == 2 and points.shape[1] == 1:
+                points = points.reshape((-1,))
+            elif points.ndim != 1:
+                raise ValueError("invalid point argument")
+        elif points.ndim == 1 and points.shape[0] == rank:
+            # Single point selection - need to wrap this in an array
+            self.log.info("single point selection")
+            points = points.reshape((1, rank))
+        elif points.ndim != 2 or points.shape[1] != rank:
+            raise ValueError("invalid point argument")
+        if numpy.any(points >= numpy.asarray(self._shape, dtype="u8")):
+            raise IndexError("point out of range")
+        return points
+
+    def _readPointList(self, points, mtype, unordered=False, max_workers=None):
+        """Read the values at the given points (as returned by _checkPoints), splitting
+        large lists into several requests sent concurrently.  If unordered is set the
+        points may be in any order and repeated; each distinct point is fetched once,
+        in increasing order, and the values are returned in the order given."""
+        inverse = None
+        if unordered:
+            if points.ndim == 1:
+                points, inverse = numpy.unique(points, return_inverse=True)
+            else:
+                points, inverse = numpy.unique(points, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        num_points = points.shape[0]
+        if num_points <= MAX_POINTS_PER_REQUEST:
+            arr = self._readPoints(points, mtype, num_points)
+        else:
+            arr = numpy.empty((num_points,), dtype=mtype)
+
+            def read_batch(start):
+                batch = points[start:start + MAX_POINTS_PER_REQUEST]
+                arr[start:start + len(batch)] = self._readPoints(batch, mtype, len(batch))
+
+            starts = range(0, num_points, MAX_POINTS_PER_REQUEST)
+            if max_workers is None:
+                max_workers = DEFAULT_READ_MANY_WORKERS
+            self.log.info(f"point selection, {num_points} points in {len(starts)} requests")
+            self.id.http_conn.worker_pool.map(read_batch, starts, max_pending=max_workers)
+        if inverse is not None:
+            arr = arr[inverse]
+        return arr
+
+    def read_points(self, points, max_workers=None):
+        """Read the values at a list of points, given as an array-like of shape
+        (n, rank) (or (n,) for a one-dimensional dataset), and return them as an
+        array of length n.
+
+        Unlike dataset[points], the points can be in any order and may be repeated.
+        Each distinct point is read once, and large lists are split into several
+        requests that are sent concurrently (up to max_workers at a time).
+        """
+        if self._is_empty or not self._shape:
+            raise TypeError("Point selection requires a dataset with rank of at least 1")
+        points = self._checkPoints(points)
+        if points.shape[0] == 0:
+            return numpy.empty((0,), dtype=self.dtype)
+        return self._readPointList(points, self.dtype, unordered=True, max_workers=max_workers)
+
+    def read_many(self, selections, max_workers=None):
+        """Read a list of selections (each anything that can be passed to
+        dataset[...]) and return a list with the array for each.
+
+        Small hyperslab selections, such as single elements, are merged into
+        a few point selection requests, and the remaining selections are read
+        as normal.  The requests are sent concurrently, up to max_workers
+        (default 16) at a time, by the connection's worker pool.
+        """
+        if max_workers is None:
+            max_workers = DEFAULT_READ_MANY_WORKERS
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        results = [None] * len(selections)
+        rank = len(self._shape) if self._shape is not None else 0
+        # points can be batched for fixed size, non-array types
+        batch_points = rank > 0 and not self._is_empty and self.dtype.subdtype is None
+        batch_points = batch_points and not isVlen(self.dtype)
+        batched = []  # (index, mshape, coordinates) for each batched selection
+        reads = []  # index of each selection to read as is
+        for index, args in enumerate(selections):
+            if not isinstance(args, tuple):
+                args = (args,)
+            if batch_points and not any(isinstance(x, str) for x in args):
+                selection = sel.select(self, args)
+                if isinstance(selection, sel.SimpleSelection) and 0 < selection.nselect <= MAX_BATCH_SELECTION_POINTS:
+                    coords = []
+                    for i in range(rank):
+                        stop = selection.start[i] + selection.count[i] * selection.step[i]
+                        coords.append(numpy.arange(selection.start[i], stop, selection.step[i]))
+                    coords = numpy.stack(numpy.meshgrid(*coords, indexing="ij"), axis=-1).reshape((-1, rank))
+                    batched.append((index, selection.mshape, coords))
+                    continue
+            reads.append(index)
+
+        num_points = sum(len(coords) for _, _, coords in batched)
+        self.log.info(f"read_many, {len(selections)} selections, {len(batched)} batched with {num_points} points")
+        values = None
+        if batched:
+            all_coords = numpy.concatenate([coords for _, _, coords in batched])
+            if rank == 1:
+                all_coords = all_coords.reshape((-1,))
+
+        def read_batched(_):
+            nonlocal values
+            # fetch each distinct point once
+            values = self._readPointList(all_coords, self.dtype, unordered=True, max_workers=max_workers)
+
+        def read_selection(index):
+            results[index] = self[selections[index]]
+
+        tasks = [(read_batched, None)] if batched else []
+        tasks.extend((read_selection, index) for index in reads)
+        if len(tasks) == 1 or max_workers == 1:
+            for func, arg in tasks:
+                func(arg)
+        elif tasks:
+            self.id.http_conn.worker_pool.map(lambda task: task[0](task[1]), tasks, max_pending=max_workers)
+
+        # scatter the point values back to each selection
+        offset = 0
+        for index, mshape, coords in batched:
+            arr = values[offset:offset + len(coords)]
+            offset += len(coords)
+            if mshape == ():
+                results[index] = arr[0]
+            else:
+                results[index] = arr.reshape(mshape)
+        return results
 
     def read_direct(self, dest, source_sel=None, dest_sel=None):
         """Read data directly from HDF5 into an existing NumPy array.
@@ -1600,7 +2318,9 @@ class Dataset(HLObject):
         The destination array must be C-contiguous and writable.
         Selections must be the output of numpy.s_[<args>].
 
-        Broadcasting is supported for simple indexing.
+        Data is written to the region of dest given by dest_sel as it's
+        received, without allocating an intermediate array (other than for
+        the pages of a strided dest_sel).
         """
 
         if self._is_empty:
@@ -1623,16 +2343,31 @@ class Dataset(HLObject):
         slices = []
         for i in range(len(dest.shape)):
             start = dest_sel.start[i]
-            stop = start + dest_sel.count[i]
             step = dest_sel.step[i]
+            stop = start + dest_sel.count[i] * step
             slices.append(slice(start, stop, step))
         slices = tuple(slices)
 
         if source_sel.getSelectNpoints() != dest_sel.getSelectNpoints():
             raise TypeError("Invalid shape")
 
-        arr = self.__getitem__(source_sel)
-        dest.__setitem__(slices, arr)
+        self.read_into(dest[slices], source_sel)
+
+    def read_into(self, out, sel=None):
+        """Read a selection into the existing NumPy array out.
+
+        out must be writable and have the same number of elements as the
+        selection, but need not be contiguous (e.g. dest[::2, 1:]).
+        sel is the output of numpy.s_[<args>], or None for the entire
+        dataset.  Returns out.
+        """
+        if not isinstance(out, numpy.ndarray):
+            raise TypeError("out must be ndarray")
+        if not out.flags["WRITEABLE"]:
+            raise TypeError("out must be writable")
+        if sel is None:
+            sel = Ellipsis
+        return self.__getitem__(sel, out=out)
 
     def write_direct(self, source, source_sel=None, dest_sel=None):
         """Write data directly to HDF5 from a NumPy array.
@@ -1709,6 +2444,7 @@ class Dataset(HLObject):
         """Refresh the dataset metadata by reloading from the file.
         """
         self.id.refresh()
+        self._invalidateChunkCache()
         self._shape = self.get_shape()
         self._num_chunks = None  # aditional state we'll get when requested
         self._allocated_size = None  # as above
@@ -1747,11 +2483,15 @@ class MultiManager():
     """
     high-level object to support slicing operations
     that map to H5Dread_multi/H5Dwrite_multi
+
+    Reads and writes are done by a pool of max_workers threads that is kept
+    between calls.  Call close() (or use the MultiManager as a context manager)
+    to stop the threads when done.
     """
     # Avoid overtaxing HSDS
     max_workers = 16
 
-    def __init__(self, datasets=None, logger=None):
+    def __init__(self, datasets=None, logger=None, max_workers=None):
         if (datasets is None) or (len(datasets) == 0):
             raise ValueError("MultiManager requires non-empty list of datasets")
         self.datasets = datasets
@@ -1759,6 +2499,43 @@ class MultiManager():
             self.log = logging
         else:
             self.log = logging.getLogger(logger)
+        if max_workers is not None:
+            if max_workers < 1:
+                raise ValueError("max_workers must be at least 1")
+            self.max_workers = max_workers
+        self._pool = None
+
+    def _getPool(self):
+        """Return the WorkerPool for this MultiManager's reads and writes"""
+        if self._pool is not None and self._pool.max_workers != self.max_workers:
+            self._pool.close()  # max_workers was changed
+            self._pool = None
+        if self._pool is None:
+            self._pool = WorkerPool(max_workers=self.max_workers)
+        return self._pool
+
+    def close(self):
+        """Stop the worker threads; they'll be started again if needed"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _reservePools(self):
+        """Make sure the connection pool of each HttpConn used by the datasets can
+        serve all the threads that will use it at once"""
+        conn_counts = {}
+        for dset in self.datasets:
+            http_conn = dset.id.http_conn
+            conn_counts[http_conn] = conn_counts.get(http_conn, 0) + 1
+        for http_conn, count in conn_counts.items():
+            # each dataset read may itself have page_workers requests in flight
+            http_conn.reservePool(min(count, self.max_workers) * http_conn.page_workers)
 
     def read_dset_tl(self, args):
         """
@@ -1786,130 +2563,203 @@ class MultiManager():
             raise e
         return
 
+    def _getSelections(self, args):
+        """Return the list of selection args to use for each dataset"""
+        # Unwrap one-selection list
+        if (isinstance(args, list) and len(args) == 1):
+            args = args[0]
+
+        if not isinstance(args, list):
+            return [args] * len(self.datasets)
+        if len(args) != len(self.datasets):
+            raise ValueError("Number of selections must be one or equal number of datasets")
+        return args
+
+    def _getReadSelection(self, dset, read_args):
+        """Return (selection, split) for reading read_args from dset, where split is
+        True if the read can be split into chunk-aligned pages.  selection is None if
+        it can't be found without reading the dataset."""
+        read_args = read_args if isinstance(read_args, tuple) else (read_args,)
+        if dset._is_empty or dset._shape == () or any(isinstance(x, str) for x in read_args):
+            return None, False
+        try:
+            selection = sel.select(dset, read_args)
+        except (TypeError, ValueError, IndexError):
+            return None, False  # let the dataset read report the error
+        if check_dtype(ref=dset.dtype):
+            return selection, False  # references are converted on read
+        if not isinstance(selection, sel.SimpleSelection):
+            return selection, False
+        if selection.nselect == 0 or selection.mshape == ():
+            return selection, False
+        if dset._getChunkCache(selection, dset.dtype) is not None:
+            return selection, False  # read through the cache instead
+        return selection, True
+
+    def _getWriteBytes(self, dset, write_args, val):
+        """Return the approximate size of a write, for ordering the writes.  val isn't
+        converted, since that's left to the dataset (e.g. for ragged vlen values)"""
+        nbytes = getattr(val, "nbytes", None)
+        if nbytes is not None:
+            return nbytes
+        selection, _ = self._getReadSelection(dset, write_args)
+        if selection is None or selection.nselect is None:
+            return 0
+        return selection.nselect * dset.dtype.itemsize
+
+    def _getReadPages(self, dset, selection, nbytes, max_page_bytes):
+        """Split the selection into chunk-aligned pages of at most max_page_bytes (or a
+        single chunk if that's larger), or less if the page sizer has found that to be
+        too large for the dataset"""
+        sel_stop, split_dim, max_chunks, mshape_split_dim, chunk_size = dset._getSplitDim(selection)
+        slab_bytes = -(-nbytes // max_chunks)  # bytes per chunk along split_dim
+        chunks_per_page = dset.id.http_conn.page_sizer.getChunksPerPage(dset.id.uuid, slab_bytes, max_chunks)
+        chunks_per_page = min(chunks_per_page, max(1, max_page_bytes // slab_bytes))
+        num_rows = chunks_per_page * chunk_size
+        return dset._getPages(selection.start, sel_stop, selection.step, split_dim, selection.mshape,
+                              mshape_split_dim, num_rows)
+
+    def iter_read(self, args, max_bytes=None):
+        """
+        Read the same slice (or a list of slices, one per dataset) from each of the
+        datasets managed by this MultiManager, yielding (index, data) for each dataset
+        as soon as its read is complete, where index is the position of the dataset
+        in the datasets list.
+
+        Hyperslab selections are split into chunk-aligned pages, and the pages of all
+        the datasets are read on one pool of max_workers threads, largest first, so
+        one large dataset doesn't leave the other threads idle.
+
+        If max_bytes is given, datasets are only started while the data read and not
+        yet yielded is less than max_bytes (one dataset at a time is always read).
+        """
+        # requests are spread over the service nodes by each dataset's HttpConn
+        # (see the endpoints option), so just make sure the pools are big enough
+        self._reservePools()
+        selections = self._getSelections(args)
+
+        # find the reads that can be split, and how many bytes they'll return
+        reads = []  # (nbytes, dataset index, selection, split)
+        for idx, dset in enumerate(self.datasets):
+            selection, split = self._getReadSelection(dset, selections[idx])
+            nbytes = 0
+            if selection is not None:
+                nbytes = selection.nselect * dset.dtype.itemsize
+            reads.append((nbytes, idx, selection, split))
+        reads.sort(key=lambda read: read[0], reverse=True)
+
+        # give each thread a share of the total
+        total_bytes = sum(read[0] for read in reads)
+        if max_bytes is not None:
+            total_bytes = min(total_bytes, max_bytes)
+        max_page_bytes = max(MIN_PAGE_BYTES, total_bytes // self.max_workers)
+        self.log.debug(f"multi-read of {len(reads)} datasets, max_page_bytes: {max_page_bytes}")
+
+        targets = {}  # dataset index -> (selection, params, arr) for split reads
+        remaining = {}  # dataset index -> number of reads not finished
+        retried = set()  # datasets being read again after a page was rejected
+        futures = {}  # future -> (dataset index, page)
+        read_bytes = {}  # dataset index -> bytes the read will return
+        outstanding_bytes = 0  # bytes read (or being read) and not yet yielded
+
+        pool = self._getPool()
+        try:
+            while reads or futures:
+                # start reads that fit in max_bytes, with their pages largest first
+                tasks = []  # (nbytes, dataset index, page)
+                while reads:
+                    nbytes, idx, selection, split = reads[0]
+                    if max_bytes is not None and remaining and outstanding_bytes + nbytes > max_bytes:
+                        break
+                    reads.pop(0)
+                    read_bytes[idx] = nbytes
+                    outstanding_bytes += nbytes
+                    dset = self.datasets[idx]
+                    if not split:
+                        tasks.append((nbytes, idx, None))  # read by the dataset in one go
+                        remaining[idx] = 1
+                        continue
+                    arr = numpy.empty(selection.mshape, dtype=dset.dtype)
+                    targets[idx] = (selection, dset._getReadParams(dset.dtype), arr)
+                    pages = self._getReadPages(dset, selection, nbytes, max_page_bytes)
+                    for page in pages:
+                        tasks.append((dset._getPageBytes(page, arr.dtype), idx, page))
+                    remaining[idx] = len(pages)
+                tasks.sort(key=lambda task: task[0], reverse=True)
+                for _, idx, page in tasks:
+                    dset = self.datasets[idx]
+                    if page is None:
+                        future = pool.submit(self.read_dset_tl, (dset, idx, selections[idx]))
+                    else:
+                        selection, params, arr = targets[idx]
+                        req = "/datasets/" + dset.id.uuid + "/value"
+                        future = pool.submit(dset._readPageTimed, req, params, page, arr, arr.dtype)
+                    futures[future] = (idx, page)
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx, page = futures.pop(future)
+                    remaining[idx] -= 1
+                    try:
+                        result = future.result()
+                    except IOError as ioe:
+                        if page is None or ioe.errno not in (408, 413):
+                            raise ValueError(f"Error during multi-read: {ioe}")
+                        if idx not in retried:
+                            # server rejected the page (or took too long), so read this
+                            # dataset again with pages sized by the dataset
+                            dset = self.datasets[idx]
+                            selection, params, arr = targets[idx]
+                            page_bytes = dset._getPageBytes(page, arr.dtype)
+                            dset.id.http_conn.page_sizer.reject(dset.id.uuid, page_bytes)
+                            retried.add(idx)
+                            req = "/datasets/" + dset.id.uuid + "/value"
+                            retry = pool.submit(dset._readHyperslab, selection, req, params, arr, arr.dtype)
+                            futures[retry] = (idx, None)
+                            remaining[idx] += 1
+                        result = None  # the retry will fill in the page
+                    except Exception as exc:
+                        raise ValueError(f"Error during multi-read: {exc}")
+                    if remaining[idx] > 0:
+                        continue  # more pages to come
+                    del remaining[idx]
+                    if idx in targets:
+                        data = targets.pop(idx)[2]
+                    else:
+                        data = result[1]
+                    outstanding_bytes -= read_bytes.pop(idx)
+                    yield idx, data
+        finally:
+            # stop reads that haven't started (e.g. an error or the caller stopped early)
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
     def __getitem__(self, args):
         """
         Read the same slice from each of the datasets
         managed by this MultiManager.
         """
-        # Spread requests out evenly among all available SNs
-
-        # TODO: This should eventually be handled at the config/HTTPConn level
-        try:
-            num_endpoints = int(os.environ["SN_CORES"])
-            port_range = os.environ["SN_PORT_RANGE"]
-            ports = port_range.split('-')
-
-            if len(ports) != 2:
-                raise ValueError("Malformed SN_PORT_RANGE")
-
-            low_port = int(ports[0])
-            high_port = int(ports[1])
-
-        except Exception as e:
-            msg = f"{e}: Defaulting Number of SN_COREs to 1"
-            self.log.debug(msg)
-            num_endpoints = 1
-
-        if (num_endpoints > 1):
-            next_port = low_port
-            port_len = len(ports[0])
-
-            for i, dset in enumerate(self.datasets):
-                endpt = dset.id.http_conn._endpoint
-                endpt = endpt[:len(endpt) - port_len] + str(next_port)
-                dset.id.http_conn._endpoint = endpt
-                next_port += 1
-
-                if next_port > high_port:
-                    next_port = low_port
-
-        # TODO: Handle the case where some or all datasets share an HTTPConn object
-
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Unwrap one-selection list
-            if (isinstance(args, list) and len(args) == 1):
-                args = args[0]
-
-            if not isinstance(args, list):
-                read_futures = [executor.submit(self.read_dset_tl,
-                                (self.datasets[i], i, args)) for i in range(len(self.datasets))]
-            elif isinstance(args, list) and len(args) == len(self.datasets):
-                read_futures = [executor.submit(self.read_dset_tl,
-                                (self.datasets[i], i, args[i])) for i in range(len(self.datasets))]
-            else:
-                raise ValueError("Number of selections must be one or equal number of datasets")
-
-            ret_data = [None] * len(self.datasets)
-
-            for future in as_completed(read_futures):
-                try:
-                    result = future.result()
-                    idx = result[0]
-                    dset_data = result[1]
-                    ret_data[idx] = dset_data
-                except Exception as exc:
-                    executor.shutdown(wait=False)
-                    raise ValueError(f"Error during multi-read: {exc}")
-            return ret_data
+        ret_data = [None] * len(self.datasets)
+        for idx, data in self.iter_read(args):
+            ret_data[idx] = data
+        return ret_data
 
     def __setitem__(self, args, vals):
         """
         Write to the provided slice of each dataset
         managed by this MultiManager.
         """
-        # TODO: This should eventually be handled at the config/HTTPConn level
-        try:
-            num_endpoints = int(os.environ["SN_CORES"])
-            port_range = os.environ["SN_PORT_RANGE"]
-            ports = port_range.split('-')
-
-            if len(ports) != 2:
-                raise ValueError("Malformed SN_PORT_RANGE")
-
-            low_port = int(ports[0])
-            high_port = int(ports[1])
+        # requests are spread over the service nodes by each dataset's HttpConn
+        self._reservePools()
 
-            if (high_port - low_port) != num_endpoints - 1:
-                raise ValueError("Malformed port range specification; must be sequential ports")
+        selections = self._getSelections(args)
+        # start the largest writes first, so they don't finish last
+        write_bytes = [self._getWriteBytes(self.datasets[i], selections[i], vals[i]) for i in range(len(vals))]
+        order = sorted(range(len(self.datasets)), key=lambda i: write_bytes[i], reverse=True)
 
-        except Exception as e:
-            msg = f"{e}: Defaulting Number of SN_COREs to 1"
-            self.log.debug(msg)
-            num_endpoints = 1
-
-        # TODO: Handle the case where some or all datasets share an HTTPConn object
-        # For now, assume each connection is distinct
-        if (num_endpoints > 1):
-            next_port = low_port
-            port_len = len(ports[0])
-
-            for i, dset in enumerate(self.datasets):
-                endpt = dset.id.http_conn._endpoint
-                endpt = endpt[:len(endpt) - port_len] + str(next_port)
-                dset.id.http_conn._endpoint = endpt
-                next_port += 1
-
-                if next_port > high_port:
-                    next_port = low_port
-
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Unwrap one-selection list
-            if (isinstance(args, list) and len(args) == 1):
-                args = args[0]
-
-            if not isinstance(args, list):
-                write_futures = [executor.submit(self.write_dset_tl,
-                                 (self.datasets[i], i, args, vals[i])) for i in range(len(self.datasets))]
-            elif isinstance(args, list) and len(args) == len(self.datasets):
-                write_futures = [executor.submit(self.write_dset_tl,
-                                 (self.datasets[i], i, args[i], vals[i])) for i in range(len(self.datasets))]
-            else:
-                raise ValueError("Number of selections must be one or equal to number of datasets")
-
-            for future in as_completed(write_futures):
-                try:
-                    future.result()
-                except Exception as exc:
-                    executor.shutdown(wait=False)
-                    raise ValueError(f"Error during multi-write: {exc}")
-            return
+        writes = [(self.datasets[i], i, selections[i], vals[i]) for i in order]
+        try:
+            self._getPool().map(self.write_dset_tl, writes)
+        except Exception as exc:
+            raise ValueError(f"Error during multi-write: {exc}")
@@ -0,0 +1,108 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+from __future__ import absolute_import
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+DEFAULT_DECODE_MIN_BYTES = 1024 * 1024  # smaller responses are decoded in the calling thread
+
+
+def _decodeShared(name, size, dt, shape):
+    """Decode size bytes from the named shared memory block (runs in a pool process)"""
+    from .base import bytesToArray
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        data = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+    return bytesToArray(data, dt, shape)
+
+
+class DecodePool(object):
+    """
+    Pool of processes for decoding binary responses with variable length types.
+
+    Decoding vlen data creates a Python object for each element, which holds the
+    GIL, so threads reading such data concurrently are limited to one core.  With
+    a DecodePool, responses of at least min_bytes are copied to a shared memory
+    block and decoded by one of the pool's processes, so only the decoded array
+    is pickled (once, to return it).  Responses with fixed size types are just
+    wrapped as an array without copying, so are always decoded in place.
+
+    The processes are started (with the "spawn" method) when the pool is first
+    used, and stopped by close().
+    """
+
+    def __init__(self, processes, min_bytes=DEFAULT_DECODE_MIN_BYTES, logger=None):
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        self._processes = processes
+        self._min_bytes = min_bytes
+        self.log = logger if logger else logging.getLogger()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _getExecutor(self):
+        with self._lock:
+            if self._executor is None:
+                self.log.debug(f"starting decode pool with {self._processes} processes")
+                # forking a process with threads running isn't safe
+                mp_context = multiprocessing.get_context("spawn")
+                self._executor = ProcessPoolExecutor(max_workers=self._processes, mp_context=mp_context)
+            return self._executor
+
+    def usePool(self, dt, nbytes):
+        """Return True if nbytes of data with type dt should be decoded by the pool"""
+        from .base import isVlen
+
+        return nbytes >= self._min_bytes and isVlen(dt)
+
+    def decode(self, data, dt, shape):
+        """Return the array of type dt and the given shape decoded from data (as
+        bytesToArray does)"""
+        from .base import bytesToArray
+
+        if not self.usePool(dt, len(data)):
+            return bytesToArray(data, dt, shape)
+        self.log.debug(f"decoding {len(data)} bytes in decode pool")
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        try:
+            shm.buf[:len(data)] = data
+            future = self._getExecutor().submit(_decodeShared, shm.name, len(data), dt, shape)
+            return future.result()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self):
+        """Stop the processes"""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    @property
+    def processes(self):
+        """number of decoding processes"""
+        return self._processes
+
+    @property
+    def min_bytes(self):
+        """responses smaller than this are decoded in the calling thread"""
+        return self._min_bytes
@@ -21,6 +21,7 @@ import time
 from .objectid import GroupID
 from .group import Group
 from .httpconn import HttpConn
+from .cache import DiskCache
 from .. import config
 
 VERBOSE_REFRESH_TIME = 1.0  # 1 second
@@ -279,6 +280,29 @@ class File(Group):
         track_order=None,
         retries=10,
         timeout=180,
+        page_workers=None,
+        max_inflight_bytes=None,
+        page_target_bytes=None,
+        page_min_latency=None,
+        page_max_latency=None,
+        chunk_cache_size=None,
+        metadata_cache_size=None,
+        metadata_cache_ttl=None,
+        cache_dir=None,
+        pool_maxsize=None,
+        pool_connections=None,
+        pool_block=None,
+        keep_alive=None,
+        retry_backoff=None,
+        transfer_compression=None,
+        transfer_compression_min_size=None,
+        write_compression=None,
+        http2=None,
+        write_behind=None,
+        write_queue_depth=None,
+        endpoints=None,
+        worker_pool_size=None,
+        decode_processes=None,
         **kwds,
     ):
         """Create a new file object.
@@ -326,9 +350,105 @@ class File(Group):
             Number of retry attempts to be used if a server request fails
         timeout
             Timeout value in seconds
+        page_workers
+            Number of page requests that may be in flight concurrently for large dataset reads.
+            If None, the "hs_page_workers" config value is used (default 1 - pages are read serially)
+        max_inflight_bytes
+            Upper bound on the number of bytes of page requests outstanding at one time
+            when page_workers is greater than 1
+        page_target_bytes
+            Number of bytes requested per page for large dataset reads.  Page sizes are adjusted
+            per dataset from the response times, and remembered for later reads.  If None, the
+            "hs_page_target_bytes" config value is used (default 64MiB)
+        page_min_latency
+            Pages that take less than this many seconds are made larger (up to page_target_bytes).
+            If None, the "hs_page_min_latency" config value is used (default 1)
+        page_max_latency
+            Pages that take more than this many seconds are made smaller.  If None, the
+            "hs_page_max_latency" config value is used (default 10)
+        chunk_cache_size
+            Size in bytes of an LRU cache of dataset chunks, so that repeated reads of the same
+            region are served locally.  If None, the "hs_chunk_cache_size" config value is used
+            for files opened in read-only mode (default 0 - no chunk cache).  Set explicitly to
+            enable the cache for writable files
+        metadata_cache_size
+            Max number of metadata responses held when use_cache is True.  If None, the
+            "hs_metadata_cache_size" config value is used (default 10000)
+        metadata_cache_ttl
+            Seconds a cached metadata response stays valid.  If None, the "hs_metadata_cache_ttl"
+            config value is used (default 0 - responses don't expire)
+        cache_dir
+            Directory for a persistent cache of domain objects shared between processes.  When set,
+            opening a file read-only reuses the cached objects if the domain's lastModified time is
+            unchanged, rather than fetching them all from the server.  If None, the "hs_cache_dir"
+            config value is used (default - no persistent cache)
+        pool_maxsize
+            Max number of connections kept open to the server.  If None, the "hs_pool_maxsize"
+            config value is used, and if that's not set the pool grows to match the number
+            of threads using the connection (at least 16)
+        pool_connections
+            Number of hosts to keep connection pools for.  If None, the "hs_pool_connections"
+            config value is used (default 16)
+        pool_block
+            If True, requests wait for a free connection when pool_maxsize connections are
+            in use, rather than opening a connection that is discarded after the request.
+            If None, the "hs_pool_block" config value is used (default False)
+        keep_alive
+            Keep connections open between requests.  If None, the "hs_keep_alive" config
+            value is used (default True)
+        retry_backoff
+            Backoff factor in seconds for retried requests - the nth retry waits
+            retry_backoff * 2 ** (n - 1) seconds.  If None, the "hs_retry_backoff" config
+            value is used (default 1)
+        transfer_compression
+            Codec used to compress binary dataset reads and writes in transit: "gzip",
+            "deflate", or if the zstandard or lz4 packages are installed, "zstd" or "lz4".
+            Writes are only compressed with gzip or deflate, unless write_compression is
+            given.  If None, the "hs_transfer_compression" config value is used
+            (default - not compressed)
+        transfer_compression_min_size
+            Transfers smaller than this many bytes are not compressed.  If None, the
+            "hs_transfer_compression_min_size" config value is used (default 64KiB)
+        write_compression
+            Codec used to compress binary dataset writes, for using "zstd" or "lz4" with a
+            server that can decode them (others take the compressed body as the data), or
+            False to not compress writes.  If None, the "hs_write_compression" config value
+            is used, or if that's not set, transfer_compression if it's "gzip" or "deflate"
+        http2
+            Send requests with HTTP/2 (requires the httpx and h2 packages), so that concurrent
+            requests share a few connections.  Also enabled by using an endpoint of the form
+            h2://host (HTTP/2 over TLS) or h2c://host:port (cleartext HTTP/2).  If None, the
+            "hs_http2" config value is used (default False)
+        write_behind
+            Queue dataset value and attribute writes to be sent by background threads rather
+            than waiting for each to complete.  Errors from queued writes are raised by
+            flush() or close().  If None, the "hs_write_behind" config value is used
+            (default False)
+        write_queue_depth
+            Max number of queued writes before further writes wait for the queue to drain.
+            If None, the "hs_write_queue_depth" config value is used (default 64)
+        endpoints
+            List of equivalent service node endpoints to spread requests over; each request
+            goes to the one with the fewest requests in flight, skipping any that recently
+            failed to connect.  If None, the "hs_endpoints" config value (a comma separated
+            list) is used, or if the SN_CORES and SN_PORT_RANGE environment variables are
+            set, the endpoint with each port in the range
+        worker_pool_size
+            Number of threads kept to send concurrent requests, such as the pages of a
+            dataset read when page_workers is greater than 1.  The threads are reused by
+            each read and write, and stopped when the file is closed.  If None, the
+            "hs_worker_pool_size" config value is used (default 16)
+        decode_processes
+            Number of processes to decode large responses with variable length types in,
+            so reads of such data from many threads (e.g. with MultiManager) aren't limited
+            to one core.  Responses smaller than the "hs_decode_min_bytes" config value
+            (default 1MiB) are decoded in the reading thread.  If None, the
+            "hs_decode_processes" config value is used (default 0 - no decode processes)
         """
         groupid = None
         dn_ids = []
+        disk_cache = None
+        disk_cache_key = None
         # if we're passed a GroupId as domain, just initialize the file object
         # with that.  This will be faster and enable the File object to share the same http connection.
         no_endpoint_info = endpoint is None and username is None and password is None
@@ -406,6 +526,11 @@ class File(Group):
             if swmr:
                 use_cache = False  # disable metadata caching in swmr mode
 
+            if cache_dir is None:
+                cache_dir = cfg.get("hs_cache_dir", None)
+            if cache_dir and use_cache:
+                disk_cache = DiskCache(cache_dir)
+
             http_conn = HttpConn(
                 domain,
                 endpoint=endpoint,
@@ -419,6 +544,28 @@ class File(Group):
                 logger=logger,
                 retries=retries,
                 timeout=timeout,
+                page_workers=page_workers,
+                max_inflight_bytes=max_inflight_bytes,
+                page_target_bytes=page_target_bytes,
+                page_min_latency=page_min_latency,
+                page_max_latency=page_max_latency,
+                chunk_cache_size=chunk_cache_size,
+                metadata_cache_size=metadata_cache_size,
+                metadata_cache_ttl=metadata_cache_ttl,
+                pool_maxsize=pool_maxsize,
+                pool_connections=pool_connections,
+                pool_block=pool_block,
+                keep_alive=keep_alive,
+                retry_backoff=retry_backoff,
+                transfer_compression=transfer_compression,
+                transfer_compression_min_size=transfer_compression_min_size,
+                write_compression=write_compression,
+                http2=http2,
+                write_behind=write_behind,
+                write_queue_depth=write_queue_depth,
+                endpoints=endpoints,
+                worker_pool_size=worker_pool_size,
+                decode_processes=decode_processes,
             )
 
             root_json = None
@@ -428,8 +575,13 @@ class File(Group):
             params = {"getdnids": 1}  # return dn ids if available
 
             if use_cache and mode == "r":
-                params["getobjs"] = "T"
-                params["include_attrs"] = "T"
+                if disk_cache is None:
+                    params["getobjs"] = "T"
+                    params["include_attrs"] = "T"
+                else:
+                    # lastModified will include the last scan of the domain, which is
+                    # what the domain objects are generated from
+                    params["verbose"] = 1
             if bucket:
                 params["bucket"] = bucket
 
@@ -499,6 +651,14 @@ class File(Group):
                 http_conn.close()
                 raise IOError(404, "Unexpected error")
 
+            if disk_cache is not None:
+                disk_cache_key = DiskCache.getKey(http_conn.endpoint, bucket, http_conn.domain, username)
+                if mode == "r":
+                    self._getCachedObjs(root_json, disk_cache, disk_cache_key, http_conn, params)
+                else:
+                    # any cached objects will be out of date once we've made changes
+                    disk_cache.invalidate(disk_cache_key)
+
             if "dn_ids" in root_json:
                 dn_ids = root_json["dn_ids"]
 
@@ -562,9 +722,31 @@ class File(Group):
         self._lastScan = None  # when summary stats where last updated by server
         self._dn_ids = dn_ids
         self._swmr_mode = swmr
+        self._disk_cache = disk_cache
+        self._disk_cache_key = disk_cache_key
 
         Group.__init__(self, self._id, track_order=track_order)
 
+    def _getCachedObjs(self, root_json, disk_cache, key, http_conn, params):
+        """Add the domain objects to root_json, using the disk cache if it is current
+        and fetching them from the server (and updating the cache) otherwise"""
+        root_json.pop("scan_info", None)
+        last_modified = root_json.get("lastModified")
+        domain_objs = disk_cache.get(key, last_modified)
+        if domain_objs is None:
+            params = {k: v for k, v in params.items() if k != "verbose"}
+            params["getobjs"] = "T"
+            params["include_attrs"] = "T"
+            rsp = http_conn.GET("/", params=params, use_cache=False)
+            if rsp.status_code != 200:
+                return
+            # save an empty dict if the server has no objects for the domain so
+            # that we don't ask again until the domain changes
+            domain_objs = json.loads(rsp.text).get("domain_objs", {})
+            disk_cache.put(key, last_modified, domain_objs)
+        if domain_objs:
+            root_json["domain_objs"] = domain_objs
+
     def _getVerboseInfo(self):
         now = time.time()
         if (self._verboseUpdated is None or now - self._verboseUpdated > VERBOSE_REFRESH_TIME):
@@ -769,6 +951,10 @@ class File(Group):
     def flush(self):
         """Tells the service to complete any pending updates to permanent storage"""
         self.log.debug("flush")
+        write_queue = self._id.http_conn.write_queue
+        if write_queue is not None:
+            # wait for queued writes, and raise any errors from them
+            write_queue.flush()
         self.log.info("sending PUT flush request")
         req = "/"
         body = {"flush": 1, "getdnids": 1}
@@ -797,12 +983,18 @@ class File(Group):
                 flush = True
             else:
                 flush = False
-        # do a PUT flush if this file is writable and the server is HSDS and flush is set
-        if flush:
-            self.flush()
-        if self._id._http_conn:
-            self._id._http_conn.close()
-        self._id.close()
+        try:
+            # do a PUT flush if this file is writable and the server is HSDS and flush is set
+            if flush:
+                self.flush()
+            elif self._id._http_conn and self._id._http_conn.write_queue is not None:
+                self._id._http_conn.write_queue.flush()
+        finally:
+            if self._disk_cache is not None and self.mode == "r+":
+                self._disk_cache.invalidate(self._disk_cache_key)
+            if self._id._http_conn:
+                self._id._http_conn.close()
+            self._id.close()
 
     def __enter__(self):
         return self
@@ -19,16 +19,32 @@ import multiprocessing
 import base64
 import requests
 import requests_unixsocket
-from requests import ConnectionError
+from requests import ConnectionError, Timeout
 from requests.adapters import HTTPAdapter, Retry
 import json
 import logging
+import re
+import threading
+import time
+import zlib
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.response import HTTPResponse
 
 from . import openid
 from .. import config
 from . import requests_lambda
+from . import requests_http2
+from .cache import ChunkCache, MetadataCache, getObjectId
+from .writebehind import WriteQueue, DEFAULT_WRITE_QUEUE_DEPTH
+from .workerpool import WorkerPool, DEFAULT_WORKER_POOL_SIZE
+from .decodepool import DecodePool, DEFAULT_DECODE_MIN_BYTES
+from .paging import PageSizer, DEFAULT_PAGE_TARGET_BYTES, DEFAULT_PAGE_MIN_LATENCY, DEFAULT_PAGE_MAX_LATENCY
 
 MAX_CACHE_ITEM_SIZE = 10000  # max size of an item to put in the cache
+DEFAULT_METADATA_CACHE_SIZE = 10000  # max number of responses in the metadata cache
+
+# POST requests that only read from the server (point selections, multi-link and multi-attribute reads)
+_READ_POST_PAT = re.compile(r"^/(?:datasets/[^/]+/value|(?:groups|datasets|datatypes)/[^/]+/(?:links|attributes))$")
 
 
 def eprint(*args, **kwargs):
@@ -36,6 +52,333 @@ def eprint(*args, **kwargs):
 
 
 DEFAULT_TIMEOUT = 180  # seconds - allow time for hsds service to bounce
+DEFAULT_PAGE_WORKERS = 1  # number of page requests a dataset read will have in flight
+DEFAULT_MAX_INFLIGHT_BYTES = 256 * 1024 * 1024  # limit on bytes of outstanding page requests
+DEFAULT_POOL_MAXSIZE = 16  # connections kept per host, unless more threads need them
+DEFAULT_POOL_CONNECTIONS = 16  # number of hosts to keep connection pools for
+DEFAULT_RETRY_BACKOFF = 1  # backoff factor (seconds) for retried requests
+RETRY_STATUS = (500, 502, 503, 504)
+DEFAULT_TRANSFER_COMPRESSION_MIN_SIZE = 64 * 1024  # smaller binary transfers aren't compressed
+SERVER_DECODED_CODECS = ("gzip", "deflate")  # codecs any HSDS can decode request bodies with
+ZLIB_COMPRESSION_LEVEL = 1  # favor speed - transfers are compressed on the fly
+DEFAULT_ENDPOINT_RETRY_TIME = 30  # seconds an endpoint is skipped for after a connection error
+
+
+def _getConfigBool(cfg, name, default):
+    """Return the config value for name as a bool"""
+    val = cfg.get(name, default)
+    if isinstance(val, str):
+        return not val.upper().startswith(("F", "N", "0"))
+    return bool(val)
+
+
+def getTransferCodecs():
+    """Return the codecs that can be used for transfer compression with the
+    packages installed here"""
+    codecs = ["gzip", "deflate"]
+    try:
+        import zstandard  # noqa: F401
+        codecs.append("zstd")
+    except ImportError:
+        pass
+    try:
+        import lz4.frame  # noqa: F401
+        codecs.append("lz4")
+    except ImportError:
+        pass
+    return codecs
+
+
+def _getCompressionCodec(codec, option):
+    """Return the codec to use for a compression option value: None for no compression
+    (None, False, "" or "none"), "gzip" for True, otherwise the codec name, which
+    must be one that's available"""
+    if isinstance(codec, str) and codec.upper() in ("", "NONE", "FALSE"):
+        return None
+    if codec is True:
+        return "gzip"
+    if not codec:
+        return None
+    if codec not in getTransferCodecs():
+        msg = f"{option} {codec} is not available, "
+        msg += f"use one of: {getTransferCodecs()}"
+        raise ValueError(msg)
+    return codec
+
+
+def compressBody(data, codec):
+    """Compress data for sending with the given Content-Encoding"""
+    if codec == "gzip":
+        compressor = zlib.compressobj(ZLIB_COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush()
+    if codec == "deflate":
+        return zlib.compress(data, ZLIB_COMPRESSION_LEVEL)
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor().compress(data)
+    if codec == "lz4":
+        import lz4.frame
+        return lz4.frame.compress(data)
+    raise ValueError(f"unsupported transfer compression: {codec}")
+
+
+def decompressBody(data, codec):
+    """Decompress a body received with the given Content-Encoding"""
+    if codec in ("gzip", "x-gzip"):
+        return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    if codec == "deflate":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if codec == "lz4":
+        import lz4.frame
+        return lz4.frame.decompress(data)
+    raise IOError(f"unsupported Content-Encoding: {codec}")
+
+
+def isDecodedByUrllib3(codec):
+    """Return True if urllib3 decodes responses with the given Content-Encoding itself"""
+    return codec == "identity" or codec in HTTPResponse.CONTENT_DECODERS
+
+
+class TransferStats(object):
+    """
+    Byte counts for binary dataset value transfers, per object id.  For each object,
+    read_bytes and write_bytes give the size of the data, while read_wire_bytes and
+    write_wire_bytes give the number of bytes sent over the network, so comparing the
+    two shows how much transfer compression saves for that dataset.
+    """
+
+    KEYS = ("read_bytes", "read_wire_bytes", "write_bytes", "write_wire_bytes")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}  # obj id -> list of counts in KEYS order
+
+    def _add(self, obj_id, offset, nbytes, wire_bytes):
+        with self._lock:
+            counts = self._counts.get(obj_id)
+            if counts is None:
+                counts = [0] * len(self.KEYS)
+                self._counts[obj_id] = counts
+            counts[offset] += nbytes
+            counts[offset + 1] += wire_bytes
+
+    def addRead(self, obj_id, nbytes, wire_bytes):
+        self._add(obj_id, 0, nbytes, wire_bytes)
+
+    def addWrite(self, obj_id, nbytes, wire_bytes):
+        self._add(obj_id, 2, nbytes, wire_bytes)
+
+    def get(self, obj_id):
+        """Return a dict of the byte counts for the given object id"""
+        with self._lock:
+            counts = self._counts.get(obj_id, [0] * len(self.KEYS))
+            return dict(zip(self.KEYS, counts))
+
+    def totals(self):
+        """Return a dict of the byte counts summed over all objects"""
+        with self._lock:
+            totals = [sum(col) for col in zip(*self._counts.values())] or [0] * len(self.KEYS)
+        return dict(zip(self.KEYS, totals))
+
+    def reset(self):
+        """Remove all the counts"""
+        with self._lock:
+            self._counts.clear()
+
+    def __iter__(self):
+        """Iterate over the ids of objects with counts"""
+        with self._lock:
+            obj_ids = list(self._counts)
+        for obj_id in obj_ids:
+            yield obj_id
+
+    def __len__(self):
+        return len(self._counts)
+
+
+class PoolStats(object):
+    """
+    Counters for the HTTP connection pool of an HttpConn: how many times a connection
+    was taken from the pool, how long requests waited for one, and how many new
+    connections were opened.  Waits only occur when the pool is full and pool_block
+    is set; otherwise a large new_connections count relative to checkouts shows the
+    pool is too small (the extra connections are discarded after use).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Set all the counters to zero"""
+        with self._lock:
+            self._checkouts = 0
+            self._wait_time = 0.0
+            self._max_wait_time = 0.0
+            self._new_connections = 0
+
+    def addCheckout(self, wait_time):
+        with self._lock:
+            self._checkouts += 1
+            self._wait_time += wait_time
+            if wait_time > self._max_wait_time:
+                self._max_wait_time = wait_time
+
+    def addConnection(self):
+        with self._lock:
+            self._new_connections += 1
+
+    @property
+    def checkouts(self):
+        """Number of times a connection was taken from the pool"""
+        return self._checkouts
+
+    @property
+    def wait_time(self):
+        """Total seconds spent waiting for a connection from the pool"""
+        return self._wait_time
+
+    @property
+    def max_wait_time(self):
+        """Longest wait for a connection in seconds"""
+        return self._max_wait_time
+
+    @property
+    def new_connections(self):
+        """Number of connections opened"""
+        return self._new_connections
+
+    def __repr__(self):
+        return (f"<PoolStats checkouts: {self._checkouts} wait_time: {self._wait_time:.3f}s "
+                f"max_wait_time: {self._max_wait_time:.3f}s new_connections: {self._new_connections}>")
+
+
+def getServiceNodeEndpoints(endpoint, sn_cores=None, port_range=None):
+    """Return the list of service node endpoints given by the SN_CORES and SN_PORT_RANGE
+    environment variables (e.g. "4" and "5101-5104"), with the port of endpoint replaced
+    by each port in the range.  Returns None if they aren't set or don't apply."""
+    if sn_cores is None:
+        sn_cores = os.environ.get("SN_CORES")
+    if port_range is None:
+        port_range = os.environ.get("SN_PORT_RANGE")
+    if not sn_cores or not port_range:
+        return None
+    ports = port_range.split("-")
+    if len(ports) != 2:
+        raise ValueError("Malformed SN_PORT_RANGE")
+    low_port = int(ports[0])
+    high_port = int(ports[1])
+    if high_port - low_port != int(sn_cores) - 1:
+        raise ValueError("Malformed port range specification; must be sequential ports")
+    match = re.match(r"^(https?://.*):\d+$", endpoint)
+    if int(sn_cores) < 2 or not match:
+        return None
+    return [f"{match.group(1)}:{port}" for port in range(low_port, high_port + 1)]
+
+
+class EndpointPool(object):
+    """
+    A set of equivalent service node endpoints for the same service.  Each request is
+    sent to the endpoint with the fewest requests in flight.  An endpoint that gives
+    a connection error is skipped for retry_time seconds (unless all endpoints have
+    failed, in which case the one that failed longest ago is tried).
+    """
+
+    def __init__(self, endpoints, retry_time=DEFAULT_ENDPOINT_RETRY_TIME):
+        if not endpoints:
+            raise ValueError("no endpoints given")
+        self._endpoints = list(endpoints)
+        self._retry_time = retry_time
+        self._lock = threading.Lock()
+        self._outstanding = dict.fromkeys(self._endpoints, 0)  # requests in flight
+        self._requests = dict.fromkeys(self._endpoints, 0)  # total requests sent
+        self._failed = {}  # endpoint -> time of last connection error
+
+    def acquire(self):
+        """Return the endpoint to send the next request to.  Call release() when the
+        response has been received"""
+        with self._lock:
+            now = time.time()
+            healthy = [e for e in self._endpoints if now - self._failed.get(e, 0) > self._retry_time]
+            if healthy:
+                endpoint = min(healthy, key=lambda e: (self._outstanding[e], self._requests[e]))
+            else:
+                endpoint = min(self._endpoints, key=lambda e: self._failed[e])
+            self._outstanding[endpoint] += 1
+            self._requests[endpoint] += 1
+            return endpoint
+
+    def release(self, endpoint, failed=False):
+        """Record that a request to endpoint has completed, or got a connection error"""
+        with self._lock:
+            self._outstanding[endpoint] -= 1
+            if failed:
+                self._failed[endpoint] = time.time()
+            else:
+                self._failed.pop(endpoint, None)
+
+    def isHealthy(self, endpoint):
+        """False if endpoint had a connection error in the last retry_time seconds"""
+        with self._lock:
+            return time.time() - self._failed.get(endpoint, 0) > self._retry_time
+
+    def getOutstanding(self, endpoint):
+        """Number of requests in flight to endpoint"""
+        with self._lock:
+            return self._outstanding[endpoint]
+
+    def getRequestCount(self, endpoint):
+        """Number of requests sent to endpoint"""
+        with self._lock:
+            return self._requests[endpoint]
+
+    @property
+    def endpoints(self):
+        return list(self._endpoints)
+
+    def __len__(self):
+        return len(self._endpoints)
+
+
+def _timedPoolClass(pool_cls, pool_stats):
+    """Return a subclass of the urllib3 pool class that records to pool_stats"""
+
+    class CountedConnection(pool_cls.ConnectionCls):
+
+        def connect(self):
+            pool_stats.addConnection()
+            super().connect()
+
+    class TimedConnectionPool(pool_cls):
+
+        ConnectionCls = CountedConnection
+
+        def _get_conn(self, timeout=None):
+            start = time.monotonic()
+            try:
+                return super()._get_conn(timeout=timeout)
+            finally:
+                pool_stats.addCheckout(time.monotonic() - start)
+
+    return TimedConnectionPool
+
+
+class PoolAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools record their usage to a PoolStats instance"""
+
+    def __init__(self, pool_stats, **kwds):
+        self._pool_stats = pool_stats
+        super().__init__(**kwds)
+
+    def init_poolmanager(self, *args, **kwds):
+        super().init_poolmanager(*args, **kwds)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _timedPoolClass(HTTPConnectionPool, self._pool_stats),
+            "https": _timedPoolClass(HTTPSConnectionPool, self._pool_stats),
+        }
 
 
 class CacheResponse(object):
@@ -163,6 +506,28 @@ class HttpConn:
         logger=None,
         retries=3,
         timeout=DEFAULT_TIMEOUT,
+        page_workers=None,
+        max_inflight_bytes=None,
+        page_target_bytes=None,
+        page_min_latency=None,
+        page_max_latency=None,
+        chunk_cache_size=None,
+        metadata_cache_size=None,
+        metadata_cache_ttl=None,
+        pool_maxsize=None,
+        pool_connections=None,
+        pool_block=None,
+        keep_alive=None,
+        retry_backoff=None,
+        transfer_compression=None,
+        transfer_compression_min_size=None,
+        write_compression=None,
+        http2=None,
+        write_behind=None,
+        write_queue_depth=None,
+        endpoints=None,
+        worker_pool_size=None,
+        decode_processes=None,
         **kwds,
     ):
         self._domain = domain_name
@@ -176,17 +541,112 @@ class HttpConn:
         self._api_key = api_key
         self._s = None  # Sessions
         self._server_info = None
+        self._logger = logger
+        if logger is None:
+            self.log = logging.getLogger("h5pyd")
+        else:
+            self.log = logger
+        cfg = config.get_config()  # pulls in state from a .hscfg file (if found).
+        if page_workers is None:
+            page_workers = int(cfg.get("hs_page_workers", DEFAULT_PAGE_WORKERS))
+        if page_workers < 1:
+            raise ValueError("page_workers must be at least 1")
+        self._page_workers = page_workers
+        if max_inflight_bytes is None:
+            max_inflight_bytes = int(cfg.get("hs_max_inflight_bytes", DEFAULT_MAX_INFLIGHT_BYTES))
+        self._max_inflight_bytes = max_inflight_bytes
+        if page_target_bytes is None:
+            page_target_bytes = int(cfg.get("hs_page_target_bytes", DEFAULT_PAGE_TARGET_BYTES))
+        if page_min_latency is None:
+            page_min_latency = float(cfg.get("hs_page_min_latency", DEFAULT_PAGE_MIN_LATENCY))
+        if page_max_latency is None:
+            page_max_latency = float(cfg.get("hs_page_max_latency", DEFAULT_PAGE_MAX_LATENCY))
+        self._page_sizer = PageSizer(page_target_bytes, min_latency=page_min_latency,
+                                     max_latency=page_max_latency)
+        if write_behind is None:
+            write_behind = _getConfigBool(cfg, "hs_write_behind", False)
+        if write_queue_depth is None:
+            write_queue_depth = int(cfg.get("hs_write_queue_depth", DEFAULT_WRITE_QUEUE_DEPTH))
+        if write_behind:
+            self._write_queue = WriteQueue(max_depth=write_queue_depth, logger=self.log)
+        else:
+            self._write_queue = None
+        if worker_pool_size is None:
+            worker_pool_size = int(cfg.get("hs_worker_pool_size", DEFAULT_WORKER_POOL_SIZE))
+        self._worker_pool = WorkerPool(max_workers=worker_pool_size, logger=self.log)
+        if decode_processes is None:
+            decode_processes = int(cfg.get("hs_decode_processes", 0))
+        if decode_processes > 0:
+            decode_min_bytes = int(cfg.get("hs_decode_min_bytes", DEFAULT_DECODE_MIN_BYTES))
+            self._decode_pool = DecodePool(decode_processes, min_bytes=decode_min_bytes, logger=self.log)
+        else:
+            self._decode_pool = None
+        if chunk_cache_size is None:
+            # only use the configured default when the data can't change underneath us
+            if mode == "r" and use_cache:
+                chunk_cache_size = int(cfg.get("hs_chunk_cache_size", 0))
+            else:
+                chunk_cache_size = 0
+        if chunk_cache_size > 0:
+            self._chunk_cache = ChunkCache(chunk_cache_size)
+        else:
+            self._chunk_cache = None
         if use_cache:
-            self._cache = {}
+            if metadata_cache_size is None:
+                metadata_cache_size = int(cfg.get("hs_metadata_cache_size", DEFAULT_METADATA_CACHE_SIZE))
+            if metadata_cache_ttl is None:
+                metadata_cache_ttl = float(cfg.get("hs_metadata_cache_ttl", 0))
+            self._cache = MetadataCache(metadata_cache_size, ttl=metadata_cache_ttl)
             self._objdb = {}
         else:
             self._cache = None
             self._objdb = None
-        self._logger = logger
-        if logger is None:
-            self.log = logging.getLogger("h5pyd")
+        if pool_maxsize is None:
+            pool_maxsize = cfg.get("hs_pool_maxsize", None)
+        if pool_maxsize is None:
+            # size the pool from the number of threads that use it
+            self._pool_auto = True
+            pool_maxsize = max(DEFAULT_POOL_MAXSIZE, page_workers)
         else:
-            self.log = logger
+            self._pool_auto = False
+            pool_maxsize = int(pool_maxsize)
+        if pool_maxsize < 1:
+            raise ValueError("pool_maxsize must be at least 1")
+        self._pool_maxsize = pool_maxsize
+        if pool_connections is None:
+            pool_connections = int(cfg.get("hs_pool_connections", DEFAULT_POOL_CONNECTIONS))
+        if pool_connections < 1:
+            raise ValueError("pool_connections must be at least 1")
+        self._pool_connections = pool_connections
+        if pool_block is None:
+            pool_block = _getConfigBool(cfg, "hs_pool_block", False)
+        self._pool_block = pool_block
+        if keep_alive is None:
+            keep_alive = _getConfigBool(cfg, "hs_keep_alive", True)
+        self._keep_alive = keep_alive
+        if retry_backoff is None:
+            retry_backoff = float(cfg.get("hs_retry_backoff", DEFAULT_RETRY_BACKOFF))
+        self._retry_backoff = retry_backoff
+        self._pool_stats = PoolStats()
+        if transfer_compression is None:
+            transfer_compression = cfg.get("hs_transfer_compression", None)
+        transfer_compression = _getCompressionCodec(transfer_compression, "transfer compression")
+        self._transfer_compression = transfer_compression
+        if write_compression is None:
+            write_compression = cfg.get("hs_write_compression", None)
+        if write_compression is None:
+            # other codecs may not be decoded by the server, and would be taken as the data
+            if transfer_compression in SERVER_DECODED_CODECS:
+                write_compression = transfer_compression
+        else:
+            write_compression = _getCompressionCodec(write_compression, "write compression")
+        self._write_compression = write_compression
+        if transfer_compression_min_size is None:
+            transfer_compression_min_size = int(cfg.get("hs_transfer_compression_min_size",
+                                                        DEFAULT_TRANSFER_COMPRESSION_MIN_SIZE))
+        self._transfer_compression_min_size = transfer_compression_min_size
+        self._transfer_stats = TransferStats()
+        self._pool_lock = threading.Lock()
 
         msg = f"HttpConn.init(domain: {domain_name} use_session: {use_session} "
         msg += f"use_cache: {use_cache} retries: {retries}"
@@ -255,8 +715,37 @@ class HttpConn:
             endpoint = hsds.endpoint
             self.log.debug(f"got hsds endpoint: {endpoint} for 'local' connection")
 
+        http_endpoint = requests_http2.getHttpEndpoint(endpoint)
+        if http_endpoint is not None:
+            # h2:// or h2c:// endpoint
+            endpoint = http_endpoint
+            http2 = True
+        elif http2 is None:
+            http2 = _getConfigBool(cfg, "hs_http2", False)
+        if http2 and not endpoint.startswith(("http://", "https://")):
+            raise ValueError(f"HTTP/2 is not supported for endpoint: {endpoint}")
+        self._http2 = bool(http2)
+
         self._endpoint = endpoint
 
+        # requests can be spread over several equivalent service nodes
+        if endpoints is None:
+            endpoints = cfg.get("hs_endpoints", None)
+            if isinstance(endpoints, str):
+                endpoints = [e.strip() for e in endpoints.split(",") if e.strip()]
+        if endpoints is None and not self._hsds:
+            try:
+                endpoints = getServiceNodeEndpoints(endpoint)
+            except ValueError as ve:
+                self.log.warning(f"{ve}: using endpoint {endpoint}")
+        if endpoints:
+            endpoints = [requests_http2.getHttpEndpoint(e) or e for e in endpoints]
+        if endpoints and len(endpoints) > 1:
+            self.log.info(f"using endpoints: {endpoints}")
+            self._endpoint_pool = EndpointPool(endpoints)
+        else:
+            self._endpoint_pool = None
+
         if username is None:
             if "HS_USERNAME" in os.environ:
                 username = os.environ["HS_USERNAME"]
@@ -298,10 +787,10 @@ class HttpConn:
             elif provider == "google":
                 self.log.debug("creating OpenIDHandler for Google")
 
-                config = api_key.get("client_secret", None)
+                client_secret = api_key.get("client_secret", None)
                 scopes = api_key.get("scopes", None)
                 self._api_key = openid.GoogleOpenID(
-                    endpoint, config=config, scopes=scopes
+                    endpoint, config=client_secret, scopes=scopes
                 )
             elif provider == "keycloak":
                 self.log.debug("creating OpenIDHandler for Keycloak")
@@ -364,6 +853,20 @@ class HttpConn:
 
         return headers
 
+    def getAcceptEncoding(self, size_hint=None):
+        """Return the Accept-Encoding header value for a binary read of about size_hint bytes"""
+        codec = self._transfer_compression
+        if codec is None:
+            return "deflate, gzip"
+        if size_hint is not None and size_hint < self._transfer_compression_min_size:
+            # not worth the compression overhead (and lets the body be read in place)
+            return "identity"
+        codecs = [codec]
+        for fallback in ("gzip", "deflate"):
+            if fallback != codec:
+                codecs.append(fallback)
+        return ", ".join(codecs)
+
     def serverInfo(self):
         if self._server_info:
             return self._server_info
@@ -404,6 +907,18 @@ class HttpConn:
     def getObjDb(self):
         return self._objdb
 
+    def _invalidateCache(self, req):
+        """Remove the cached responses that a write to req may make stale"""
+        if self._cache is None:
+            return
+        obj_id = getObjectId(req)
+        if obj_id is None:
+            # creating objects or domain level change - could affect anything
+            self._cache.clear()
+        else:
+            self._cache.invalidate(obj_id)
+            self._cache.invalidate(None)  # domain level responses (e.g. lastModified)
+
     def GET(self, req, format="json", params=None, headers=None, use_cache=True):
         if self._endpoint is None:
             raise IOError("object not initialized")
@@ -439,9 +954,9 @@ class HttpConn:
 
         if check_cache:
             self.log.debug("httpcon - checking cache")
-            if req in self._cache:
+            rsp = self._cache.get(req)
+            if rsp is not None:
                 self.log.debug("httpcon - returning cache result")
-                rsp = self._cache[req]
                 return rsp
 
         self.log.info(f"GET: {self._endpoint + req} [{params['domain']}] timeout: {self._timeout}")
@@ -461,20 +976,31 @@ class HttpConn:
             else:
                 stream = True
 
-            rsp = s.get(
-                self._endpoint + req,
-                params=params,
-                headers=headers,
-                stream=stream,
-                timeout=self._timeout,
-                verify=self.verifyCert(),
-            )
+            endpoint = self._acquireEndpoint()
+            failed = False
+            try:
+                rsp = s.get(
+                    endpoint + req,
+                    params=params,
+                    headers=headers,
+                    stream=stream,
+                    timeout=self._timeout,
+                    verify=self.verifyCert(),
+                )
+            except ConnectionError:
+                failed = True
+                raise
+            finally:
+                self._releaseEndpoint(endpoint, failed=failed)
             self.log.info(f"status: {rsp.status_code}")
             if self._hsds:
                 self._hsds.run()
         except ConnectionError as ce:
             self.log.error(f"connection error: {ce}")
             raise IOError("Connection Error")
+        except Timeout as te:
+            self.log.error(f"timeout error: {te}")
+            raise IOError(408, "Request Timeout")
         except Exception as e:
             self.log.error(f"got {type(e)} exception: {e}")
             raise IOError("Unexpected exception")
@@ -503,7 +1029,7 @@ class HttpConn:
                 # add to our _cache
                 cache_rsp = CacheResponse(rsp)
                 self.log.debug(f"adding {req} to cache")
-                self._cache[req] = cache_rsp
+                self._cache.put(req, cache_rsp)
 
             if rsp.status_code == 200 and req == "/":
                 self.log.info(f"got domain json: {len(rsp.text)} bytes")
@@ -538,9 +1064,7 @@ class HttpConn:
             raise IOError("object not initialized")
         if self._domain is None:
             raise IOError("no domain defined")
-        if self._cache is not None:
-            # update invalidate everything in cache
-            self._cache = {}
+        self._invalidateCache(req)
         if params:
             self.log.info(f"PUT params: {params}")
         else:
@@ -565,6 +1089,12 @@ class HttpConn:
             headers["Content-Type"] = "application/octet-stream"
             # binary write
             data = body
+            codec = self._write_compression
+            if codec and len(data) >= self._transfer_compression_min_size:
+                data = compressBody(data, codec)
+                headers["Content-Encoding"] = codec
+                self.log.debug(f"PUT body compressed with {codec}: {len(body)} -> {len(data)} bytes")
+            self._transfer_stats.addWrite(getObjectId(req), len(body), len(data))
         else:
             headers["Content-Type"] = "application/json"
             data = json.dumps(body)
@@ -575,20 +1105,31 @@ class HttpConn:
             if self._hsds:
                 self._hsds.run()
             s = self.session
-            rsp = s.put(
-                self._endpoint + req,
-                data=data,
-                headers=headers,
-                params=params,
-                timeout=self._timeout,
-                verify=self.verifyCert(),
-            )
+            endpoint = self._acquireEndpoint()
+            failed = False
+            try:
+                rsp = s.put(
+                    endpoint + req,
+                    data=data,
+                    headers=headers,
+                    params=params,
+                    timeout=self._timeout,
+                    verify=self.verifyCert(),
+                )
+            except ConnectionError:
+                failed = True
+                raise
+            finally:
+                self._releaseEndpoint(endpoint, failed=failed)
             self.log.info(f"status: {rsp.status_code}")
             if self._hsds:
                 self._hsds.run()
         except ConnectionError as ce:
             self.log.error(f"connection error: {ce}")
             raise IOError("Connection Error")
+        except Timeout as te:
+            self.log.error(f"timeout error: {te}")
+            raise IOError(408, "Request Timeout")
 
         if rsp.status_code == 201 and req == "/":
             self.log.info("clearing domain_json cache")
@@ -601,10 +1142,9 @@ class HttpConn:
             raise IOError("object not initialized")
         if self._domain is None:
             raise IOError("no domain defined")
-        if self._cache is not None:
-            # invalidate cache for updates
-            # TBD: handle special case for point selection since that doesn't modify anything
-            self._cache = {}
+        read_only = _READ_POST_PAT.match(req) is not None
+        if not read_only:
+            self._invalidateCache(req)
 
         if params is None:
             params = {}
@@ -615,12 +1155,8 @@ class HttpConn:
         if self._api_key:
             params["api_key"] = self._api_key
 
-        # verify we have write intent (unless this is a dataset point selection)
-        if req.startswith("/datasets/") and req.endswith("/value"):
-            point_sel = True
-        else:
-            point_sel = False
-        if self._mode == "r" and not point_sel:
+        # verify we have write intent (unless this is a request that just reads data)
+        if self._mode == "r" and not read_only:
             raise IOError("Unable perform request (No write intent on file)")
 
         # try to do a POST to the domain
@@ -646,14 +1182,22 @@ class HttpConn:
 
         try:
             s = self.session
-            rsp = s.post(
-                self._endpoint + req,
-                data=data,
-                headers=headers,
-                params=params,
-                timeout=self._timeout,
-                verify=self.verifyCert(),
-            )
+            endpoint = self._acquireEndpoint()
+            failed = False
+            try:
+                rsp = s.post(
+                    endpoint + req,
+                    data=data,
+                    headers=headers,
+                    params=params,
+                    timeout=self._timeout,
+                    verify=self.verifyCert(),
+                )
+            except ConnectionError:
+                failed = True
+                raise
+            finally:
+                self._releaseEndpoint(endpoint, failed=failed)
         except ConnectionError as ce:
             self.log.warning(f"connection error: {ce}")
             raise IOError(str(ce))
@@ -666,8 +1210,7 @@ class HttpConn:
     def DELETE(self, req, params=None, headers=None):
         if self._endpoint is None:
             raise IOError("object not initialized")
-        if self._cache is not None:
-            self._cache = {}
+        self._invalidateCache(req)
         if req not in ("/domains", "/") and self._domain is None:
             raise IOError("no domain defined")
         if params is None:
@@ -690,13 +1233,21 @@ class HttpConn:
         self.log.info("DEL: " + req)
         try:
             s = self.session
-            rsp = s.delete(
-                self._endpoint + req,
-                headers=headers,
-                params=params,
-                timeout=self._timeout,
-                verify=self.verifyCert(),
-            )
+            endpoint = self._acquireEndpoint()
+            failed = False
+            try:
+                rsp = s.delete(
+                    endpoint + req,
+                    headers=headers,
+                    params=params,
+                    timeout=self._timeout,
+                    verify=self.verifyCert(),
+                )
+            except ConnectionError:
+                failed = True
+                raise
+            finally:
+                self._releaseEndpoint(endpoint, failed=failed)
             self.log.info(f"status: {rsp.status_code}")
         except ConnectionError as ce:
             self.log.error(f"connection error: {ce}")
@@ -708,48 +1259,99 @@ class HttpConn:
 
         return rsp
 
+    def _acquireEndpoint(self):
+        """Return the endpoint to send the next request to"""
+        if self._endpoint_pool is None:
+            return self._endpoint
+        return self._endpoint_pool.acquire()
+
+    def _releaseEndpoint(self, endpoint, failed=False):
+        """Call when a request from _acquireEndpoint has a response (or failed to connect)"""
+        if self._endpoint_pool is not None:
+            self._endpoint_pool.release(endpoint, failed=failed)
+
+    def _mountAdapters(self, s):
+        """Mount adapters for http and https using the current pool settings"""
+        retry = Retry(
+            total=self._retries,
+            read=self._retries,
+            connect=self._retries,
+            backoff_factor=self._retry_backoff,
+            status_forcelist=RETRY_STATUS,
+        )
+        for prefix in ("http://", "https://"):
+            adapter = PoolAdapter(
+                self._pool_stats,
+                max_retries=retry,
+                pool_connections=self._pool_connections,
+                pool_maxsize=self._pool_maxsize,
+                pool_block=self._pool_block,
+            )
+            s.mount(prefix, adapter)
+
     @property
     def session(self):
         # create a session object to re-use http connection when possible
         s = requests
-        retries = self._retries
-        backoff_factor = 1
-        status_forcelist = (500, 502, 503, 504)
         lambda_prefix = requests_lambda.LAMBDA_REQ_PREFIX
 
         if self._use_session:
-            if self._s is None:
-                if self._endpoint.startswith("http+unix://"):
-                    self.log.debug(f"create unixsocket session: {self._endpoint}")
-                    s = requests_unixsocket.Session()
-                elif self._endpoint.startswith(lambda_prefix):
-                    s = requests_lambda.Session()
+            with self._pool_lock:
+                if self._s is None:
+                    if self._endpoint.startswith("http+unix://"):
+                        self.log.debug(f"create unixsocket session: {self._endpoint}")
+                        s = requests_unixsocket.Session()
+                    elif self._endpoint.startswith(lambda_prefix):
+                        s = requests_lambda.Session()
+                    elif self._http2:
+                        self.log.debug(f"create HTTP/2 session: {self._endpoint}")
+                        s = requests_http2.Session(
+                            self._endpoint,
+                            max_connections=self._pool_maxsize,
+                            retries=self._retries,
+                            backoff_factor=self._retry_backoff,
+                            retry_status=RETRY_STATUS,
+                            verify=self.verifyCert(),
+                            logger=self.log,
+                        )
+                    else:
+                        # regular request session
+                        s = requests.Session()
+                    if not self._http2:
+                        # connection specific headers aren't allowed with HTTP/2
+                        if not self._keep_alive:
+                            s.headers["Connection"] = "close"
+                        self._mountAdapters(s)
+                    self._s = s
                 else:
-                    # regular request session
-                    s = requests.Session()
-
-                retry = Retry(
-                    total=retries,
-                    read=retries,
-                    connect=retries,
-                    backoff_factor=backoff_factor,
-                    status_forcelist=status_forcelist,
-                )
-
-                s.mount(
-                    "http://",
-                    HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=16),
-                )
-                s.mount(
-                    "https://",
-                    HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=16),
-                )
-                self._s = s
-            else:
-                s = self._s
+                    s = self._s
         return s
 
+    def reservePool(self, count):
+        """Grow the connection pool so that count threads can use this connection
+        at once without waiting for (or discarding) connections.  Has no effect if
+        pool_maxsize was set explicitly."""
+        if not self._pool_auto or count <= self._pool_maxsize:
+            return
+        with self._pool_lock:
+            if count <= self._pool_maxsize:
+                return
+            self.log.debug(f"growing connection pool from {self._pool_maxsize} to {count}")
+            self._pool_maxsize = count
+            if self._s is not None and not self._http2:
+                # connections in use are returned to the old pools and dropped with them
+                self._mountAdapters(self._s)
+
     def close(self):
+        if self._write_queue:
+            # any errors should have been reported by File.flush, just stop the workers
+            try:
+                self._write_queue.close()
+            except Exception as e:
+                self.log.error(f"queued write failed: {e}")
+        self._worker_pool.close()
+        if self._decode_pool:
+            self._decode_pool.close()
         if self._s:
             self._s.close()
             self._s = None
@@ -777,6 +1379,82 @@ class HttpConn:
     def mode(self):
         return self._mode
 
+    @property
+    def page_workers(self):
+        """max number of concurrent page requests for a dataset read"""
+        return self._page_workers
+
+    @property
+    def max_inflight_bytes(self):
+        """max number of bytes of page requests that will be outstanding at one time"""
+        return self._max_inflight_bytes
+
+    @property
+    def http2(self):
+        """True if requests are sent with the HTTP/2 transport"""
+        return self._http2
+
+    @property
+    def pool_maxsize(self):
+        """max number of connections kept open to each host"""
+        return self._pool_maxsize
+
+    @property
+    def pool_stats(self):
+        """PoolStats with connection pool usage counters"""
+        return self._pool_stats
+
+    @property
+    def transfer_compression(self):
+        """codec used to compress binary dataset transfers, or None if not enabled"""
+        return self._transfer_compression
+
+    @property
+    def write_compression(self):
+        """codec used to compress binary dataset writes, or None if not enabled"""
+        return self._write_compression
+
+    @property
+    def transfer_stats(self):
+        """TransferStats with raw and over the wire byte counts per dataset"""
+        return self._transfer_stats
+
+    @property
+    def page_sizer(self):
+        """PageSizer that picks the page size for large dataset reads"""
+        return self._page_sizer
+
+    @property
+    def endpoint_pool(self):
+        """EndpointPool requests are spread over, or None if there's a single endpoint"""
+        return self._endpoint_pool
+
+    @property
+    def write_queue(self):
+        """WriteQueue for background dataset and attribute writes, or None if write_behind
+        isn't enabled"""
+        return self._write_queue
+
+    @property
+    def worker_pool(self):
+        """WorkerPool used for concurrent page, point and multi-selection requests"""
+        return self._worker_pool
+
+    @property
+    def decode_pool(self):
+        """DecodePool used to decode large vlen responses, or None if not enabled"""
+        return self._decode_pool
+
+    @property
+    def chunk_cache(self):
+        """ChunkCache used for dataset reads, or None if not enabled"""
+        return self._chunk_cache
+
+    @property
+    def metadata_cache(self):
+        """MetadataCache used for GET responses, or None if caching is disabled"""
+        return self._cache
+
     @property
     def cache_on(self):
         if self._cache is None:
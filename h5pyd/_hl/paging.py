@@ -0,0 +1,108 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+from __future__ import absolute_import
+
+import threading
+
+DEFAULT_PAGE_TARGET_BYTES = 64 * 1024 * 1024  # bytes requested per page to start with
+DEFAULT_PAGE_MIN_LATENCY = 1.0  # pages faster than this (in seconds) can grow
+DEFAULT_PAGE_MAX_LATENCY = 10.0  # pages slower than this shrink
+MIN_PAGE_BYTES = 64 * 1024  # don't shrink pages below this
+
+
+class PageSizer(object):
+    """
+    Chooses the number of bytes to request per page for dataset reads, per dataset.
+
+    Pages start at target_bytes.  After each page, the time the request took is
+    compared with the latency window: if it took longer than max_latency, the page
+    size is reduced so a request would take about the middle of the window at the
+    observed throughput; if it took less than min_latency, the page size is grown
+    (at most doubling each time, and not beyond target_bytes).  A page rejected by the
+    server as too large (or that timed out) halves the size, and the size it failed at
+    becomes an upper bound for that dataset.
+
+    The sizes are remembered, so later reads of the same dataset start with the
+    page size earlier reads settled on.
+    """
+
+    def __init__(self, target_bytes=DEFAULT_PAGE_TARGET_BYTES, min_latency=DEFAULT_PAGE_MIN_LATENCY,
+                 max_latency=DEFAULT_PAGE_MAX_LATENCY):
+        if target_bytes < 1:
+            raise ValueError("target_bytes must be positive")
+        if min_latency < 0 or max_latency <= min_latency:
+            raise ValueError("expected 0 <= min_latency < max_latency")
+        self._target_bytes = target_bytes
+        self._min_latency = min_latency
+        self._max_latency = max_latency
+        self._page_bytes = {}  # obj id -> current page size
+        self._max_page_bytes = {}  # obj id -> size limit found from rejected pages
+        self._lock = threading.Lock()
+
+    def getPageBytes(self, obj_id):
+        """Return the number of bytes to request per page for the given object"""
+        with self._lock:
+            return self._page_bytes.get(obj_id, self._target_bytes)
+
+    def getChunksPerPage(self, obj_id, slab_bytes, max_chunks):
+        """Return the number of chunks (of slab_bytes each) to request per page,
+        between 1 and max_chunks"""
+        chunks_per_page = self.getPageBytes(obj_id) // max(1, slab_bytes)
+        return int(min(max(1, chunks_per_page), max_chunks))
+
+    def _setPageBytes(self, obj_id, page_bytes):
+        # call with lock held
+        page_bytes = max(page_bytes, MIN_PAGE_BYTES)
+        page_bytes = int(min(page_bytes, self._target_bytes, self._max_page_bytes.get(obj_id, page_bytes)))
+        self._page_bytes[obj_id] = page_bytes
+        return page_bytes
+
+    def update(self, obj_id, nbytes, elapsed):
+        """Record that a page of nbytes took elapsed seconds, and return the new page size"""
+        with self._lock:
+            page_bytes = self._page_bytes.get(obj_id, self._target_bytes)
+            mid_latency = (self._min_latency + self._max_latency) / 2
+            if elapsed > self._max_latency:
+                page_bytes = self._setPageBytes(obj_id, nbytes * mid_latency / elapsed)
+            elif elapsed < self._min_latency and nbytes * 2 >= page_bytes:
+                # only grow based on pages that were close to full size
+                growth = min(2.0, mid_latency / max(elapsed, 0.001))
+                page_bytes = self._setPageBytes(obj_id, max(page_bytes, nbytes * growth))
+            return page_bytes
+
+    def reject(self, obj_id, nbytes):
+        """Record that a page of nbytes was too large, and return the new page size"""
+        with self._lock:
+            max_page_bytes = max(1, nbytes // 2)
+            self._max_page_bytes[obj_id] = max_page_bytes
+            self._page_bytes[obj_id] = max_page_bytes
+            return max_page_bytes
+
+    def forget(self, obj_id):
+        """Drop what's been learned about the given object"""
+        with self._lock:
+            self._page_bytes.pop(obj_id, None)
+            self._max_page_bytes.pop(obj_id, None)
+
+    @property
+    def target_bytes(self):
+        """Page size used for datasets without a history"""
+        return self._target_bytes
+
+    @property
+    def min_latency(self):
+        return self._min_latency
+
+    @property
+    def max_latency(self):
+        return self._max_latency
@@ -0,0 +1,178 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+"""
+HTTP/2 transport for HttpConn, using httpx (an optional dependency, installed with
+"pip install h5pyd[http2]").  Session provides the subset of the requests.Session
+interface that HttpConn uses, so concurrent requests from many threads are
+multiplexed over a few connections rather than needing one connection each.
+"""
+
+import json
+import time
+
+from requests import ConnectionError, ReadTimeout
+
+HTTP2_PREFIX = "h2://"  # HTTP/2 over TLS, e.g. h2://hsds.example.org
+HTTP2_CLEARTEXT_PREFIX = "h2c://"  # HTTP/2 without TLS, e.g. h2c://localhost:5101
+MAX_BACKOFF = 120  # max number of seconds to wait before retrying a request
+
+
+def _import_httpx():
+    try:
+        import httpx
+        import h2  # noqa: F401
+    except ImportError:
+        raise ImportError("httpx and h2 are needed for HTTP/2 - install with: pip install h5pyd[http2]")
+    return httpx
+
+
+def getHttpEndpoint(endpoint):
+    """Return the http(s) url for an h2:// or h2c:// endpoint, or None if the
+    endpoint doesn't use one of those schemes"""
+    if endpoint.startswith(HTTP2_PREFIX):
+        return "https://" + endpoint[len(HTTP2_PREFIX):]
+    if endpoint.startswith(HTTP2_CLEARTEXT_PREFIX):
+        return "http://" + endpoint[len(HTTP2_CLEARTEXT_PREFIX):]
+    return None
+
+
+class Http2RawResponse(object):
+    """Stand-in for the urllib3 response at requests.Response.raw"""
+
+    def __init__(self, rsp):
+        self._rsp = rsp
+
+    def tell(self):
+        """Number of bytes read from the network (before any content decoding)"""
+        return self._rsp.num_bytes_downloaded
+
+    def release_conn(self):
+        pass
+
+
+class Http2Response(object):
+    """Wrap an httpx response in a requests.Response looking class"""
+
+    def __init__(self, rsp):
+        self._rsp = rsp
+        self.raw = Http2RawResponse(rsp)
+
+    @property
+    def status_code(self):
+        return self._rsp.status_code
+
+    @property
+    def reason(self):
+        return self._rsp.reason_phrase
+
+    @property
+    def headers(self):
+        return self._rsp.headers
+
+    @property
+    def content(self):
+        return self._rsp.content
+
+    @property
+    def text(self):
+        return self._rsp.text
+
+    @property
+    def http_version(self):
+        """e.g. "HTTP/2" """
+        return self._rsp.http_version
+
+    def json(self):
+        return json.loads(self._rsp.text)
+
+    def iter_content(self, chunk_size=1):
+        content = self._rsp.content
+        for n in range(0, len(content), chunk_size):
+            yield content[n:n + chunk_size]
+
+    def close(self):
+        self._rsp.close()
+
+    def __repr__(self):
+        return f"<Http2Response [{self.status_code}]>"
+
+
+class Session(object):
+    """
+    requests.Session look-alike that sends requests with an httpx client with HTTP/2
+    enabled.  For https endpoints HTTP/2 is negotiated with the server (falling back to
+    HTTP/1.1 if the server doesn't support it); for http endpoints HTTP/2 is used
+    directly ("prior knowledge"), so the server must support cleartext HTTP/2.
+
+    Connection errors are retried by the transport (and raised as the equivalent
+    requests exceptions if they persist), and responses with one of the
+    retry_status codes are retried with exponential backoff, as for the urllib3
+    Retry used by the requests session.
+    """
+
+    def __init__(self, endpoint, max_connections=16, retries=3, backoff_factor=1,
+                 retry_status=(500, 502, 503, 504), verify=True, logger=None):
+        httpx = _import_httpx()
+        self._httpx = httpx
+        self._retries = retries
+        self._backoff_factor = backoff_factor
+        self._retry_status = retry_status
+        self.log = logger
+        cleartext = endpoint.startswith("http://")
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        transport = httpx.HTTPTransport(http1=not cleartext, http2=True, limits=limits,
+                                        retries=retries, verify=verify)
+        self._client = httpx.Client(transport=transport, verify=verify)
+        self.headers = {}
+
+    def mount(self, prefix, adapter):
+        # connection pooling is managed by the httpx transport
+        pass
+
+    def _request(self, method, url, params=None, headers=None, data=None, timeout=None):
+        if headers:
+            req_headers = dict(self.headers)
+            req_headers.update(headers)
+        else:
+            req_headers = self.headers
+        if isinstance(data, (bytearray, memoryview)):
+            data = bytes(data)
+        for attempt in range(self._retries + 1):
+            try:
+                rsp = self._client.request(method, url, params=params, headers=req_headers,
+                                           content=data, timeout=timeout)
+            except self._httpx.TimeoutException as te:
+                raise ReadTimeout(str(te))
+            except self._httpx.TransportError as te:
+                raise ConnectionError(str(te))
+            if rsp.status_code not in self._retry_status or attempt == self._retries:
+                return Http2Response(rsp)
+            backoff = min(self._backoff_factor * 2 ** attempt, MAX_BACKOFF) if attempt > 0 else 0
+            if self.log:
+                self.log.warning(f"{method} {url} got status: {rsp.status_code}, retrying in {backoff}s")
+            time.sleep(backoff)
+
+    def get(self, url, params=None, headers=None, stream=False, timeout=None, verify=None):
+        return self._request("GET", url, params=params, headers=headers, timeout=timeout)
+
+    def put(self, url, data=None, params=None, headers=None, timeout=None, verify=None):
+        return self._request("PUT", url, params=params, headers=headers, data=data, timeout=timeout)
+
+    def post(self, url, data=None, params=None, headers=None, timeout=None, verify=None):
+        return self._request("POST", url, params=params, headers=headers, data=data, timeout=timeout)
+
+    def delete(self, url, params=None, headers=None, timeout=None, verify=None):
+        return self._request("DELETE", url, params=params, headers=headers, timeout=timeout)
+
+    def close(self):
+        self._client.close()
@@ -503,22 +503,21 @@ class FancySelection(Selection):
             elif hasattr(arg, 'dtype') and arg.dtype == np.dtype('bool'):
                 if len(arg.shape) != 1:
                     raise TypeError("Boolean indexing arrays must be 1-D")
-                arg = arg.nonzero()[0]
-                try:
-                    slices.append(list(arg))
-                except TypeError:
-                    pass
-                else:
-                    if sorted(arg) != list(arg):
-                        raise TypeError("Indexing elements must be in increasing order")
+                arg = arg.nonzero()[0]  # indices are in increasing order
+                slices.append(arg)
                 mshape.append(len(arg))
                 select_type = H5S_SELLECT_FANCY
             elif isinstance(arg, list) or hasattr(arg, 'dtype'):
                 # coordinate selection
-                slices.append(arg)
-                for x in arg:
-                    if x < 0 or x >= length:
-                        raise IndexError(f"Index ({arg}) out of range (0-{length - 1})")
+                try:
+                    coords = np.asarray(arg, dtype=np.int64)
+                except (TypeError, ValueError):
+                    raise TypeError(f"Unexpected arg type: {arg} - {type(arg)}")
+                if coords.ndim != 1:
+                    raise TypeError(f"Unexpected arg type: {arg} - {type(arg)}")
+                if coords.size and (coords.min() < 0 or coords.max() >= length):
+                    raise IndexError(f"Index ({arg}) out of range (0-{length - 1})")
+                slices.append(coords)
                 if num_coordinates is None:
                     num_coordinates = len(arg)
                 elif num_coordinates == len(arg):
@@ -549,7 +548,7 @@ class FancySelection(Selection):
             if isinstance(s, slice):
                 length = self._shape[idx]
                 _, count, _ = _translate_slice(s, length)
-            elif isinstance(s, list):
+            elif isinstance(s, (list, np.ndarray)):
                 count = len(s)
             else:
                 # scalar selection
@@ -558,12 +557,25 @@ class FancySelection(Selection):
 
         return npoints
 
-    def getQueryParam(self):
-        """ Get select param for use with HDF Rest API"""
+    @property
+    def coordinate_dims(self):
+        """ Dimensions that are selected with a list of coordinates """
+        return [dim for dim, s in enumerate(self._slices) if isinstance(s, (list, np.ndarray))]
+
+    def getQueryParam(self, coords=None):
+        """ Get select param for use with HDF Rest API.  coords is an optional
+        dict of dimension to the coordinates to use in place of the selection's
+        (e.g. to select part of the coordinate list)"""
+        slices = list(self._slices)
+        if coords:
+            for dim in coords:
+                slices[dim] = coords[dim]
+        # with a single coordinate list, evenly spaced coordinates can be sent as a slice
+        compact = len(self.coordinate_dims) == 1
         query = []
         query.append('[')
-        rank = len(self._slices)
-        for dim, s in enumerate(self._slices):
+        rank = len(slices)
+        for dim, s in enumerate(slices):
             if isinstance(s, slice):
                 if s.start is None and s.stop is None:
                     query.append(':')
@@ -573,13 +585,8 @@ class FancySelection(Selection):
                     query.append(f"{s.start}:{s.stop}")
                 if s.step and s.step != 1:
                     query.append(f":{s.step}")
-            elif isinstance(s, list) or hasattr(s, 'dtype'):
-                query.append('[')
-                for idx, n in enumerate(s):
-                    query.append(str(n))
-                    if idx + 1 < len(s):
-                        query.append(',')
-                query.append(']')
+            elif isinstance(s, (list, np.ndarray)):
+                query.append(_getCoordinateParam(s, compact=compact))
             else:
                 # scalar selection
                 query.append(str(s))
@@ -595,6 +602,21 @@ class FancySelection(Selection):
         return f"FancySelection(shape:{self._shape}, slices: {self._slices})"
 
 
+def _getCoordinateParam(coords, compact=False):
+    """ Return the select param text for a list of coordinates.  If compact is
+    set, evenly spaced increasing coordinates are given as a slice."""
+    coords = np.asarray(coords, dtype=np.int64)
+    if compact and len(coords) > 1:
+        steps = np.diff(coords)
+        step = int(steps[0])
+        if step > 0 and np.all(steps == step):
+            stop = int(coords[-1]) + 1
+            if step == 1:
+                return f"{coords[0]}:{stop}"
+            return f"{coords[0]}:{stop}:{step}"
+    return "[" + ",".join(map(str, coords.tolist())) + "]"
+
+
 def _expand_ellipsis(args, rank):
     """ Expand ellipsis objects and fill in missing axes.
     """
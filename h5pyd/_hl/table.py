@@ -298,7 +298,10 @@ class Table(Dataset):
 
         req = "/datasets/" + self.id.uuid + "/value"
 
-        rsp = self.PUT(req, body=value, format="json", params=params)
+        try:
+            rsp = self.PUT(req, body=value, format="json", params=params)
+        finally:
+            self._invalidateChunkCache()
         indices = None
         arr = None
         if "index" in rsp:
@@ -413,7 +416,10 @@ class Table(Dataset):
             body['value'] = val
             body['append'] = numrows
 
-        self.PUT(req, body=body, format=format, params=params)
+        try:
+            self.PUT(req, body=body, format=format, params=params)
+        finally:
+            self._invalidateChunkCache()
 
         # if we get here, the request was successful, adjust the shape
         total_rows = self._shape[0] + numrows
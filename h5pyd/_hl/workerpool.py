@@ -0,0 +1,132 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+from __future__ import absolute_import
+
+import itertools
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait, FIRST_COMPLETED
+
+DEFAULT_WORKER_POOL_SIZE = 16  # number of threads for concurrent requests
+
+_pool_ids = itertools.count()
+_worker_local = threading.local()  # pool_id is set in each pool thread
+
+
+def _initWorker(pool_id):
+    # the threads mustn't reference the pool, so an unclosed pool can be garbage
+    # collected (and its idle threads stop)
+    _worker_local.pool_id = pool_id
+
+
+class WorkerPool(object):
+    """
+    Long-lived pool of threads for sending requests concurrently, so threads aren't
+    started and stopped for each parallel read or write.
+
+    The threads are started when the pool is first used, and stopped by close()
+    (or when used as a context manager, on exit), or once the pool is garbage
+    collected; the pool starts new threads if it's used again after close().
+
+    Work submitted from one of the pool's own threads is run in that thread
+    rather than queued, so a task that itself uses the pool (e.g. a dataset read
+    that reads its pages in parallel) can't end up waiting on work that is queued
+    behind it.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKER_POOL_SIZE, logger=None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self._max_workers = max_workers
+        self.log = logger if logger else logging.getLogger()
+        self._executor = None
+        self._lock = threading.Lock()
+        self._id = next(_pool_ids)
+
+    def _getExecutor(self):
+        with self._lock:
+            if self._executor is None:
+                self.log.debug(f"starting worker pool with {self._max_workers} threads")
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, initializer=_initWorker,
+                                                    initargs=(self._id,))
+            return self._executor
+
+    def inWorker(self):
+        """Return True if called from one of the pool's threads"""
+        return getattr(_worker_local, "pool_id", None) == self._id
+
+    def submit(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on one of the pool's threads and return a Future
+        for the result"""
+        if self.inWorker():
+            future = Future()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._getExecutor().submit(func, *args, **kwargs)
+
+    def map(self, func, items, max_pending=None):
+        """Call func for each of items on the pool's threads, with at most max_pending
+        calls queued or running at any time, and return the list of results.  If a call
+        raises, the calls that haven't started are cancelled, and the exception is raised
+        once the running ones have finished."""
+        items = list(items)
+        if len(items) < 2 or self.inWorker():
+            return [func(item) for item in items]
+        if max_pending is None:
+            max_pending = self._max_workers
+        executor = self._getExecutor()
+        results = [None] * len(items)
+        pending = {}  # future -> index of its item
+        next_item = 0
+        try:
+            while next_item < len(items) or pending:
+                while next_item < len(items) and len(pending) < max_pending:
+                    pending[executor.submit(func, items[next_item])] = next_item
+                    next_item += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            raise
+        return results
+
+    def close(self):
+        """Wait for running work to finish and stop the threads"""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def max_workers(self):
+        """number of threads in the pool"""
+        return self._max_workers
+
+    @property
+    def started(self):
+        """True if the pool's threads are running"""
+        return self._executor is not None
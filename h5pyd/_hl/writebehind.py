@@ -0,0 +1,162 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+from __future__ import absolute_import
+
+import collections
+import logging
+import threading
+
+DEFAULT_WRITE_QUEUE_DEPTH = 64  # max number of writes waiting to be sent
+DEFAULT_WRITE_WORKERS = 4  # number of threads sending queued writes
+
+
+class WriteQueue(object):
+    """
+    Queue of writes that are sent to the server by background threads, so the
+    caller doesn't wait for each write to complete.
+
+    Writes are queued per object (e.g. a dataset's value writes, or the attributes
+    of a group), and the writes for an object are sent one at a time in the order
+    they were queued, while writes to different objects are sent concurrently.  A
+    write queued for the same object and region as the last write still waiting for
+    that object replaces it, since only the last value would be kept anyway.
+
+    When max_depth writes are waiting, submit() blocks until one has been sent.
+    Errors are held until flush() is called, which waits for all queued writes and
+    then raises the first error.
+    """
+
+    def __init__(self, max_depth=DEFAULT_WRITE_QUEUE_DEPTH, workers=DEFAULT_WRITE_WORKERS, logger=None):
+        if max_depth < 1:
+            raise ValueError("max_depth must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self._max_depth = max_depth
+        self._num_workers = workers
+        self.log = logger if logger else logging.getLogger()
+        self._cond = threading.Condition()
+        self._pending = {}  # obj id -> deque of [region, func] waiting to be sent
+        self._ready = collections.deque()  # obj ids with pending writes and no active write
+        self._active = set()  # obj ids with a write being sent
+        self._count = 0  # number of writes waiting to be sent
+        self._coalesced = 0  # number of writes replaced by a later one
+        self._errors = []
+        self._threads = []
+        self._closed = False
+
+    def _startWorkers(self):
+        # call with lock held
+        while len(self._threads) < self._num_workers:
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, obj_id, region, func):
+        """Queue func (called with no arguments) to write region of obj_id.  Pass None
+        for region if the write shouldn't replace or be replaced by other writes"""
+        with self._cond:
+            if self._closed:
+                raise ValueError("write queue is closed")
+            pending = self._pending.get(obj_id)
+            if region is not None and pending and pending[-1][0] == region:
+                self.log.debug(f"coalescing write to {obj_id}: {region}")
+                pending[-1][1] = func
+                self._coalesced += 1
+                return
+            while self._count >= self._max_depth:
+                # back pressure - wait for a worker to take a write
+                self._cond.wait()
+            pending = self._pending.get(obj_id)  # may have been sent while waiting
+            if pending is None:
+                pending = collections.deque()
+                self._pending[obj_id] = pending
+            pending.append([region, func])
+            self._count += 1
+            if obj_id not in self._active and len(pending) == 1:
+                self._ready.append(obj_id)
+            self._startWorkers()
+            self._cond.notify_all()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._ready and not self._closed:
+                    self._cond.wait()
+                if not self._ready:
+                    return  # closed
+                obj_id = self._ready.popleft()
+                pending = self._pending[obj_id]
+                region, func = pending.popleft()
+                self._count -= 1
+                self._active.add(obj_id)
+                self._cond.notify_all()
+            try:
+                func()
+            except Exception as e:
+                self.log.error(f"queued write to {obj_id} failed: {e}")
+                with self._cond:
+                    self._errors.append(e)
+            with self._cond:
+                self._active.discard(obj_id)
+                if pending:
+                    self._ready.append(obj_id)
+                else:
+                    del self._pending[obj_id]
+                self._cond.notify_all()
+
+    def wait(self, obj_id=None):
+        """Wait until all writes queued for obj_id (or for all objects if None) are done"""
+        with self._cond:
+            if obj_id is None:
+                while self._pending:
+                    self._cond.wait()
+            else:
+                while obj_id in self._pending:
+                    self._cond.wait()
+
+    def flush(self):
+        """Wait for all queued writes, and raise the first error from any of them"""
+        self.wait()
+        with self._cond:
+            errors = self._errors
+            self._errors = []
+        if errors:
+            if len(errors) > 1:
+                self.log.error(f"{len(errors)} queued writes failed")
+            raise errors[0]
+
+    def close(self):
+        """Send any queued writes and stop the worker threads"""
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._threads = []
+
+    @property
+    def max_depth(self):
+        """max number of writes waiting to be sent before submit blocks"""
+        return self._max_depth
+
+    @property
+    def pending(self):
+        """number of writes waiting to be sent"""
+        with self._cond:
+            return self._count
+
+    @property
+    def coalesced(self):
+        """number of writes that were replaced by a later write to the same region"""
+        return self._coalesced
@@ -0,0 +1,121 @@
+import numpy as np
+import time
+import sys
+
+from h5pyd import special_dtype
+from h5pyd._hl.base import bytesToArray, arrayToBytes, readElement
+from h5pyd._hl.base import copyElement, getByteArraySize
+from h5pyd._hl.base import jsonToArray, toTuple, copyToArray
+from h5pyd._hl.h5type import check_dtype
+
+# Compare the bulk bytestream codec against the element by element
+# implementation.  Runs locally - no server is needed.
+#
+# usage: python codec_benchmark.py [num_elements]
+
+
+def legacy_decode(data, dt, nelements):
+    arr = np.zeros((nelements,), dtype=dt)
+    offset = 0
+    for index in range(nelements):
+        offset = readElement(data, offset, arr, index, dt)
+    return arr
+
+
+def legacy_encode(arr):
+    buffer = bytearray(getByteArraySize(arr))
+    offset = 0
+    for e in arr:
+        offset = copyElement(e, arr.dtype, buffer, offset)
+    return buffer
+
+
+def legacy_json(data_shape, dt, data_json):
+    vlen_base = check_dtype(vlen=dt)
+    if vlen_base:
+        arr = np.zeros(data_shape, dtype=dt)
+        copyToArray(arr, 0, [0] * len(data_shape), data_json, vlen_base=vlen_base)
+    else:
+        arr = np.array(toTuple(len(data_shape), data_json), dtype=dt)
+    return arr
+
+
+def make_vlen_str(nelements):
+    dt = special_dtype(vlen=str)
+    arr = np.empty((nelements,), dtype=dt)
+    for i in range(nelements):
+        arr[i] = f"string value {i}" * (i % 4 + 1)
+    return arr
+
+
+def make_vlen_int(nelements):
+    dt = special_dtype(vlen=np.dtype("int32"))
+    arr = np.empty((nelements,), dtype=dt)
+    for i in range(nelements):
+        arr[i] = np.arange(i % 10, dtype="int32")
+    return arr
+
+
+def make_vlen_compound(nelements):
+    dt = np.dtype([("id", "i8"), ("name", special_dtype(vlen=str)), ("value", "f4")])
+    arr = np.zeros((nelements,), dtype=dt)
+    arr["id"] = np.arange(nelements)
+    arr["value"] = np.arange(nelements) / 2
+    for i in range(nelements):
+        arr[i]["name"] = f"name_{i}"
+    return arr
+
+
+def time_call(func, *args):
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+
+def benchmark_decode(label, arr):
+    nelements = arr.shape[0]
+    data = bytes(arrayToBytes(arr))
+    legacy = time_call(legacy_decode, data, arr.dtype, nelements)
+    bulk = time_call(bytesToArray, data, arr.dtype, (nelements,))
+    print(f"decode {label:<14} legacy: {legacy:8.4f}s  bulk: {bulk:8.4f}s  speedup: {legacy / bulk:6.1f}x")
+
+
+def benchmark_encode(label, arr):
+    legacy = time_call(legacy_encode, arr)
+    bulk = time_call(arrayToBytes, arr)
+    print(f"encode {label:<14} legacy: {legacy:8.4f}s  bulk: {bulk:8.4f}s  speedup: {legacy / bulk:6.1f}x")
+
+
+def benchmark_json(label, arr):
+    data_json = arr.tolist()
+    if arr.dtype.names:
+        data_json = [list(e) for e in data_json]
+    for i, e in enumerate(data_json):
+        if isinstance(e, np.ndarray):
+            data_json[i] = e.tolist()
+    legacy = time_call(legacy_json, arr.shape, arr.dtype, data_json)
+    bulk = time_call(jsonToArray, arr.shape, arr.dtype, data_json)
+    print(f"json   {label:<14} legacy: {legacy:8.4f}s  bulk: {bulk:8.4f}s  speedup: {legacy / bulk:6.1f}x")
+
+
+if __name__ == "__main__":
+    num_elements = 200000
+    if len(sys.argv) > 1:
+        num_elements = int(sys.argv[1])
+    print(f"num_elements: {num_elements}")
+
+    test_arrays = {
+        "vlen str": make_vlen_str(num_elements),
+        "vlen int32": make_vlen_int(num_elements),
+        "vlen compound": make_vlen_compound(num_elements),
+    }
+    for label, arr in test_arrays.items():
+        benchmark_decode(label, arr)
+    for label, arr in test_arrays.items():
+        benchmark_encode(label, arr)
+
+    test_arrays["int32"] = np.arange(num_elements, dtype="int32")
+    compound_dt = np.dtype([("id", "i8"), ("name", "S10"), ("value", "f4")])
+    test_arrays["compound"] = np.zeros((num_elements,), dtype=compound_dt)
+    for label, arr in test_arrays.items():
+        benchmark_json(label, arr)
@@ -0,0 +1,116 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+import asyncio
+import numpy as np
+import config
+
+from common import ut, TestCase
+
+try:
+    import aiohttp  # noqa: F401
+    have_aiohttp = True
+except ImportError:
+    have_aiohttp = False
+
+if not config.get("use_h5py"):
+    from h5pyd import AsyncFile, AsyncGroup, AsyncDataset
+    from h5pyd import File
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no async API")
+@ut.skipUnless(have_aiohttp, "aiohttp is not installed")
+class TestAsyncFile(TestCase):
+
+    """
+        Feature: Datasets can be read and written with asyncio
+    """
+
+    def test_read_write(self):
+        filename = self.getFileName("async_file")
+        data = np.arange(40 * 30, dtype="i4").reshape((40, 30))
+
+        async def write():
+            async with AsyncFile(filename, "w", pool_size=8) as f:
+                self.assertEqual(f.mode, "r+")
+                g1 = await f.create_group("g1")
+                self.assertIsInstance(g1, AsyncGroup)
+                self.assertEqual(g1.name, "/g1")
+                dset = await f.create_dataset("g1/dset", data=data, chunks=(10, 10))
+                self.assertIsInstance(dset, AsyncDataset)
+                self.assertEqual(dset.shape, (40, 30))
+                self.assertEqual(dset.chunks, (10, 10))
+                tasks = [dset.write(np.s_[i:i + 10:2, :], -data[i:i + 10:2, :]) for i in range(0, 40, 10)]
+                await asyncio.gather(*tasks)
+                await dset.write(np.s_[1, 5:10], 7)
+                self.assertEqual(await f.keys(), ["g1"])
+
+        asyncio.run(write())
+
+        expected = data.copy()
+        expected[::2, :] *= -1
+        expected[1, 5:10] = 7
+
+        # check with the sync API
+        with File(filename, "r") as f:
+            np.testing.assert_array_equal(f["g1/dset"][...], expected)
+
+        async def read():
+            async with AsyncFile(filename, "r") as f:
+                dset = await f.get("/g1/dset")
+                self.assertEqual(dset.name, "/g1/dset")
+                self.assertEqual(dset.dtype, np.dtype("i4"))
+                blocks = await asyncio.gather(*[dset.read(np.s_[i:i + 10]) for i in range(0, 40, 10)])
+                np.testing.assert_array_equal(np.concatenate(blocks), expected)
+                np.testing.assert_array_equal(await dset.read(5), expected[5])
+                np.testing.assert_array_equal(await dset.read(), expected)
+                np.testing.assert_array_equal(await dset.read(np.s_[3:17:3, ::4]), expected[3:17:3, ::4])
+                self.assertEqual(await dset.read(np.s_[2, 3]), expected[2, 3])
+                np.testing.assert_array_equal(await dset.read(np.s_[[1, 5, 7], 2:4]), expected[[1, 5, 7], 2:4])
+
+                g1 = await f.get("g1")
+                self.assertEqual(await g1.get("dset"), dset)
+                with self.assertRaises(KeyError):
+                    await f.get("g1/missing")
+                with self.assertRaises(IOError):
+                    await dset.write(0, 0)  # read-only
+
+        asyncio.run(read())
+
+    def test_vlen(self):
+        filename = self.getFileName("async_vlen")
+        dt = np.dtype("O", metadata={"vlen": str})
+        words = np.array(["one", "two", "three", "four"], dtype=dt)
+
+        async def run():
+            async with AsyncFile(filename, "w") as f:
+                dset = await f.create_dataset("words", data=words)
+                await dset.write(1, "deux")
+                return await dset.read()
+
+        arr = asyncio.run(run())
+        self.assertEqual([w.decode() if isinstance(w, bytes) else w for w in arr],
+                         ["one", "deux", "three", "four"])
+
+    def test_open_missing(self):
+        filename = self.getFileName("async_missing")
+
+        async def run():
+            f = AsyncFile(filename, "r")
+            await f.open()
+
+        with self.assertRaises(IOError):
+            asyncio.run(run())
+
+
+if __name__ == '__main__':
+    ut.main()
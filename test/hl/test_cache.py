@@ -0,0 +1,162 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+import time
+import numpy as np
+import config
+
+from common import ut, TestCase
+from h5pyd._hl.cache import ChunkCache, MetadataCache, getObjectId
+
+if config.get("use_h5py"):
+    from h5py import File
+else:
+    from h5pyd import File
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no client side caches")
+class TestChunkCache(TestCase):
+
+    """
+        Feature: LRU cache of dataset chunks bounded by size
+    """
+
+    def test_lru(self):
+        cache = ChunkCache(300)
+        for i in range(3):
+            cache.put("d-1", (i, 0), np.zeros((10,), dtype="i8"))  # 80 bytes each
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.nbytes, 240)
+
+        self.assertIsNotNone(cache.get("d-1", (0, 0)))  # (1, 0) is now least recently used
+        self.assertIsNone(cache.get("d-2", (0, 0)))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+        cache.put("d-2", (0, 0), np.ones((10,), dtype="i8"))
+        self.assertEqual(len(cache), 3)
+        self.assertNotIn(("d-1", (1, 0)), cache)
+        self.assertIn(("d-1", (0, 0)), cache)
+        self.assertLessEqual(cache.nbytes, 300)
+
+        # cached chunks are read-only
+        chunk = cache.get("d-2", (0, 0))
+        with self.assertRaises(ValueError):
+            chunk[0] = 2
+
+        # too big to cache
+        cache.put("d-3", (0,), np.zeros((100,), dtype="i8"))
+        self.assertNotIn(("d-3", (0,)), cache)
+
+    def test_invalidate(self):
+        cache = ChunkCache(1000)
+        for i in range(4):
+            cache.put("d-1", (i,), np.zeros((10,), dtype="i1"))
+            cache.put("d-2", (i,), np.zeros((10,), dtype="i1"))
+        cache.invalidate("d-1")
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.nbytes, 40)
+        self.assertIsNone(cache.get("d-1", (0,)))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+
+        with self.assertRaises(ValueError):
+            ChunkCache(0)
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no client side caches")
+class TestMetadataCache(TestCase):
+
+    """
+        Feature: LRU cache of metadata responses with per object invalidation
+    """
+
+    def test_object_id(self):
+        self.assertEqual(getObjectId("/groups/g-123/links/foo"), "g-123")
+        self.assertEqual(getObjectId("/datasets/d-123"), "d-123")
+        self.assertEqual(getObjectId("/datatypes/t-123/attributes/a"), "t-123")
+        self.assertIsNone(getObjectId("/"))
+        self.assertIsNone(getObjectId("/groups"))
+
+    def test_lru(self):
+        cache = MetadataCache(3)
+        for i in range(3):
+            cache.put(f"/groups/g-{i}", i)
+        self.assertEqual(cache.get("/groups/g-0"), 0)  # g-1 is now least recently used
+        self.assertIsNone(cache.get("/groups/g-9"))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+        cache.put("/", "domain")
+        self.assertEqual(len(cache), 3)
+        self.assertNotIn("/groups/g-1", cache)
+        self.assertIn("/groups/g-0", cache)
+
+        with self.assertRaises(ValueError):
+            MetadataCache(0)
+
+    def test_invalidate(self):
+        cache = MetadataCache(100)
+        cache.put("/", "domain")
+        cache.put("/groups/g-1", "g-1")
+        cache.put("/groups/g-1/links/a", "g-1 link")
+        cache.put("/groups/g-2/attributes/b", "g-2 attr")
+        cache.invalidate("g-1")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("/groups/g-1/links/a"))
+        self.assertEqual(cache.get("/groups/g-2/attributes/b"), "g-2 attr")
+        cache.invalidate(None)
+        self.assertNotIn("/", cache)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl(self):
+        cache = MetadataCache(100, ttl=0.1)
+        cache.put("/groups/g-1", "g-1")
+        self.assertEqual(cache.get("/groups/g-1"), "g-1")
+        time.sleep(0.2)
+        self.assertIsNone(cache.get("/groups/g-1"))
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(MetadataCache(100, ttl=0).ttl)
+
+    def test_file_writes(self):
+        filename = self.getFileName("metadata_cache")
+        with File(filename, "w", metadata_cache_size=100) as f:
+            g1 = f.create_group("g1")
+            g2 = f.create_group("g2")
+            g1.attrs["a"] = 1
+            g2.attrs["b"] = 2
+            cache = f.id.http_conn.metadata_cache
+            self.assertEqual(cache.max_items, 100)
+            self.assertEqual(g1.attrs["a"], 1)
+            self.assertEqual(g2.attrs["b"], 2)
+            hits = cache.hits
+            self.assertEqual(g2.attrs["b"], 2)
+            self.assertEqual(cache.hits, hits + 1)
+
+            # writing to g1 leaves the responses for g2 in the cache
+            g1.attrs["a"] = 3
+            self.assertEqual(g2.attrs["b"], 2)
+            self.assertEqual(cache.hits, hits + 2)
+            self.assertEqual(g1.attrs["a"], 3)
+
+            # point selections don't invalidate anything
+            dset = f.create_dataset("dset", data=np.arange(10))
+            self.assertEqual(g2.attrs["b"], 2)
+            hits = cache.hits
+            self.assertEqual(dset[[1, 3, 5]].tolist(), [1, 3, 5])
+            self.assertEqual(g2.attrs["b"], 2)
+            self.assertEqual(cache.hits, hits + 1)
+
+
+if __name__ == '__main__':
+    ut.main()
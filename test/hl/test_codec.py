@@ -0,0 +1,272 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+import numpy as np
+import config
+
+from common import ut, TestCase
+from h5pyd import special_dtype
+from h5pyd._hl.base import bytesToArray, arrayToBytes, readElement
+from h5pyd._hl.base import copyElement, getByteArraySize, jsonToArray
+
+
+def legacy_bytesToArray(data, dt, nelements):
+    """ decode element by element, as bytesToArray used to """
+    arr = np.zeros((nelements,), dtype=dt)
+    offset = 0
+    for index in range(nelements):
+        offset = readElement(data, offset, arr, index, dt)
+    return arr
+
+
+def legacy_arrayToBytes(arr, vlen=None):
+    """ encode element by element, as arrayToBytes used to """
+    arr1d = arr.reshape((arr.size,))
+    buffer = bytearray(getByteArraySize(arr1d))
+    offset = 0
+    for e in arr1d:
+        offset = copyElement(e, arr1d.dtype, buffer, offset, vlen=vlen)
+    return buffer
+
+
+def vlen_bytes(*items):
+    """ return a bytestream with each item preceded by its length """
+    buffer = b""
+    for item in items:
+        buffer += np.int32(len(item)).tobytes() + item
+    return buffer
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no bytestream codec")
+class TestVlenDecode(TestCase):
+
+    """
+        Feature: variable length bytestreams are decoded to numpy arrays
+    """
+
+    def assertVlenEqual(self, arr, expected):
+        self.assertEqual(arr.shape, expected.shape)
+        for e, e_expected in zip(arr.flat, expected.flat):
+            if isinstance(e_expected, np.ndarray):
+                self.assertEqual(e.dtype, e_expected.dtype)
+                np.testing.assert_array_equal(e, e_expected)
+            else:
+                self.assertEqual(e, e_expected)
+
+    def test_vlen_str(self):
+        dt = special_dtype(vlen=str)
+        items = (b"hello", b"", "η utf8".encode("utf-8"), b"trailing\x00")
+        data = vlen_bytes(*items)
+        arr = bytesToArray(data, dt, (2, 2))
+        self.assertEqual(arr.dtype, dt)
+        self.assertEqual(arr.shape, (2, 2))
+        self.assertEqual(list(arr.flat), list(items))
+        self.assertVlenEqual(arr.reshape((4,)), legacy_bytesToArray(data, dt, 4))
+
+        # bytearray input gives bytes elements too
+        arr = bytesToArray(bytearray(data), dt, (4,))
+        self.assertEqual(list(arr), list(items))
+
+    def test_vlen_int(self):
+        dt = special_dtype(vlen=np.dtype("int32"))
+        items = [np.arange(n, dtype="int32") for n in (3, 0, 1, 5)]
+        data = vlen_bytes(*[x.tobytes() for x in items])
+        arr = bytesToArray(data, dt, (4,))
+        self.assertVlenEqual(arr, legacy_bytesToArray(data, dt, 4))
+
+        # elements of equal length stay separate arrays
+        data = vlen_bytes(*[np.arange(2, dtype="int32").tobytes()] * 3)
+        arr = bytesToArray(data, dt, (3,))
+        self.assertEqual(arr.dtype, dt)
+        self.assertEqual(arr[2].tolist(), [0, 1])
+
+    def test_vlen_compound(self):
+        dt = np.dtype([
+            ("a", "i2"),
+            ("s", special_dtype(vlen=str)),
+            ("v", special_dtype(vlen=np.dtype("float64"))),
+            ("b", "S3"),
+            ("c", "<u4", (2,)),
+        ])
+        data = b""
+        for i in range(5):
+            data += np.int16(i).tobytes()
+            data += vlen_bytes(b"x" * i)
+            data += vlen_bytes(np.arange(i, dtype="float64").tobytes())
+            data += b"ab" + bytes([48 + i])
+            data += np.array([i, i * 2], dtype="<u4").tobytes()
+
+        arr = bytesToArray(data, dt, (5,))
+        expected = legacy_bytesToArray(data, dt, 5)
+        self.assertEqual(arr.dtype, dt)
+        np.testing.assert_array_equal(arr["a"], expected["a"])
+        np.testing.assert_array_equal(arr["b"], expected["b"])
+        np.testing.assert_array_equal(arr["c"], expected["c"])
+        self.assertVlenEqual(arr["s"], expected["s"])
+        self.assertVlenEqual(arr["v"], expected["v"])
+        self.assertEqual(arr[3]["s"], b"xxx")
+        self.assertEqual(arr[4]["c"].tolist(), [4, 8])
+
+    def test_unknown_shape(self):
+        dt = special_dtype(vlen=bytes)
+        data = vlen_bytes(b"a", b"bc", b"def")
+        arr = bytesToArray(data, dt, None)
+        self.assertEqual(list(arr), [b"a", b"bc", b"def"])
+
+    def test_bad_data(self):
+        dt = special_dtype(vlen=str)
+        data = vlen_bytes(b"abc", b"def")
+        with self.assertRaises(ValueError):
+            bytesToArray(data[:-1], dt, (2,))
+        with self.assertRaises(ValueError):
+            bytesToArray(data, dt, (3,))
+        with self.assertRaises(ValueError):
+            bytesToArray(np.int32(-1).tobytes(), dt, (1,))
+        dt = special_dtype(vlen=np.dtype("int32"))
+        with self.assertRaises(ValueError):
+            bytesToArray(vlen_bytes(b"abc"), dt, (1,))
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no bytestream codec")
+class TestVlenEncode(TestCase):
+
+    """
+        Feature: numpy arrays with variable length types are encoded to bytestreams
+    """
+
+    def test_vlen_str(self):
+        dt = special_dtype(vlen=str)
+        arr = np.empty((2, 3), dtype=dt)
+        arr[...] = [["a", "", "η utf8"], [b"bytes", None, "trailing\x00"]]
+        data = arrayToBytes(arr)
+        self.assertIsInstance(data, bytearray)
+        self.assertEqual(data, legacy_arrayToBytes(arr))
+        self.assertEqual(data[:5], vlen_bytes(b"a"))
+        self.assertEqual(list(bytesToArray(data, dt, (6,))),
+                         [b"a", b"", "η utf8".encode("utf-8"), b"bytes", b"", b"trailing\x00"])
+
+        # fixed size strings written to a vlen dataset
+        arr = np.array(["abc", "de"])
+        self.assertEqual(arrayToBytes(arr, vlen=str), vlen_bytes(b"abc", b"de"))
+
+    def test_vlen_int(self):
+        dt = special_dtype(vlen=np.dtype("int16"))
+        arr = np.empty((4,), dtype=dt)
+        arr[0] = np.arange(3, dtype="int16")
+        arr[1] = [4, 5]
+        arr[2] = np.array([], dtype="int16")
+        arr[3] = np.array([7, 8], dtype=object)
+        data = arrayToBytes(arr)
+        self.assertEqual(data, legacy_arrayToBytes(arr))
+        self.assertEqual(arrayToBytes(arr, vlen=np.dtype("int16")), data)
+        decoded = bytesToArray(data, dt, (4,))
+        self.assertEqual(decoded[3].tolist(), [7, 8])
+
+        arr[1] = 5
+        with self.assertRaises(ValueError):
+            arrayToBytes(arr)
+
+    def test_vlen_compound(self):
+        dt = np.dtype([
+            ("a", ">i2"),
+            ("s", special_dtype(vlen=str)),
+            ("v", special_dtype(vlen=np.dtype("float64"))),
+            ("b", "S3"),
+            ("c", "<u4", (2,)),
+            ("n", [("x", "i1"), ("y", "f4")]),
+        ])
+        arr = np.zeros((7,), dtype=dt)
+        for i in range(7):
+            arr[i] = (i, "x" * i, np.arange(i, dtype="float64"), b"ab", (i, 2 * i), (i, i / 2))
+        data = arrayToBytes(arr)
+        self.assertEqual(data, legacy_arrayToBytes(arr))
+        decoded = bytesToArray(data, dt, (7,))
+        self.assertEqual(decoded[6]["s"], b"xxxxxx")
+        self.assertEqual(decoded[5]["v"].tolist(), [0, 1, 2, 3, 4])
+        np.testing.assert_array_equal(decoded["c"], arr["c"])
+        np.testing.assert_array_equal(decoded["n"], arr["n"])
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no json codec")
+class TestJsonToArray(TestCase):
+
+    """
+        Feature: JSON values are converted to numpy arrays
+    """
+
+    def test_numeric(self):
+        arr = jsonToArray((2, 3), np.dtype("int16"), [[1, 2, 3], [4, 5, 6]])
+        self.assertEqual(arr.dtype, np.dtype("int16"))
+        np.testing.assert_array_equal(arr, np.arange(1, 7).reshape((2, 3)))
+
+        arr = jsonToArray((3,), np.dtype("f4"), [1.5, "NaN", 2])
+        self.assertTrue(np.isnan(arr[1]))
+
+        arr = jsonToArray((), np.dtype("i8"), 42)
+        self.assertEqual(arr[()], 42)
+
+        with self.assertRaises(ValueError):
+            jsonToArray((2, 3), np.dtype("int16"), [1, 2, 3])
+
+    def test_compound(self):
+        dt = np.dtype([("a", "i4"), ("b", "S4"), ("c", "f8", (2,)), ("d", "?")])
+        data = [[[1, "one", [0.5, 1.5], True], [2, "two", [2.5, 3.5], False]],
+                [[3, "six", [4.5, 5.5], True], [4, "ten", [6.5, 7.5], False]]]
+        arr = jsonToArray((2, 2), dt, data)
+        self.assertEqual(arr.dtype, dt)
+        self.assertEqual(arr.shape, (2, 2))
+        self.assertEqual(arr[1, 0]["b"], b"six")
+        self.assertEqual(arr[1, 1]["c"].tolist(), [6.5, 7.5])
+        self.assertEqual(arr["a"].tolist(), [[1, 2], [3, 4]])
+        self.assertEqual(arr["d"].tolist(), [[True, False], [True, False]])
+
+        # single record
+        arr = jsonToArray((), dt, [7, "abc", [1, 2], False])
+        self.assertEqual(arr[()]["a"], 7)
+        arr = jsonToArray((1,), dt, [7, "abc", [1, 2], False])
+        self.assertEqual(arr[0]["b"], b"abc")
+
+        with self.assertRaises(ValueError):
+            jsonToArray((2,), dt, [[1, "one", [0, 0], True], [2, "two", [0, 0]]])
+        with self.assertRaises(TypeError):
+            jsonToArray((1,), dt, 5)
+
+    def test_nested_compound(self):
+        dt = np.dtype([("a", "i4"), ("p", [("x", "f4"), ("y", "f4")])])
+        arr = jsonToArray((2,), dt, [[1, [0.5, 1.5]], [2, [2.5, 3.5]]])
+        self.assertEqual(arr[1]["p"]["y"], 3.5)
+
+    def test_vlen(self):
+        dt = special_dtype(vlen=str)
+        arr = jsonToArray((2, 2), dt, [["a", "bc"], ["", "def"]])
+        self.assertEqual(arr.dtype, dt)
+        self.assertEqual(arr.tolist(), [["a", "bc"], ["", "def"]])
+
+        dt = special_dtype(vlen=np.dtype("int32"))
+        arr = jsonToArray((3,), dt, [[1, 2, 3], [], [[4, 5]]])
+        self.assertEqual(arr.shape, (3,))
+        self.assertEqual(arr[0].dtype, np.dtype("int32"))
+        self.assertEqual(arr[0].tolist(), [1, 2, 3])
+        self.assertEqual(arr[1].tolist(), [])
+        self.assertEqual(arr[2].tolist(), [4, 5])
+
+        # elements of equal length stay separate arrays
+        arr = jsonToArray((2,), dt, [[1, 2], [3, 4]])
+        self.assertEqual(arr.shape, (2,))
+        self.assertEqual(arr[1].tolist(), [3, 4])
+
+        with self.assertRaises(ValueError):
+            jsonToArray((2, 2), dt, [[[1], [2]], [[3]]])
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -313,6 +313,293 @@ class TestReadDirectly(BaseDataset):
         with self.assertRaises(TypeError):
             dset.read_direct(arr)
 
+    def test_strided_dest_sel(self):
+        data = np.arange(40 * 30, dtype="int64").reshape((40, 30))
+        dset = self.f.create_dataset("dset", data=data, chunks=(10, 30))
+        arr = np.full((80, 30), -1, dtype="int64")
+        expected = arr.copy()
+        expected[1::2, :] = data
+        dset.read_direct(arr, np.s_[...], np.s_[1::2, :])
+        np.testing.assert_array_equal(arr, expected)
+
+    @ut.skipIf(config.get('use_h5py'), "h5py does not support read_into")
+    def test_read_into(self):
+        data = np.arange(40 * 30, dtype="int32").reshape((40, 30))
+        dset = self.f.create_dataset("dset", data=data, chunks=(10, 30))
+        arr = np.zeros((20, 30), dtype="int32")
+        ret = dset.read_into(arr, np.s_[10:30, :])
+        self.assertIs(ret, arr)
+        np.testing.assert_array_equal(arr, data[10:30, :])
+
+        # non-contiguous view of a larger buffer
+        buffer = np.zeros((40, 60), dtype="int32")
+        dset.read_into(buffer[:, ::2])
+        np.testing.assert_array_equal(buffer[:, ::2], data)
+        np.testing.assert_array_equal(buffer[:, 1::2], 0)
+
+        # scalar index on the source drops a dimension
+        arr = np.zeros((30,), dtype="int32")
+        dset.read_into(arr, np.s_[7, :])
+        np.testing.assert_array_equal(arr, data[7, :])
+
+        with self.assertRaises(TypeError):
+            dset.read_into(np.zeros((10,), dtype="int32"), np.s_[0, :])
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py does not support paged reads")
+class TestPagedRead(BaseDataset):
+
+    """
+        Feature: Large selections are read as concurrent page requests
+    """
+
+    def test_parallel_pages(self):
+        data = np.arange(400 * 50, dtype="i4").reshape((400, 50))
+        dset = self.f.create_dataset("dset", data=data, chunks=(10, 50))
+        self.assertEqual(dset.chunks, (10, 50))
+        filename = self.f.filename
+
+        with File(filename, "r", page_workers=4, max_inflight_bytes=50000) as f:
+            dset = f["dset"]
+            self.assertEqual(f.id.http_conn.page_workers, 4)
+            np.testing.assert_array_equal(dset[...], data)
+            np.testing.assert_array_equal(dset[5:397:3, 7], data[5:397:3, 7])
+            np.testing.assert_array_equal(dset[13:, 2:40:5], data[13:, 2:40:5])
+            np.testing.assert_array_equal(dset[::7, ::2], data[::7, ::2])
+
+    def test_adaptive_pages(self):
+        data = np.arange(400 * 50, dtype="i4").reshape((400, 50))
+        dset = self.f.create_dataset("dset", data=data, chunks=(10, 50))
+        filename = self.f.filename
+
+        # small pages that are slow to read get smaller
+        with File(filename, "r", page_target_bytes=8000, page_min_latency=0, page_max_latency=1e-6) as f:
+            dset = f["dset"]
+            page_sizer = f.id.http_conn.page_sizer
+            self.assertEqual(page_sizer.getPageBytes(dset.id.uuid), 8000)
+            np.testing.assert_array_equal(dset[...], data)
+            page_bytes = page_sizer.getPageBytes(dset.id.uuid)
+            self.assertLessEqual(page_bytes, 8000)
+            # the next read starts with the size the last one ended with
+            np.testing.assert_array_equal(dset[100:300, 5:45], data[100:300, 5:45])
+            np.testing.assert_array_equal(dset[5:397:3, 7], data[5:397:3, 7])
+
+    def test_fancy_pages(self):
+        data = np.arange(2000 * 50, dtype="i4").reshape((2000, 50))
+        dset = self.f.create_dataset("dset", data=data, chunks=(100, 50))
+        filename = self.f.filename
+        mask = np.zeros((2000,), dtype=bool)
+        mask[::3] = True
+        mask[500:900] = True
+        coords = [1, 2, 3, 250, 251, 1200, 1201, 1999]
+
+        for page_workers in (1, 4):
+            with File(filename, "r", page_workers=page_workers, page_target_bytes=50000) as f:
+                dset = f["dset"]
+                np.testing.assert_array_equal(dset[mask, :], data[mask, :])
+                np.testing.assert_array_equal(dset[mask, 5], data[mask, 5])
+                np.testing.assert_array_equal(dset[10:1900, coords[:4]], data[10:1900, coords[:4]])
+
+    def test_invalid_page_workers(self):
+        filename = self.f.filename
+        with self.assertRaises(ValueError):
+            File(filename, "r", page_workers=0)
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py does not support page_workers")
+class TestPagedWrite(BaseDataset):
+
+    """
+        Feature: Large selections are written as a series of page requests
+    """
+
+    def test_paged_write(self):
+        data = np.arange(400 * 50, dtype="i4").reshape((400, 50))
+        self.f.create_dataset("dset", (400, 50), dtype="i4", chunks=(10, 50))
+        filename = self.f.filename
+
+        for page_workers in (1, 4):
+            with File(filename, "a", page_workers=page_workers, page_target_bytes=8000) as f:
+                dset = f["dset"]
+                dset[...] = data
+                np.testing.assert_array_equal(dset[...], data)
+                dset[5:397:3, 7] = -data[5:397:3, 7]
+                dset[13:, 2:40:5] = data[13:, 2:40:5] * 2
+                expected = data.copy()
+                expected[5:397:3, 7] = -data[5:397:3, 7]
+                expected[13:, 2:40:5] = data[13:, 2:40:5] * 2
+                np.testing.assert_array_equal(dset[...], expected)
+                # a scalar is broadcast on the server, so isn't paged
+                dset[...] = 1
+                self.assertTrue(np.all(dset[...] == 1))
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no appender")
+class TestAppender(BaseDataset):
+
+    """
+        Feature: Rows can be appended to extensible datasets
+    """
+
+    def test_append_rows(self):
+        dset = self.f.create_dataset("dset", (0, 3), maxshape=(None, 3), dtype="i4", chunks=(10, 3))
+        data = np.arange(95 * 3, dtype="i4").reshape((95, 3))
+        with dset.appender(buffer_rows=15) as appender:
+            self.assertEqual(appender.buffer_rows, 20)  # rounded up to whole chunks
+            for row in data[:5]:
+                appender.append(row)
+            self.assertEqual(appender.rows_written, 0)  # still buffered
+            appender.append(data[5:90])
+            self.assertEqual(appender.rows_written, 80)
+            appender.append(data[90:])
+        self.assertEqual(appender.rows_written, 95)
+        self.assertEqual(dset.shape, (95, 3))
+        np.testing.assert_array_equal(dset[...], data)
+        with self.assertRaises(ValueError):
+            appender.append(data[0])
+
+    def test_append_axis(self):
+        dset = self.f.create_dataset("dset", (4, 0), maxshape=(4, None), dtype="f8", chunks=(4, 8))
+        data = np.random.random((4, 30))
+        with dset.appender(axis=1) as appender:
+            appender.append(data[:, :12])
+            for n in range(12, 30):
+                appender.append(data[:, n])
+        self.assertEqual(dset.shape, (4, 30))
+        np.testing.assert_array_equal(dset[...], data)
+
+    def test_invalid(self):
+        dset = self.f.create_dataset("dset", (10, 3), maxshape=(None, 3), dtype="i4", chunks=(10, 3))
+        with self.assertRaises(ValueError):
+            dset.appender(axis=2)
+        with dset.appender() as appender:
+            with self.assertRaises(ValueError):
+                appender.append(np.zeros((2, 4)))
+        dset = self.f.create_dataset("fixed", (10, 3), dtype="i4", chunks=(10, 3))
+        with self.assertRaises(TypeError):
+            dset.appender()
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no read_many")
+class TestReadMany(BaseDataset):
+
+    """
+        Feature: Many small selections can be read with a few requests
+    """
+
+    def test_read_many(self):
+        data = np.arange(40 * 30, dtype="f4").reshape((40, 30))
+        dset = self.f.create_dataset("dset", data=data, chunks=(10, 10))
+        selections = [(i, j) for i in range(0, 40, 3) for j in range(0, 30, 7)]
+        selections.extend([(5, 5), (slice(2, 6), 9), np.s_[3, ::10], np.s_[...], np.s_[10:20, 4]])
+        results = dset.read_many(selections)
+        self.assertEqual(len(results), len(selections))
+        for selection, result in zip(selections, results):
+            np.testing.assert_array_equal(result, data[selection])
+            self.assertEqual(np.shape(result), data[selection].shape)
+        self.assertEqual(dset.read_many([]), [])
+        with self.assertRaises(ValueError):
+            dset.read_many([(0, 0)], max_workers=0)
+
+    def test_read_many_1d(self):
+        data = np.arange(100, dtype="i8")
+        dset = self.f.create_dataset("dset", data=data)
+        results = dset.read_many([7, 3, 3, slice(10, 14), 99])
+        self.assertEqual(results[:3], [7, 3, 3])
+        np.testing.assert_array_equal(results[3], data[10:14])
+        self.assertEqual(results[4], 99)
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py does not support chunk_cache_size")
+class TestChunkCache(BaseDataset):
+
+    """
+        Feature: Repeated reads are served from the chunk cache
+    """
+
+    def test_cached_reads(self):
+        data = np.arange(100 * 40, dtype="i4").reshape((100, 40))
+        dset = self.f.create_dataset("dset", data=data, chunks=(10, 20))
+        filename = self.f.filename
+
+        with File(filename, "r", chunk_cache_size=1024 * 1024) as f:
+            dset = f["dset"]
+            chunk_cache = f.id.http_conn.chunk_cache
+            self.assertEqual(chunk_cache.max_bytes, 1024 * 1024)
+            np.testing.assert_array_equal(dset[5:25, 3:30], data[5:25, 3:30])
+            self.assertEqual(len(chunk_cache), 6)
+            self.assertEqual(chunk_cache.hits, 0)
+
+            # overlapping reads use the cached chunks
+            np.testing.assert_array_equal(dset[12:18, :], data[12:18, :])
+            self.assertEqual(chunk_cache.hits, 2)
+            np.testing.assert_array_equal(dset[7, 21:39:3], data[7, 21:39:3])
+            np.testing.assert_array_equal(dset[1:30:7, ::9], data[1:30:7, ::9])
+            np.testing.assert_array_equal(dset[29, 0], data[29, 0])
+            arr = np.zeros((40, 40), dtype="i4")
+            dset.read_direct(arr, np.s_[10:30, :], np.s_[::2, :])
+            np.testing.assert_array_equal(arr[::2, :], data[10:30, :])
+
+            # selection too large for the cache is read directly
+            np.testing.assert_array_equal(dset[...], data)
+
+    def test_missing_chunks(self):
+        data = np.arange(100 * 40, dtype="i4").reshape((100, 40))
+        dset = self.f.create_dataset("dset", data=data, chunks=(10, 10))
+        filename = self.f.filename
+
+        with File(filename, "r", chunk_cache_size=1024 * 1024) as f:
+            dset = f["dset"]
+            boxes = []
+            read_hyperslab = dset._readHyperslab
+
+            def record(selection, req, params, arr, mtype):
+                boxes.append(tuple(zip(selection.start, selection.count)))
+                read_hyperslab(selection, req, params, arr, mtype)
+
+            dset._readHyperslab = record
+            np.testing.assert_array_equal(dset[5:25, 3:30], data[5:25, 3:30])
+            self.assertEqual(sorted(boxes), [((0, 10), (0, 30)), ((10, 10), (0, 30)), ((20, 10), (0, 30))])
+            boxes.clear()
+
+            # only the chunks that aren't cached are read
+            np.testing.assert_array_equal(dset[5:45, 3:40], data[5:45, 3:40])
+            self.assertEqual(sorted(boxes), [((0, 10), (30, 10)), ((10, 10), (30, 10)), ((20, 10), (30, 10)),
+                                             ((30, 10), (0, 40)), ((40, 10), (0, 40))])
+            boxes.clear()
+
+            # chunks the step skips over aren't read
+            np.testing.assert_array_equal(dset[0:100:30, 5], data[0:100:30, 5])
+            self.assertEqual(sorted(boxes), [((60, 10), (0, 10)), ((90, 10), (0, 10))])
+
+    def test_invalidate(self):
+        data = np.zeros((20, 20), dtype="i4")
+        dset = self.f.create_dataset("dset", data=data, chunks=(10, 10), maxshape=(None, 20))
+        filename = self.f.filename
+        self.f.close()
+        self.f = None
+
+        with File(filename, "a", chunk_cache_size=1024 * 1024) as f:
+            dset = f["dset"]
+            chunk_cache = f.id.http_conn.chunk_cache
+            np.testing.assert_array_equal(dset[...], data)
+            self.assertEqual(len(chunk_cache), 4)
+
+            dset[3, 4] = 7
+            self.assertEqual(len(chunk_cache), 0)
+            self.assertEqual(dset[3, 4], 7)
+
+            dset.resize((25, 20))
+            self.assertEqual(len(chunk_cache), 0)
+            self.assertEqual(dset[...].shape, (25, 20))
+            self.assertEqual(dset[24, 19], 0)
+
+            dset.refresh()
+            self.assertEqual(len(chunk_cache), 0)
+
+    def test_default_disabled(self):
+        self.assertIsNone(self.f.id.http_conn.chunk_cache)
+
 
 class TestWriteDirectly(BaseDataset):
 
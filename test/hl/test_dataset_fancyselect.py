@@ -10,6 +10,8 @@
 # request a copy from help@hdfgroup.org.                                     #
 ##############################################################################
 
+import logging
+import types
 import numpy as np
 
 import config
@@ -18,6 +20,7 @@ if config.get("use_h5py"):
     import h5py
 else:
     import h5pyd as h5py
+    from h5pyd._hl import selections as sel
 
 from common import ut, TestCase
 
@@ -145,5 +148,45 @@ class TestFancySelectDataset(TestCase):
         f.close()
 
 
+@ut.skipIf(config.get("use_h5py"), "h5py has no select query params")
+class TestFancySelectQuery(TestCase):
+
+    def test_query_param(self):
+        selection = sel.FancySelection((100, 20))
+        selection[np.arange(100) % 2 == 0, 3]
+        self.assertEqual(selection.mshape, (50,))
+        self.assertEqual(selection.nselect, 50)
+        self.assertEqual(selection.coordinate_dims, [0])
+        # evenly spaced coordinates are sent as a slice
+        self.assertEqual(selection.getQueryParam(), "[0:99:2,3]")
+        self.assertEqual(selection.getQueryParam(coords={0: np.array([4, 9, 10])}), "[[4,9,10],3]")
+
+        selection = sel.FancySelection((100, 20))
+        selection[5:7, [1, 2, 3]]
+        self.assertEqual(selection.getQueryParam(), "[5:7,1:4]")
+
+        # paired coordinate lists are left as lists
+        selection = sel.FancySelection((100, 20))
+        selection[[1, 2, 3], [4, 5, 6]]
+        self.assertEqual(selection.getQueryParam(), "[[1,2,3],[4,5,6]]")
+
+        with self.assertRaises(IndexError):
+            sel.FancySelection((100, 20))[[1, 100], :]
+
+    def test_server_version(self):
+        # multiple coordinate lists need HSDS 0.9 or later
+        http_conn = types.SimpleNamespace()
+        dset = h5py.Dataset.__new__(h5py.Dataset)
+        dset.log = logging.getLogger()
+        object.__setattr__(dset, "_id", types.SimpleNamespace(http_conn=http_conn))
+        for version in (None, "", "0.9.0", "0.9", "1.0.2", "2.0.0", "0.10.1-beta", "dev"):
+            http_conn.server_version = lambda: version
+            dset._checkMultiCoordinateSupport()  # ok
+        for version in ("0.8.5", "0.8", "0.7.0-beta"):
+            http_conn.server_version = lambda: version
+            with self.assertRaises(IOError):
+                dset._checkMultiCoordinateSupport()
+
+
 if __name__ == '__main__':
     ut.main()
@@ -400,6 +400,30 @@ class TestMultiManager(TestCase):
             out = out.reshape(shape)
             np.testing.assert_array_equal(out, data_in_vlen)
 
+    def test_multi_write_vlen_ragged(self):
+        """
+        Test writing ragged values to multiple datasets with a vlen int type
+        """
+        filename = self.getFileName("multi_write_vlen_ragged")
+        print("filename:", filename)
+        f = h5py.File(filename, 'w')
+        count = 3
+        dt = h5py.vlen_dtype(np.int32)
+        datasets = []
+
+        for i in range(count):
+            dset = f.create_dataset("data" + str(i), shape=(2,), dtype=dt)
+            datasets.append(dset)
+
+        mm = MultiManager(datasets=datasets)
+        vals = [[np.arange(i + 2, dtype=np.int32), np.arange(i + 1, dtype=np.int32)] for i in range(count)]
+        mm[...] = vals
+
+        for i in range(count):
+            dset = f["data" + str(i)]
+            np.testing.assert_array_equal(dset[0], vals[i][0])
+            np.testing.assert_array_equal(dset[1], vals[i][1])
+
     def test_multi_write_mixed_shapes(self):
         """
         Test writing to a selection in multiple datasets with different shapes
@@ -536,6 +560,58 @@ class TestMultiManager(TestCase):
             out = np.array(f["data" + str(i)], dtype=dt)
             np.testing.assert_array_equal(out, data)
 
+    def test_multi_read_split(self):
+        """
+        Test reading one large dataset and several small ones, where the large
+        selection is split into chunk-aligned pages
+        """
+        filename = self.getFileName("multi_read_split")
+        print("filename:", filename)
+        f = h5py.File(filename, 'w')
+        dt = np.int32
+        big_data = np.arange(2000 * 100, dtype=dt).reshape((2000, 100))
+        datasets = [f.create_dataset("big", data=big_data, chunks=(10, 100))]
+        small_data = np.arange(40 * 10, dtype=dt).reshape((40, 10))
+        for i in range(5):
+            datasets.append(f.create_dataset("small" + str(i), data=small_data + i, chunks=(10, 10)))
+
+        mm = MultiManager(datasets=datasets)
+        mm.max_workers = 4
+        sel = [np.s_[3:1997:2, 5:90], np.s_[...], np.s_[1:30], np.s_[5, :], np.s_[0:40:7, 3], np.s_[()]]
+        data_out = mm[sel]
+
+        np.testing.assert_array_equal(data_out[0], big_data[sel[0]])
+        for i in range(1, 6):
+            np.testing.assert_array_equal(data_out[i], (small_data + i - 1)[sel[i]])
+
+    def test_multi_iter_read(self):
+        """
+        Test reading multiple datasets with results returned as each read completes
+        """
+        filename = self.getFileName("multi_iter_read")
+        print("filename:", filename)
+        f = h5py.File(filename, 'w')
+        count = 10
+        dt = np.int32
+        data_in = []
+        datasets = []
+        for i in range(count):
+            data = np.arange((100 + i * 10) * 50, dtype=dt).reshape((100 + i * 10, 50))
+            data_in.append(data)
+            datasets.append(f.create_dataset("data" + str(i), data=data, chunks=(10, 50)))
+
+        mm = MultiManager(datasets=datasets)
+        seen = []
+        for idx, data_out in mm.iter_read(np.s_[::2, 5:], max_bytes=50000):
+            np.testing.assert_array_equal(data_out, data_in[idx][::2, 5:])
+            seen.append(idx)
+        self.assertEqual(sorted(seen), list(range(count)))
+
+        # stopping early is ok
+        for idx, data_out in mm.iter_read([np.s_[i] for i in range(count)]):
+            np.testing.assert_array_equal(data_out, data_in[idx][idx])
+            break
+
 
 if __name__ == '__main__':
     loglevel = logging.ERROR
@@ -117,6 +117,32 @@ class TestPointSelectDataset(TestCase):
 
         f.close()
 
+    @ut.skipIf(config.get("use_h5py"), "h5py has no read_points")
+    def test_read_points(self):
+        filename = self.getFileName("test_read_points")
+        print("filename:", filename)
+        f = h5py.File(filename, "w")
+
+        vals = np.arange(200 * 300, dtype='i4').reshape((200, 300))
+        dset2d = f.create_dataset('dset2d', data=vals)
+        rng = np.random.default_rng(0)
+        points = np.stack([rng.integers(0, 200, 5000), rng.integers(0, 300, 5000)], axis=1)
+        # points in any order and with repeats
+        pts = dset2d.read_points(points)
+        np.testing.assert_array_equal(pts, vals[points[:, 0], points[:, 1]])
+        # a point list selection still requires the points to be valid
+        with self.assertRaises(IndexError):
+            dset2d.read_points([[200, 0]])
+        with self.assertRaises(ValueError):
+            dset2d.read_points([[1, 2, 3]])
+
+        dset1d = f.create_dataset('dset1d', data=np.arange(100, dtype='i8'))
+        self.assertEqual(list(dset1d.read_points([9, 3, 3, 50])), [9, 3, 3, 50])
+        with self.assertRaises(TypeError):
+            dset1d[[9, 3]]  # dataset[...] still needs increasing points
+
+        f.close()
+
 
 if __name__ == '__main__':
     # loglevel = logging.DEBUG
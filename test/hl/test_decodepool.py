@@ -0,0 +1,81 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+import numpy as np
+import config
+
+from common import ut, TestCase
+
+if config.get("use_h5py"):
+    import h5py
+else:
+    import h5pyd as h5py
+    from h5pyd._hl.base import arrayToBytes, bytesToArray
+    from h5pyd._hl.decodepool import DecodePool
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no decode pool")
+class TestDecodePool(TestCase):
+
+    """
+        Feature: Large vlen responses are decoded in other processes
+    """
+
+    def test_decode(self):
+        str_dt = h5py.special_dtype(vlen=str)
+        data = np.array([f"string {i}" * (i % 5) for i in range(1000)], dtype=str_dt).reshape((100, 10))
+        body = arrayToBytes(data)
+        cmpd_dt = np.dtype([("a", "i4"), ("s", str_dt)])
+        cmpd_data = np.zeros((50,), dtype=cmpd_dt)
+        cmpd_data["a"] = np.arange(50)
+        cmpd_data["s"] = [str(i) * i for i in range(50)]
+        cmpd_body = arrayToBytes(cmpd_data)
+
+        pool = DecodePool(2, min_bytes=1024)
+        self.assertTrue(pool.usePool(str_dt, len(body)))
+        self.assertFalse(pool.usePool(str_dt, 100))
+        self.assertFalse(pool.usePool(np.dtype("i4"), len(body)))
+        try:
+            arr = pool.decode(body, str_dt, (100, 10))
+            self.assertEqual(arr.shape, (100, 10))
+            self.assertEqual(arr.tolist(), bytesToArray(body, str_dt, (100, 10)).tolist())
+            arr = pool.decode(cmpd_body, cmpd_dt, (50,))
+            np.testing.assert_array_equal(arr["a"], cmpd_data["a"])
+            self.assertEqual(arr["s"].tolist(), bytesToArray(cmpd_body, cmpd_dt, (50,))["s"].tolist())
+            # small responses are decoded here
+            arr = pool.decode(arrayToBytes(data[0]), str_dt, (10,))
+            self.assertEqual(arr.tolist(), bytesToArray(arrayToBytes(data[0]), str_dt, (10,)).tolist())
+        finally:
+            pool.close()
+        with self.assertRaises(ValueError):
+            DecodePool(0)
+
+    def test_read(self):
+        filename = self.getFileName("decode_pool")
+        str_dt = h5py.special_dtype(vlen=str)
+        data = np.array([f"value {i}" for i in range(20000)], dtype=object)
+        with h5py.File(filename, "w") as f:
+            f.create_dataset("strings", data=data, dtype=str_dt)
+
+        with h5py.File(filename, "r", decode_processes=2) as f:
+            self.assertEqual(f.id.http_conn.decode_pool.processes, 2)
+            arr = f["strings"][...]
+            self.assertEqual(len(arr), 20000)
+            for i in (0, 1, 19999):
+                value = arr[i]
+                if isinstance(value, bytes):
+                    value = value.decode("utf-8")
+                self.assertEqual(value, data[i])
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -22,6 +22,8 @@ from common import ut, TestCase
 from copy import copy
 import time
 import logging
+import shutil
+import tempfile
 
 
 class TestFile(TestCase):
@@ -411,6 +413,61 @@ class TestTrackOrder(TestCase):
             self.assertEqual(list(f), sorted(self.titles))
 
 
+@ut.skipIf(config.get('use_h5py'), "h5py has no persistent cache")
+class TestDiskCache(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_reuse_objs(self):
+        from h5pyd._hl.cache import DiskCache
+
+        filename = self.getFileName("disk_cache_file")
+        with h5py.File(filename, 'w') as f:
+            g1 = f.create_group("g1")
+            g1.attrs["a"] = 1
+            root_id = f.id.id
+            g1_id = g1.id.id
+
+        with h5py.File(filename, 'r', cache_dir=self.cache_dir) as f:
+            self.assertEqual(f["g1"].attrs["a"], 1)
+            disk_cache = f._disk_cache
+            key = f._disk_cache_key
+            last_modified = f.id.http_conn.domain_json["lastModified"]
+        self.assertIsNotNone(disk_cache.get(key, last_modified))
+
+        # save domain objects with a different attribute value to see they get used
+        with h5py.File(filename, 'r') as f:
+            domain_objs = {}
+            for obj_id in (root_id, g1_id):
+                obj_json = f.GET(f"/groups/{obj_id}")
+                obj_json["links"] = {link["title"]: link for link in f.GET(f"/groups/{obj_id}/links")["links"]}
+                obj_json["attributes"] = {}
+                domain_objs[obj_id] = obj_json
+            attr_json = f.GET(f"/groups/{g1_id}/attributes/a")
+            attr_json["value"] = 42
+            domain_objs[g1_id]["attributes"]["a"] = attr_json
+        disk_cache = DiskCache(self.cache_dir)
+        disk_cache.put(key, last_modified, domain_objs)
+        with h5py.File(filename, 'r', cache_dir=self.cache_dir) as f:
+            self.assertIsNotNone(f.id.http_conn.getObjDb())
+            self.assertEqual(f["g1"].attrs["a"], 42)
+
+        # ignored if the domain has changed since the objects were saved
+        disk_cache.put(key, 0, domain_objs)
+        with h5py.File(filename, 'r', cache_dir=self.cache_dir) as f:
+            self.assertEqual(f["g1"].attrs["a"], 1)
+
+        # opening for update removes the entry
+        disk_cache.put(key, last_modified, domain_objs)
+        with h5py.File(filename, 'a', cache_dir=self.cache_dir) as f:
+            f["g1"].attrs["a"] = 2
+        self.assertIsNone(disk_cache.get(key, last_modified))
+
+
 if __name__ == '__main__':
     loglevel = logging.ERROR
     logging.basicConfig(format='%(asctime)s %(message)s', level=loglevel)
@@ -0,0 +1,399 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+import json
+import socket
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+
+from common import ut, TestCase
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import httpx  # noqa: F401
+    have_http2 = True
+except ImportError:
+    have_http2 = False
+
+if not config.get("use_h5py"):
+    from h5pyd._hl.httpconn import HttpConn, compressBody, decompressBody, getTransferCodecs
+    from h5pyd._hl.httpconn import EndpointPool, getServiceNodeEndpoints
+
+
+class AboutHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the server: GETs return a small JSON body, PUT bodies are saved"""
+
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+
+    def do_GET(self):
+        self.server.get_count += 1
+        body = json.dumps({"state": "READY"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        self.server.put_bodies.append(body)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no HttpConn")
+class TestHttpConn(TestCase):
+
+    """
+        Feature: HttpConn connection pool, retry and transfer compression settings
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), AboutHandler)
+        self.server.put_bodies = []
+        self.server.get_count = 0
+        self.endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_pool_stats(self):
+        http_conn = HttpConn("/home/test/pool.h5", endpoint=self.endpoint, use_cache=False)
+        self.assertEqual(http_conn.pool_maxsize, 16)
+        for _ in range(5):
+            rsp = http_conn.GET("/about")
+            self.assertEqual(rsp.status_code, 200)
+            rsp.content  # read the body so the connection goes back to the pool
+        stats = http_conn.pool_stats
+        self.assertEqual(stats.checkouts, 5)
+        self.assertEqual(stats.new_connections, 1)  # connection was reused
+        self.assertGreaterEqual(stats.wait_time, 0.0)
+        stats.reset()
+        self.assertEqual(stats.checkouts, 0)
+        http_conn.close()
+
+    def test_reserve_pool(self):
+        http_conn = HttpConn("/home/test/pool.h5", endpoint=self.endpoint, use_cache=False)
+        http_conn.GET("/about").content
+        http_conn.reservePool(8)
+        self.assertEqual(http_conn.pool_maxsize, 16)  # already big enough
+        http_conn.reservePool(40)
+        self.assertEqual(http_conn.pool_maxsize, 40)
+
+        def get_about(i):
+            rsp = http_conn.GET("/about")
+            rsp.content
+            return rsp.status_code
+
+        with ThreadPoolExecutor(max_workers=40) as executor:
+            self.assertEqual(set(executor.map(get_about, range(200))), {200})
+        http_conn.close()
+
+        # explicitly sized pools don't grow
+        http_conn = HttpConn("/home/test/pool.h5", endpoint=self.endpoint, pool_maxsize=2,
+                             pool_block=True, use_cache=False)
+        http_conn.reservePool(40)
+        self.assertEqual(http_conn.pool_maxsize, 2)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            self.assertEqual(set(executor.map(get_about, range(40))), {200})
+        # with pool_block set, threads wait for a connection rather than opening more
+        self.assertLessEqual(http_conn.pool_stats.new_connections, 2)
+        http_conn.close()
+
+        with self.assertRaises(ValueError):
+            HttpConn("/home/test/pool.h5", endpoint=self.endpoint, pool_maxsize=0)
+
+    def test_keep_alive(self):
+        http_conn = HttpConn("/home/test/pool.h5", endpoint=self.endpoint, keep_alive=False,
+                             retry_backoff=0.5, use_cache=False)
+        self.assertEqual(http_conn.session.headers["Connection"], "close")
+        adapter = http_conn.session.get_adapter(self.endpoint)
+        self.assertEqual(adapter.max_retries.backoff_factor, 0.5)
+        for _ in range(3):
+            http_conn.GET("/about").content
+        self.assertEqual(http_conn.pool_stats.new_connections, 3)
+        http_conn.close()
+
+    def test_transfer_compression(self):
+        http_conn = HttpConn("/home/test/pool.h5", endpoint=self.endpoint, mode="a",
+                             transfer_compression="gzip", transfer_compression_min_size=1000,
+                             use_cache=False)
+        self.assertEqual(http_conn.transfer_compression, "gzip")
+        self.assertEqual(http_conn.getAcceptEncoding(), "gzip, deflate")
+        self.assertEqual(http_conn.getAcceptEncoding(size_hint=100), "identity")
+
+        req = "/datasets/d-1234/value"
+        small = bytes(range(100))
+        large = bytes(10000)
+        http_conn.PUT(req, body=small, format="binary")
+        http_conn.PUT(req, body=large, format="binary")
+        self.assertEqual(self.server.put_bodies, [small, large])
+        stats = http_conn.transfer_stats.get("d-1234")
+        self.assertEqual(stats["write_bytes"], 10100)
+        self.assertLess(stats["write_wire_bytes"], 1000)  # zeros compress well
+        self.assertEqual(stats["read_bytes"], 0)
+        self.assertEqual(list(http_conn.transfer_stats), ["d-1234"])
+        self.assertEqual(http_conn.transfer_stats.totals(), stats)
+        http_conn.close()
+
+        http_conn = HttpConn("/home/test/pool.h5", endpoint=self.endpoint, use_cache=False)
+        self.assertIsNone(http_conn.transfer_compression)
+        self.assertEqual(http_conn.getAcceptEncoding(size_hint=100), "deflate, gzip")
+        with self.assertRaises(ValueError):
+            HttpConn("/home/test/pool.h5", endpoint=self.endpoint, transfer_compression="nope")
+
+    def test_write_compression(self):
+        req = "/datasets/d-1234/value"
+        large = bytes(10000)
+        http_conn = HttpConn("/home/test/pool.h5", endpoint=self.endpoint, mode="a",
+                             transfer_compression="deflate", use_cache=False)
+        self.assertEqual(http_conn.write_compression, "deflate")
+        http_conn.close()
+
+        # writes can be compressed differently from reads, or not at all
+        http_conn = HttpConn("/home/test/pool.h5", endpoint=self.endpoint, mode="a",
+                             transfer_compression="deflate", write_compression="gzip",
+                             transfer_compression_min_size=1000, use_cache=False)
+        self.assertEqual(http_conn.write_compression, "gzip")
+        http_conn.PUT(req, body=large, format="binary")
+        self.assertLess(http_conn.transfer_stats.get("d-1234")["write_wire_bytes"], 1000)
+        http_conn.close()
+        http_conn = HttpConn("/home/test/pool.h5", endpoint=self.endpoint, mode="a",
+                             transfer_compression="gzip", write_compression=False, use_cache=False)
+        self.assertIsNone(http_conn.write_compression)
+        http_conn.PUT(req, body=large, format="binary")
+        self.assertEqual(http_conn.transfer_stats.get("d-1234")["write_wire_bytes"], 10000)
+        http_conn.close()
+        self.assertEqual(self.server.put_bodies, [large, large])
+
+        # codecs the server may not decode are only used for writes when asked for
+        for codec in getTransferCodecs():
+            if codec in ("gzip", "deflate"):
+                continue
+            http_conn = HttpConn("/home/test/pool.h5", endpoint=self.endpoint, mode="a",
+                                 transfer_compression=codec, use_cache=False)
+            self.assertEqual(http_conn.transfer_compression, codec)
+            self.assertIsNone(http_conn.write_compression)
+            http_conn.close()
+        with self.assertRaises(ValueError):
+            HttpConn("/home/test/pool.h5", endpoint=self.endpoint, write_compression="nope")
+
+    def test_codecs(self):
+        data = b"abcd" * 1000
+        for codec in getTransferCodecs():
+            compressed = compressBody(data, codec)
+            self.assertLess(len(compressed), len(data))
+            self.assertEqual(decompressBody(compressed, codec), data)
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no HttpConn")
+class TestEndpointPool(TestCase):
+
+    """
+        Feature: Requests can be spread over several service node endpoints
+    """
+
+    def setUp(self):
+        self.servers = []
+        for _ in range(3):
+            server = ThreadingHTTPServer(("127.0.0.1", 0), AboutHandler)
+            server.put_bodies = []
+            server.get_count = 0
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.servers.append(server)
+        self.endpoints = [f"http://127.0.0.1:{server.server_address[1]}" for server in self.servers]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_routing(self):
+        pool = EndpointPool(["http://sn1", "http://sn2", "http://sn3"], retry_time=60)
+        # fewest in flight first
+        self.assertEqual([pool.acquire() for _ in range(3)], ["http://sn1", "http://sn2", "http://sn3"])
+        pool.release("http://sn2")
+        self.assertEqual(pool.acquire(), "http://sn2")
+        self.assertEqual(pool.getOutstanding("http://sn2"), 1)
+        self.assertEqual(pool.getRequestCount("http://sn2"), 2)
+        # a failed endpoint is skipped
+        pool.release("http://sn1", failed=True)
+        self.assertFalse(pool.isHealthy("http://sn1"))
+        pool.release("http://sn3")
+        pool.release("http://sn2")
+        self.assertEqual(pool.acquire(), "http://sn3")
+        self.assertEqual(pool.acquire(), "http://sn2")
+        with self.assertRaises(ValueError):
+            EndpointPool([])
+
+    def test_service_node_endpoints(self):
+        endpoints = getServiceNodeEndpoints("http://localhost:5101", sn_cores="3", port_range="5101-5103")
+        self.assertEqual(endpoints, ["http://localhost:5101", "http://localhost:5102", "http://localhost:5103"])
+        self.assertIsNone(getServiceNodeEndpoints("http+unix://%2Ftmp%2Fsn.sock", sn_cores="3",
+                                                  port_range="5101-5103"))
+        with self.assertRaises(ValueError):
+            getServiceNodeEndpoints("http://localhost:5101", sn_cores="3", port_range="5101-5109")
+
+    def test_endpoints(self):
+        http_conn = HttpConn("/home/test/sn.h5", endpoint=self.endpoints[0], endpoints=self.endpoints,
+                             use_cache=False)
+        self.assertEqual(http_conn.endpoint_pool.endpoints, self.endpoints)
+
+        def get_about(i):
+            rsp = http_conn.GET("/about")
+            rsp.content
+            return rsp.status_code
+
+        with ThreadPoolExecutor(max_workers=12) as executor:
+            self.assertEqual(set(executor.map(get_about, range(300))), {200})
+        # every service node got a share of the requests
+        for server in self.servers:
+            self.assertGreater(server.get_count, 0)
+        self.assertEqual(sum(server.get_count for server in self.servers), 300)
+        http_conn.close()
+
+    def test_unhealthy_endpoint(self):
+        # nothing is listening on the last endpoint
+        self.servers[2].shutdown()
+        self.servers[2].server_close()
+        self.servers = self.servers[:2]
+        http_conn = HttpConn("/home/test/sn.h5", endpoint=self.endpoints[0], endpoints=self.endpoints,
+                             retries=0, use_cache=False)
+        errors = 0
+        for _ in range(20):
+            try:
+                http_conn.GET("/about").content
+            except IOError:
+                errors += 1
+        # only the first request to the down endpoint fails, after that it's skipped
+        self.assertEqual(errors, 1)
+        self.assertFalse(http_conn.endpoint_pool.isHealthy(self.endpoints[2]))
+        self.assertEqual(sum(server.get_count for server in self.servers), 19)
+        http_conn.close()
+
+
+class Http2Server(object):
+    """Minimal cleartext HTTP/2 stand-in for the server.  Each request gets a JSON
+    response with the request path and the number of body bytes received"""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(8)
+        self.endpoint = f"h2c://127.0.0.1:{self.sock.getsockname()[1]}"
+        self.connection_count = 0
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return  # closed
+            self.connection_count += 1
+            threading.Thread(target=self.handle, args=(client,), daemon=True).start()
+
+    def handle(self, client):
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        client.sendall(conn.data_to_send())
+        streams = {}  # stream id -> [headers, body length]
+        with client:
+            while True:
+                data = client.recv(65536)
+                if not data:
+                    return
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        streams[event.stream_id] = [dict(event.headers), 0]
+                    elif isinstance(event, h2.events.DataReceived):
+                        streams[event.stream_id][1] += len(event.data)
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        headers, nbytes = streams.pop(event.stream_id)
+                        path = headers[b":path"].decode("utf-8").split("?")[0]
+                        body = json.dumps({"path": path, "nbytes": nbytes}).encode("utf-8")
+                        conn.send_headers(event.stream_id, [(":status", "200"),
+                                                            ("content-type", "application/json"),
+                                                            ("content-length", str(len(body)))])
+                        conn.send_data(event.stream_id, body, end_stream=True)
+                client.sendall(conn.data_to_send())
+
+    def close(self):
+        self.sock.close()
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no HttpConn")
+@ut.skipUnless(have_http2, "httpx and h2 are not installed")
+class TestHttp2(TestCase):
+
+    """
+        Feature: HttpConn requests can be multiplexed over HTTP/2
+    """
+
+    def setUp(self):
+        self.server = Http2Server()
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_multiplexed(self):
+        http_conn = HttpConn("/home/test/h2.h5", endpoint=self.server.endpoint, mode="a", use_cache=False)
+        self.assertTrue(http_conn.http2)
+        self.assertTrue(http_conn.endpoint.startswith("http://"))
+
+        rsp = http_conn.GET("/about")
+        self.assertEqual(rsp.status_code, 200)
+        self.assertEqual(rsp.json()["path"], "/about")
+        self.assertEqual(rsp.http_version, "HTTP/2")
+
+        rsp = http_conn.PUT("/datasets/d-1234/value", body=bytes(1000), format="binary")
+        self.assertEqual(rsp.json(), {"path": "/datasets/d-1234/value", "nbytes": 1000})
+        rsp = http_conn.POST("/datasets/d-1234/value", body={"points": [1, 2, 3]})
+        self.assertEqual(rsp.status_code, 200)
+
+        def get_value(i):
+            rsp = http_conn.GET(f"/datasets/d-{i}/value", format="binary")
+            return rsp.json()["path"]
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            paths = list(executor.map(get_value, range(200)))
+        self.assertEqual(paths, [f"/datasets/d-{i}/value" for i in range(200)])
+        # requests from all the threads shared one connection
+        self.assertEqual(self.server.connection_count, 1)
+        http_conn.close()
+
+    def test_kwarg(self):
+        endpoint = self.server.endpoint.replace("h2c://", "http://")
+        http_conn = HttpConn("/home/test/h2.h5", endpoint=endpoint, http2=True, use_cache=False)
+        self.assertEqual(http_conn.GET("/about").http_version, "HTTP/2")
+        http_conn.close()
+        with self.assertRaises(ValueError):
+            HttpConn("/home/test/h2.h5", endpoint="http+unix://%2Ftmp%2Fhs%2Fsn_1.sock", http2=True)
+
+
+if __name__ == '__main__':
+    ut.main()
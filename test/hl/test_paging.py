@@ -0,0 +1,77 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+import config
+
+from common import ut, TestCase
+from h5pyd._hl.paging import PageSizer, MIN_PAGE_BYTES
+
+MB = 1024 * 1024
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no paged reads")
+class TestPageSizer(TestCase):
+
+    """
+        Feature: Page sizes adapt to response times and are remembered per dataset
+    """
+
+    def test_latency_window(self):
+        sizer = PageSizer(target_bytes=64 * MB, min_latency=1.0, max_latency=10.0)
+        self.assertEqual(sizer.getPageBytes("d-1"), 64 * MB)
+
+        # too slow - shrink so a page would take about 5.5 seconds
+        self.assertEqual(sizer.update("d-1", 64 * MB, 22.0), 16 * MB)
+        self.assertEqual(sizer.getPageBytes("d-1"), 16 * MB)
+        self.assertEqual(sizer.getPageBytes("d-2"), 64 * MB)  # other datasets unaffected
+
+        # within the window - no change
+        self.assertEqual(sizer.update("d-1", 16 * MB, 5.0), 16 * MB)
+
+        # fast - grow, at most doubling, and never past the target
+        self.assertEqual(sizer.update("d-1", 16 * MB, 0.1), 32 * MB)
+        self.assertEqual(sizer.update("d-1", 32 * MB, 0.1), 64 * MB)
+        self.assertEqual(sizer.update("d-1", 64 * MB, 0.1), 64 * MB)
+
+        # a small final page doesn't say much about the throughput
+        sizer.update("d-1", 64 * MB, 22.0)
+        self.assertEqual(sizer.update("d-1", MB, 0.01), 16 * MB)
+
+        # never shrinks below the minimum
+        self.assertEqual(sizer.update("d-1", 16 * MB, 10000.0), MIN_PAGE_BYTES)
+
+        sizer.forget("d-1")
+        self.assertEqual(sizer.getPageBytes("d-1"), 64 * MB)
+
+    def test_reject(self):
+        sizer = PageSizer(target_bytes=64 * MB)
+        self.assertEqual(sizer.reject("d-1", 64 * MB), 32 * MB)
+        self.assertEqual(sizer.reject("d-1", 32 * MB), 16 * MB)
+        # fast responses don't grow past the size the server accepts
+        self.assertEqual(sizer.update("d-1", 16 * MB, 0.1), 16 * MB)
+        # can go below the minimum if that's what the server needs
+        self.assertEqual(sizer.reject("d-1", MIN_PAGE_BYTES), MIN_PAGE_BYTES // 2)
+
+    def test_chunks_per_page(self):
+        sizer = PageSizer(target_bytes=10 * MB)
+        self.assertEqual(sizer.getChunksPerPage("d-1", MB, 100), 10)
+        self.assertEqual(sizer.getChunksPerPage("d-1", MB, 4), 4)
+        self.assertEqual(sizer.getChunksPerPage("d-1", 20 * MB, 100), 1)
+
+        with self.assertRaises(ValueError):
+            PageSizer(target_bytes=0)
+        with self.assertRaises(ValueError):
+            PageSizer(min_latency=5.0, max_latency=1.0)
+
+
+if __name__ == '__main__':
+    ut.main()
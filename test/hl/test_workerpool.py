@@ -0,0 +1,146 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+import gc
+import threading
+import time
+import numpy as np
+import config
+
+from common import ut, TestCase
+
+if config.get("use_h5py"):
+    from h5py import File
+else:
+    from h5pyd import File, MultiManager
+    from h5pyd._hl.workerpool import WorkerPool
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no worker pool")
+class TestWorkerPool(TestCase):
+
+    """
+        Feature: Threads are kept between parallel requests
+    """
+
+    def test_map(self):
+        pool = WorkerPool(max_workers=4)
+        self.assertFalse(pool.started)
+        self.assertEqual(pool.map(lambda x: x * 2, range(20)), [x * 2 for x in range(20)])
+        self.assertTrue(pool.started)
+        threads = set()
+        pool.map(lambda x: threads.add(threading.get_ident()), range(20))
+        self.assertTrue(len(threads) <= 4)
+        self.assertFalse(threading.get_ident() in threads)
+        pool.close()
+        self.assertFalse(pool.started)
+        # threads are started again if needed
+        self.assertEqual(pool.map(lambda x: x + 1, range(3)), [1, 2, 3])
+        pool.close()
+        with self.assertRaises(ValueError):
+            WorkerPool(max_workers=0)
+
+    def test_max_pending(self):
+        lock = threading.Lock()
+        counts = {"running": 0, "max": 0}
+
+        def work(_):
+            with lock:
+                counts["running"] += 1
+                counts["max"] = max(counts["max"], counts["running"])
+            time.sleep(0.01)
+            with lock:
+                counts["running"] -= 1
+
+        with WorkerPool(max_workers=8) as pool:
+            pool.map(work, range(20), max_pending=2)
+        self.assertTrue(counts["max"] <= 2)
+
+    def test_nested(self):
+        # a task that uses the pool would wait forever if all the threads were
+        # busy with tasks waiting on queued work, so nested work runs in place
+        with WorkerPool(max_workers=2) as pool:
+
+            def outer(x):
+                self.assertTrue(pool.inWorker())
+                return sum(pool.map(lambda y: x * y, range(5)))
+
+            self.assertEqual(pool.map(outer, range(6)), [x * 10 for x in range(6)])
+            self.assertEqual(pool.submit(outer, 3).result(), 30)
+            self.assertFalse(pool.inWorker())
+
+    def test_error(self):
+        started = []
+
+        def work(x):
+            started.append(x)
+            if x == 0:
+                raise IOError(413, "Request Entity Too Large")
+            time.sleep(0.01)
+
+        with WorkerPool(max_workers=2) as pool:
+            with self.assertRaises(IOError) as cm:
+                pool.map(work, range(100))
+            self.assertEqual(cm.exception.errno, 413)
+        # calls not started when the error was seen are skipped
+        self.assertTrue(len(started) < 100)
+
+    def test_unclosed(self):
+        # threads of pools that weren't closed stop once the pool is dropped
+        num_threads = threading.active_count()
+        for _ in range(5):
+            mm = MultiManager([None], max_workers=4)
+            mm._getPool().map(lambda x: time.sleep(0.01), range(8))
+            self.assertTrue(threading.active_count() > num_threads)
+            mm = None
+        gc.collect()
+        for _ in range(100):
+            if threading.active_count() <= num_threads:
+                break
+            time.sleep(0.05)
+        self.assertEqual(threading.active_count(), num_threads)
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no worker pool")
+class TestWorkerPoolFile(TestCase):
+
+    """
+        Feature: Multi-reads and paged reads reuse the worker threads
+    """
+
+    def test_reuse(self):
+        filename = self.getFileName("worker_pool")
+        data = np.arange(200 * 20, dtype="i4").reshape((200, 20))
+        with File(filename, "w", page_workers=4, worker_pool_size=4, page_target_bytes=1) as f:
+            pool = f.id.http_conn.worker_pool
+            self.assertEqual(pool.max_workers, 4)
+            datasets = []
+            for i in range(3):
+                datasets.append(f.create_dataset("dset" + str(i), data=data + i, chunks=(10, 20)))
+            np.testing.assert_array_equal(datasets[0][...], data)  # paged read
+            self.assertTrue(pool.started)
+
+            with MultiManager(datasets, max_workers=2) as mm:
+                for n in range(3):
+                    data_out = mm[n * 10:n * 10 + 100]
+                    for i in range(3):
+                        np.testing.assert_array_equal(data_out[i], data[n * 10:n * 10 + 100] + i)
+                mm[0] = [np.zeros((20,), dtype="i4")] * 3
+            self.assertEqual(mm.max_workers, 2)
+        self.assertFalse(pool.started)
+
+        with File(filename, "r") as f:
+            np.testing.assert_array_equal(f["dset2"][0], np.zeros((20,), dtype="i4"))
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,156 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+import threading
+import numpy as np
+import config
+
+from common import ut, TestCase
+
+if config.get("use_h5py"):
+    from h5py import File
+else:
+    from h5pyd import File
+    from h5pyd._hl.writebehind import WriteQueue
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no write queue")
+class TestWriteQueue(TestCase):
+
+    """
+        Feature: Writes are sent by background threads, in order per object
+    """
+
+    def test_order(self):
+        queue = WriteQueue(max_depth=8, workers=4)
+        results = {"d-1": [], "d-2": []}
+
+        def write(obj_id, n):
+            results[obj_id].append(n)
+
+        for n in range(50):
+            queue.submit("d-1", None, lambda n=n: write("d-1", n))
+            queue.submit("d-2", None, lambda n=n: write("d-2", n))
+        queue.flush()
+        self.assertEqual(results["d-1"], list(range(50)))
+        self.assertEqual(results["d-2"], list(range(50)))
+        self.assertEqual(queue.pending, 0)
+        queue.close()
+
+    def test_coalesce(self):
+        queue = WriteQueue(max_depth=8, workers=1)
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def blocked_write():
+            started.set()
+            release.wait()
+            results.append("first")
+
+        queue.submit("d-1", "a", blocked_write)
+        started.wait()
+        # the first write is in progress, so later ones wait in the queue
+        queue.submit("d-1", "a", lambda: results.append("a1"))
+        queue.submit("d-1", "a", lambda: results.append("a2"))  # replaces a1
+        queue.submit("d-1", "b", lambda: results.append("b"))
+        queue.submit("d-1", "a", lambda: results.append("a3"))  # can't replace a2, b is in between
+        self.assertEqual(queue.pending, 3)
+        release.set()
+        queue.flush()
+        self.assertEqual(results, ["first", "a2", "b", "a3"])
+        self.assertEqual(queue.coalesced, 1)
+        queue.close()
+
+    def test_back_pressure(self):
+        queue = WriteQueue(max_depth=2, workers=1)
+        release = threading.Event()
+        queue.submit("d-1", None, release.wait)
+        queue.submit("d-1", None, lambda: None)
+        queue.submit("d-1", None, lambda: None)
+        submitted = threading.Event()
+
+        def submit():
+            queue.submit("d-1", None, lambda: None)
+            submitted.set()
+
+        thread = threading.Thread(target=submit)
+        thread.start()
+        # queue is full, so the submit waits
+        self.assertFalse(submitted.wait(0.2))
+        release.set()
+        self.assertTrue(submitted.wait(5))
+        thread.join()
+        queue.close()
+
+    def test_deferred_errors(self):
+        queue = WriteQueue()
+        results = []
+
+        def fail():
+            raise IOError(500, "Internal Server Error")
+
+        queue.submit("d-1", None, fail)
+        queue.submit("d-1", None, lambda: results.append(1))
+        queue.wait("d-1")
+        self.assertEqual(results, [1])  # later writes still go
+        with self.assertRaises(IOError) as cm:
+            queue.flush()
+        self.assertEqual(cm.exception.errno, 500)
+        queue.flush()  # errors are only reported once
+        queue.close()
+        with self.assertRaises(ValueError):
+            queue.submit("d-1", None, lambda: None)
+        with self.assertRaises(ValueError):
+            WriteQueue(max_depth=0)
+
+
+@ut.skipIf(config.get('use_h5py'), "h5py has no write_behind")
+class TestWriteBehind(TestCase):
+
+    """
+        Feature: File write_behind mode queues dataset and attribute writes
+    """
+
+    def test_write_behind(self):
+        filename = self.getFileName("write_behind")
+        data = np.arange(100 * 20, dtype="i4").reshape((100, 20))
+        with File(filename, "w", write_behind=True, write_queue_depth=4) as f:
+            self.assertEqual(f.id.http_conn.write_queue.max_depth, 4)
+            dset = f.create_dataset("dset", (100, 20), dtype="i4", chunks=(10, 20))
+            row = np.zeros((20,), dtype="i4")
+            for n in range(100):
+                row[...] = data[n]
+                dset[n, :] = row  # row is reused, so the write must take a copy
+            dset.attrs["count"] = 100
+            # reads wait for queued writes
+            np.testing.assert_array_equal(dset[...], data)
+            self.assertEqual(dset.attrs["count"], 100)
+            dset[0, :] = -1
+            f.flush()
+
+        with File(filename, "r") as f:
+            dset = f["dset"]
+            np.testing.assert_array_equal(dset[0, :], -np.ones((20,), dtype="i4"))
+            np.testing.assert_array_equal(dset[1:], data[1:])
+
+    def test_deferred_error(self):
+        filename = self.getFileName("write_behind_error")
+        f = File(filename, "w", write_behind=True)
+        dset = f.create_dataset("dset", (10,), dtype="i4")
+        dset.id.http_conn.write_queue.submit(dset.id.uuid, None, lambda: dset.PUT("/datasets/d-bogus/value"))
+        with self.assertRaises(IOError):
+            f.close()
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -15,7 +15,10 @@ import os
 import sys
 
 
-hl_tests = ('test_attribute',
+hl_tests = ('test_async',
+            'test_attribute',
+            'test_cache',
+            'test_codec',
             'test_config',
             'test_committedtype',
             'test_complex_numbers',
@@ -36,9 +39,14 @@ hl_tests = ('test_attribute',
             'test_file',
             'test_folder',
             'test_group',
+            'test_httpconn',
+            'test_paging',
             'test_table',
             'test_visit',
-            'test_vlentype',)
+            'test_vlentype',
+            'test_writebehind',
+            'test_workerpool',
+            'test_decodepool',)
 
 
 app_tests = ('test_hsinfo', 'test_tall_inspect', 'test_diamond_inspect',